@@ -0,0 +1,299 @@
+"""
+Coordinator Benchmark Script
+
+This script measures how many robots the Coordinator keeps up with. It drives the coordinator with N synthetic
+robots over a MessageBus, without the server. The robots drive around the track defined by BEACONS, send binary
+position messages at a fixed rate and adapt their speed to the speed factors they receive.
+With --pipelined the coordinator runs as a CoordinatorPipeline, which drops stale positions under overload.
+
+For every number of robots it measures the handled messages per second, the messages left unhandled at the end,
+the latency from sending a position message until the coordinator sent the speed factors for it, the CPU usage
+of the coordinator thread and of the process, and the peak memory of the process. The results are printed and
+appended to a CSV file, labelled with the git version, so the scaling curve can be compared across versions.
+
+Usage:
+    python3 -m challenge.benchmark --robots 10 50 100 200 500 --rate 10 --duration 5
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import argparse
+import contextlib
+import csv
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from challenge.coordinator.coordinator import BEACONS, COORDINATOR_ID, Coordinator
+from challenge.coordinator.track_index import TrackIndex
+from challenge.coordinator.pipeline import CoordinatorPipeline
+from challenge.core.position_message import HEADER, PositionCodec, PositionMessage
+from challenge.core.position_on_track import PositionOnTrack
+from challenge.simulation.message_bus import BusClient, MessageBus
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+ROBOT_SPEED: float = 0.1  # in m/s at a speed factor of 1
+TICK_INTERVAL: float = 0.002  # in s, how often the synthetic robots check whether a report is due
+CSV_COLUMNS: list[str] = ["label", "date", "mode", "robots", "rate", "offered_msgs_s", "handled_msgs_s", "stale",
+                          "backlog",
+                          "latency_p50_ms", "latency_p95_ms", "latency_p99_ms", "latency_max_ms", "speed_factors",
+                          "coordinator_cpu", "process_cpu", "peak_rss_mb"]
+
+
+class BenchmarkCoordinator(Coordinator):
+    """
+    A Coordinator that records the send timestamp of every binary position message it handles,
+    and the latency of the messages once their speed factors are sent at the end of the batch.
+    Pipelined, the latency is recorded once the compute worker queued the speed factors of the message.
+    """
+
+    def __init__(self, client: BusClient, optimal_distance: float, pipelined: bool = False):
+        """
+        Initialize the BenchmarkCoordinator.
+
+        Args:
+            client (BusClient): The bus client of the coordinator.
+            optimal_distance (float): Distance in m the robots should keep from each other.
+            pipelined (bool): Whether the coordinator runs as a CoordinatorPipeline.
+        """
+        super().__init__([], optimal_distance=optimal_distance, report_interval=None, client=client,
+                         pipelined=pipelined)
+        self.batch_timestamps: list[int] = []
+        self.latencies_ns: list[int] = []
+
+    def handle_incoming_messages(self, timeout: float | None = None):
+        super().handle_incoming_messages(timeout)
+        now = time.perf_counter_ns()
+        self.latencies_ns.extend(now - timestamp for timestamp in self.batch_timestamps)
+        self.batch_timestamps.clear()
+
+    def handle_incoming_message(self, msg: dict | bytes):
+        if isinstance(msg, bytes):
+            self.batch_timestamps.append(HEADER.unpack_from(msg)[3])
+        super().handle_incoming_message(msg)
+
+    def update_position(self, position_message: PositionMessage):
+        super().update_position(position_message)
+        if self.pipelined:
+            self.latencies_ns.append(time.perf_counter_ns() - position_message.timestamp)
+
+
+class SyntheticRobots:
+    """
+    Robots spread evenly over the track, which drive at ROBOT_SPEED times their last speed factor and send
+    their position to the coordinator at a fixed rate. Their reports are staggered over the report interval.
+    """
+
+    def __init__(self, bus: MessageBus, count: int, rate: float):
+        """
+        Initialize the SyntheticRobots.
+
+        Args:
+            bus (MessageBus): The bus to send the positions on.
+            count (int): Number of robots.
+            rate (float): Position messages per second of every robot.
+        """
+        self.track_index: TrackIndex = TrackIndex.for_beacon(BEACONS[1])
+        self.lap_length: float = self.track_index.lap_length
+        self.codec: PositionCodec = PositionCodec(list(BEACONS.values()))
+        self.clients: list[BusClient] = [bus.client(f"10.0.{i // 256}.{i % 256}") for i in range(count)]
+        self.coordinates: np.ndarray = np.arange(count) * self.lap_length / count
+        self.speed_factors: np.ndarray = np.ones(count)
+        self.interval_ns: int = int(1e9 / rate)
+        self.next_report_ns: np.ndarray = np.arange(count) * self.interval_ns // count
+        self.sent: int = 0
+        self.sequence: int = 0
+
+    def position(self, coordinate: float) -> PositionOnTrack:
+        """
+        Convert a lap coordinate to a position from the beacon behind it.
+
+        Args:
+            coordinate (float): The lap coordinate in m.
+
+        Returns:
+            PositionOnTrack: The position on the track.
+        """
+        from_beacon = self.track_index.origin
+        for beacon in self.track_index.beacons:
+            if self.track_index.offsets[beacon.name] <= coordinate:
+                from_beacon = beacon
+        return PositionOnTrack(coordinate - self.track_index.offsets[from_beacon.name], from_beacon)
+
+    def run(self, duration: float):
+        """
+        Drive and report the positions until the duration has passed.
+
+        Args:
+            duration (float): Duration of the run in s.
+        """
+        start = time.perf_counter_ns()
+        last = start
+        end = start + int(duration * 1e9)
+        while (now := time.perf_counter_ns()) < end:
+            self.coordinates = (self.coordinates + ROBOT_SPEED * self.speed_factors * (now - last) / 1e9) \
+                % self.lap_length
+            last = now
+            for i in np.flatnonzero(self.next_report_ns <= now - start):
+                client = self.clients[i]
+                while client.has_receive_msg():
+                    self.speed_factors[i] = client.receive_msg()["speed_factor"]
+                position = self.position(float(self.coordinates[i]))
+                client.send_msg_to(COORDINATOR_ID, self.codec.encode(client.get_id(), position,
+                                                                     0, 0, 0, self.sequence, time.perf_counter_ns()))
+                self.next_report_ns[i] += self.interval_ns
+                self.sequence += 1
+                self.sent += 1
+            time.sleep(TICK_INTERVAL)
+
+
+def peak_rss_mb() -> float | None:
+    """
+    Returns:
+        float | None: The peak resident memory of the process in MB, None if it can't be read.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10  # bytes on macOS, KB on Linux
+
+
+def git_label() -> str:
+    """
+    Returns:
+        str: The git version of the working tree, to compare the results across versions.
+    """
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def benchmark(robots: int, rate: float, duration: float, optimal_distance: float, latency: float = 0.0,
+              jitter: float = 0.0, loss: float = 0.0, pipelined: bool = False) -> dict:
+    """
+    Run the coordinator against synthetic robots and measure it.
+
+    Args:
+        robots (int): Number of synthetic robots.
+        rate (float): Position messages per second of every robot.
+        duration (float): Duration of the run in s.
+        optimal_distance (float): Distance in m the robots should keep from each other.
+        latency (float): Latency of the bus in s.
+        jitter (float): Jitter of the bus in s.
+        loss (float): Loss probability of the bus.
+        pipelined (bool): Whether to run the coordinator as a CoordinatorPipeline.
+
+    Returns:
+        dict: The measurements, with the keys of CSV_COLUMNS except label and date.
+    """
+    bus = MessageBus(latency=latency, jitter=jitter, loss=loss, seed=0)
+    coordinator = BenchmarkCoordinator(bus.client(COORDINATOR_ID), optimal_distance, pipelined)
+    coordinator.init_client()
+    pipeline = CoordinatorPipeline(coordinator) if pipelined else None
+    coordinator.init_speed_adjustor(pipeline.outbox if pipelined else None)
+    synthetic_robots = SyntheticRobots(bus, robots, rate)
+    producer = threading.Thread(target=synthetic_robots.run, args=(duration,), daemon=True)
+
+    start = time.perf_counter()
+    start_process_cpu = time.process_time()
+    start_thread_cpu = time.thread_time()
+    producer.start()
+    # The coordinator prints every distance and speed factor, which is part of its cost but would flood the output
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if pipelined:
+            pipeline.start()
+            producer.join()
+            pipeline.stop()
+        else:
+            while producer.is_alive():
+                coordinator.handle_incoming_messages(TICK_INTERVAL)
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(coordinator.latencies_ns) / 1e6 if coordinator.latencies_ns else np.zeros(1)
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    handled = len(coordinator.latencies_ns)
+    stale = pipeline.positions.stale_count if pipelined else 0
+    return {
+        "mode": "pipelined" if pipelined else "sequential",
+        "robots": robots,
+        "rate": rate,
+        "offered_msgs_s": round(synthetic_robots.sent / elapsed, 1),
+        "handled_msgs_s": round(handled / elapsed, 1),
+        "stale": stale,
+        "backlog": synthetic_robots.sent - bus.dropped - handled - stale,
+        "latency_p50_ms": round(p50, 3),
+        "latency_p95_ms": round(p95, 3),
+        "latency_p99_ms": round(p99, 3),
+        "latency_max_ms": round(float(latencies_ms.max()), 3),
+        "speed_factors": coordinator.speed_adjustor.sent_messages,
+        # The pipeline stages run in their own threads, whose CPU time can't be read from here
+        "coordinator_cpu": None if pipelined else round((time.thread_time() - start_thread_cpu) / elapsed, 3),
+        "process_cpu": round((time.process_time() - start_process_cpu) / elapsed, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1) if resource is not None else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure how the coordinator scales with the number of robots.")
+    parser.add_argument("--robots", type=int, nargs="+", default=[10, 50, 100, 200, 500],
+                        help="numbers of synthetic robots to run")
+    parser.add_argument("--rate", type=float, default=10, help="position messages per second of every robot")
+    parser.add_argument("--duration", type=float, default=5, help="duration of every run in s")
+    parser.add_argument("--optimal-distance", type=float, default=None,
+                        help="distance the robots should keep, defaults to their spacing on the track")
+    parser.add_argument("--latency", type=float, default=0.0, help="latency of the bus in s")
+    parser.add_argument("--jitter", type=float, default=0.0, help="jitter of the bus in s")
+    parser.add_argument("--loss", type=float, default=0.0, help="probability that the bus drops a message")
+    parser.add_argument("--pipelined", action="store_true", help="run the coordinator as a pipeline of threads")
+    parser.add_argument("--output", default="coordinator_benchmark.csv", help="CSV file to append the results to")
+    parser.add_argument("--label", default=None, help="label of the results, defaults to the git version")
+    args = parser.parse_args()
+
+    label = args.label if args.label is not None else git_label()
+    lap_length = TrackIndex.for_beacon(BEACONS[1]).lap_length
+    date = datetime.now().isoformat(timespec='seconds')
+    write_header = not os.path.exists(args.output)
+    if not write_header:
+        # Rows under the header of an older version would be shifted, so the curves could no longer be compared
+        with open(args.output, newline='') as file:
+            header = next(csv.reader(file), None)
+        if header is None:
+            write_header = True
+        elif header != CSV_COLUMNS:
+            parser.error(f"{args.output} has the columns of another version of the benchmark, "
+                         f"use --output to start a new file")
+    with open(args.output, 'a', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS)
+        if write_header:
+            writer.writeheader()
+        print(f"{'robots':>7} {'offered/s':>10} {'handled/s':>10} {'stale':>7} {'backlog':>8} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'factors':>8} {'coord cpu':>9} {'rss MB':>7}")
+        for robots in args.robots:
+            optimal_distance = args.optimal_distance if args.optimal_distance is not None else lap_length / robots
+            result = benchmark(robots, args.rate, args.duration, optimal_distance, args.latency, args.jitter,
+                               args.loss, args.pipelined)
+            writer.writerow({"label": label, "date": date, **result})
+            cpu = '-' if result['coordinator_cpu'] is None else f"{result['coordinator_cpu']:.0%}"
+            file.flush()
+            print(f"{robots:>7} {result['offered_msgs_s']:>10} {result['handled_msgs_s']:>10} "
+                  f"{result['stale']:>7} {result['backlog']:>8} {result['latency_p50_ms']:>8} {result['latency_p99_ms']:>8} "
+                  f"{result['speed_factors']:>8} {cpu:>9} {str(result['peak_rss_mb']):>7}")
+    print(f"results appended to {args.output} as {label}")
@@ -24,8 +24,12 @@ from challenge.core.beacon import Beacon
 import queue
 
 from challenge.coordinator.distance_calculator import compute_distance
-from challenge.core.position_on_track import PositionOnTrack, position_from_dict
+from challenge.coordinator.message_receiver import MessageReceiver
+from challenge.coordinator.pipeline import CoordinatorPipeline
+from challenge.core.position_message import PositionCodec, PositionMessage
+from challenge.core.position_on_track import PositionOnTrack
 from challenge.coordinator.speed_adjustor import SpeedAdjustor
+from challenge.coordinator.track_order import TrackOrder
 
 # Define the beacons on the track and their relationships
 BEACONS: dict[int, Beacon] = {
@@ -36,6 +40,7 @@ BEACONS[1].next_beacon = (BEACONS[2], 0.74)
 BEACONS[2].next_beacon = (BEACONS[1], 0.65)
 
 COORDINATOR_ID: str = 'coordinator'
+RECEIVE_TIMEOUT: float = 1.0  # longest time in seconds the coordinator sleeps without a message
 
 
 class Coordinator:
@@ -60,11 +65,34 @@ class Coordinator:
     speed_adjustor : SpeedAdjustor | None
         Determines and sends speed adjustment factors to robots to maintain optimal distance.
 
+    receiver : MessageReceiver | None
+        Waits for the messages of the robots without busy polling the client.
+
+    report_interval : float | None
+        Interval in seconds to print the message rate and idle time, None to never print them.
+
     robot_positions_on_track : dict[str, PositionOnTrack]
         Stores the positions of the robots on the track. Keys are robot IDs, values are PositionOnTrack objects.
+
+    track_order : TrackOrder
+        Keeps the robots sorted along the track, to find the robot ahead of each robot.
+
+    position_codec : PositionCodec
+        Decodes the position messages of the robots, in the binary or the dictionary form.
+
+    pipelined : bool
+        Whether run() receives, computes and sends in separate threads connected by a CoordinatorPipeline.
+
+    gui_dropped : int
+        Number of messages not forwarded to the GUI because its state_queue was full.
+
+    invalid_messages : int
+        Number of messages skipped because they could not be decoded, e.g. of an unknown version.
     """
 
-    def __init__(self, robots: list[str], state_queue: queue.Queue = None, optimal_distance: float = 0.6):
+    def __init__(self, robots: list[str], state_queue: queue.Queue = None, optimal_distance: float = 0.6,
+                 report_interval: float | None = 10, client: SocketClientCommunication | None = None,
+                 pipelined: bool = False):
         """
         Coordinator constructor.
 
@@ -76,54 +104,163 @@ class Coordinator:
             Queue to send information to an attached GUI across threads.
         optimal_distance : float, optional
             Distance (in meters) the robots should keep from each other (default is 0.6).
+        report_interval : float, optional
+            Interval in seconds to print the message rate and idle time, None to never print them (default is 10).
+        client : SocketClientCommunication, optional
+            Communication client to use instead of connecting to the server, e.g. a client of a MessageBus.
+        pipelined : bool, optional
+            Whether run() receives, computes and sends in separate threads (default is False).
+            Only use it with a client that is safe to receive from and send with on different threads,
+            like the client of a MessageBus; this is not verified for the SocketClientCommunication.
         """
         self.robots: list[str] = robots
         self.state_queue: queue.Queue = state_queue
-        self.client: SocketClientCommunication | None = None
+        self.client: SocketClientCommunication | None = client
         self.speed_adjustor: SpeedAdjustor | None = None  # Will be initialized after client
+        self.receiver: MessageReceiver | None = None  # Will be initialized with the client
+        self.report_interval: float | None = report_interval
         self.robot_positions_on_track: dict[str, PositionOnTrack] = {}
+        self.track_order: TrackOrder = TrackOrder(list(BEACONS.values()))
+        self.position_codec: PositionCodec = PositionCodec(list(BEACONS.values()))
         self.optimal_distance: float = optimal_distance
+        self.pipelined: bool = pipelined
+        self.gui_dropped: int = 0
+        self.invalid_messages: int = 0
 
     def init_client(self):
         """
-        Initializes the client for communication with robot controllers.
+        Initializes the client for communication with robot controllers,
+        unless a client was given to the constructor.
         """
-        self.client = wrapper.get_client(client_id=COORDINATOR_ID, host_ip='http://127.0.0.1:8000')
+        if self.client is None:
+            self.client = wrapper.get_client(client_id=COORDINATOR_ID, host_ip='http://127.0.0.1:8000')
+        self.receiver = MessageReceiver(self.client, report_interval=self.report_interval, name=COORDINATOR_ID)
 
-    def init_speed_adjustor(self):
+    def init_speed_adjustor(self, client: SocketClientCommunication | None = None):
         """
         Initializes the speed adjustor to determine the speed factor for each robot.
         Must be called after init_client().
+
+        Parameters
+        ----------
+        client : SocketClientCommunication, optional
+            Client the speed factors are sent with, e.g. the outbox of a CoordinatorPipeline.
+            Defaults to the client of the coordinator.
         """
-        self.speed_adjustor: SpeedAdjustor = SpeedAdjustor(self.client, self.optimal_distance)
+        self.speed_adjustor: SpeedAdjustor = SpeedAdjustor(client if client is not None else self.client,
+                                                           self.optimal_distance)
+        if self.receiver is not None:
+            self.receiver.reporters.append(self.speed_adjustor.summary)
 
     def run(self):
         """
         Main loop of the coordinator. Initializes the client and speed adjustor, starts the robots,
         and continuously handles incoming messages from the robots, updating their positions and
-        calculating distances.
+        calculating distances. Sleeps while no message is pending.
+        If pipelined, the messages are received, handled and answered in separate threads.
         """
         self.init_client()
+        if self.pipelined:
+            pipeline = CoordinatorPipeline(self)
+            self.init_speed_adjustor(pipeline.outbox)
+            self.start_robots()
+            pipeline.run()
+            return
+
         self.init_speed_adjustor()
         self.start_robots()
 
         while True:
-            self.handle_incoming_message()
+            self.handle_incoming_messages(RECEIVE_TIMEOUT)
+
+    def handle_incoming_messages(self, timeout: float | None = None):
+        """
+        Waits for incoming messages from the robots and handles all pending messages at once.
+        The speed factors computed for them are sent together, at most one per robot.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Longest time to wait for a message in seconds, None to wait until a message arrives.
+        """
+        for msg in self.receiver.receive_all(timeout):
+            self.handle_incoming_message(msg)
+        self.speed_adjustor.flush()
+
+    def handle_incoming_message(self, msg: dict | bytes):
+        """
+        Handles an incoming message from a robot. Updates its position, recalculates the distances
+        to the robot ahead of it and of the robots behind it, and sends the appropriate speed factor
+        to these robots to maintain the optimal distance.
+        Forwards all messages to the GUI via the state_queue, binary position messages in the dictionary form.
+        Messages that can't be decoded are counted and skipped.
 
-    def handle_incoming_message(self):
+        Parameters
+        ----------
+        msg : dict or bytes
+            The message received from a robot, a binary position message or a dictionary.
         """
-        Handles incoming messages from the robots. Updates their positions, calculates distances,
-        and sends the appropriate speed factor to the robots to maintain the optimal distance.
-        Forwards all messages to the GUI via the state_queue.
+        position_message = self.decode_message(msg)
+        self.forward_to_gui(msg, position_message)
+        if position_message is not None:
+            self.update_position(position_message)
+
+    def decode_message(self, msg: dict | bytes) -> PositionMessage | None:
         """
-        if self.client.has_receive_msg():
-            msg = self.client.receive_msg()
-            self.state_queue.put(msg)
-            robot_id = msg.get("robot_id")
-            position_on_track = msg.get("position_on_track")
-            if position_on_track is not None:
-                self.robot_positions_on_track[robot_id] = position_from_dict(position_on_track, list(BEACONS.values()))
-                self.calculate_all_robot_distances()
+        Decodes a message from a robot. A message that can't be decoded, e.g. of a newer version
+        of the binary format, is counted in invalid_messages and skipped.
+
+        Parameters
+        ----------
+        msg : dict or bytes
+            The message received from a robot, a binary position message or a dictionary.
+
+        Returns
+        -------
+        PositionMessage or None
+            The decoded message, or None if the message is not a position message or can't be decoded.
+        """
+        try:
+            return self.position_codec.decode(msg)
+        except ValueError as error:
+            self.invalid_messages += 1
+            print(f"Skipping invalid message ({self.invalid_messages} so far): {error}")
+            return None
+
+    def forward_to_gui(self, msg: dict | bytes, position_message: PositionMessage | None):
+        """
+        Forwards a message to the GUI via the state_queue, a binary position message in the dictionary form.
+        Drops the message if the state_queue is full, so a slow GUI does not hold up the coordinator.
+        Binary messages that could not be decoded are not forwarded.
+
+        Parameters
+        ----------
+        msg : dict or bytes
+            The message received from a robot.
+        position_message : PositionMessage or None
+            The decoded position message, None if the message is not a position message.
+        """
+        if self.state_queue is None or (isinstance(msg, bytes) and position_message is None):
+            return
+        try:
+            self.state_queue.put_nowait(position_message.to_dict() if isinstance(msg, bytes) else msg)
+        except queue.Full:
+            self.gui_dropped += 1
+
+    def update_position(self, position_message: PositionMessage):
+        """
+        Updates the position of a robot and queues the speed factors of the robots whose distance
+        to the robot ahead changed, until the speed adjustor is flushed.
+
+        Parameters
+        ----------
+        position_message : PositionMessage
+            The decoded position message of the robot.
+        """
+        robot_id = position_message.robot_id
+        position = position_message.position_on_track
+        self.robot_positions_on_track[robot_id] = position
+        self.calculate_robot_distances(self.track_order.update(robot_id, position))
 
     def start_robots(self):
         """
@@ -137,16 +274,31 @@ class Coordinator:
                 stderr=sys.stdout
             )
 
-    def calculate_all_robot_distances(self):
+    def calculate_robot_distances(self, robot_ids: list[str]):
         """
-        Calculates the distances between all robots and sends the appropriate speed factor to each robot.
+        Calculates the distance of each given robot to the robot ahead of it on the track
+        and queues the appropriate speed factor for it, until the speed adjustor is flushed.
+
+        Parameters
+        ----------
+        robot_ids : list[str]
+            The ids of the robots whose distance to the robot ahead changed.
         """
-        robots = list(self.robot_positions_on_track.keys())
-        robot_pairs = [(x, y) for x in robots for y in robots if x != y]
-        for rear, front in robot_pairs:
+        for rear in robot_ids:
+            front = self.track_order.front_of(rear)
+            if front is None:
+                continue
             dist = compute_distance(self.robot_positions_on_track[rear], self.robot_positions_on_track[front])
             print(f"Distance between {rear} and {front}: {dist}")
-            self.speed_adjustor.send_speed_factor(rear, dist)
+            self.speed_adjustor.queue_speed_factor(rear, dist)
+
+    def calculate_all_robot_distances(self):
+        """
+        Calculates the distance of every robot to the robot ahead of it on the track
+        and sends the appropriate speed factor to each robot.
+        """
+        self.calculate_robot_distances(self.track_order.robots())
+        self.speed_adjustor.flush()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,187 @@
+"""
+Message Receiver Module
+
+This module provides the MessageReceiver class, which waits for the messages of a communication client
+without busy polling. It sleeps until a message arrives or a timeout expires, and drains all pending
+messages in one wake-up. It also measures the message rate and the share of the time spent idle.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import time
+from typing import Any, Callable
+
+from unifr_api_epuck.communication.socket_client_communication import SocketClientCommunication
+
+
+class ReceiverStats:
+    """
+    Counts the messages and wake-ups of a MessageReceiver and the time it spent waiting.
+
+    Attributes
+    ----------
+    messages : int
+        Number of messages received.
+    wakeups : int
+        Number of times the receiver returned messages.
+    idle_time : float
+        Wall time spent waiting for messages, in seconds.
+    start_time : float
+        perf_counter time the measurement started.
+    start_cpu_time : float
+        process_time the measurement started.
+    """
+
+    def __init__(self):
+        """
+        ReceiverStats constructor, starts the measurement.
+        """
+        self.messages: int = 0
+        self.wakeups: int = 0
+        self.idle_time: float = 0
+        self.start_time: float = time.perf_counter()
+        self.start_cpu_time: float = time.process_time()
+
+    def summary(self) -> str:
+        """
+        Summarize the measurement since it started.
+
+        Returns
+        -------
+        str
+            The message rate, the messages per wake-up, the share of the time spent idle
+            and the CPU usage of the process.
+        """
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        cpu = (time.process_time() - self.start_cpu_time) / elapsed
+        per_wakeup = self.messages / self.wakeups if self.wakeups else 0
+        return (f"{self.messages} msgs in {elapsed:.1f} s ({self.messages / elapsed:.1f} msgs/s, "
+                f"{per_wakeup:.1f} per wake-up), idle {self.idle_time / elapsed:.0%}, cpu {cpu:.0%}")
+
+
+class MessageReceiver:
+    """
+    Receives the messages of a communication client, sleeping while there are none.
+
+    If the client provides wait_for_msg(timeout), like the LocalClientCommunication of the simulation,
+    the receiver blocks on it and wakes up as soon as a message arrives. The SocketClientCommunication only
+    offers has_receive_msg, so the receiver polls it with a growing interval between min_poll_interval and
+    max_poll_interval, which keeps the latency low during bursts and the CPU usage low in between.
+
+    Attributes
+    ----------
+    client : SocketClientCommunication
+        The communication client to receive from.
+    min_poll_interval : float
+        First interval between two polls after a message, in seconds.
+    max_poll_interval : float
+        Longest interval between two polls, in seconds.
+    report_interval : float or None
+        Interval in seconds to print the statistics, None to never print them.
+    stats : ReceiverStats
+        The statistics since the last report.
+    reporters : list[Callable[[], str]]
+        Further summaries printed with the statistics, e.g. of the SpeedAdjustor.
+    """
+
+    def __init__(self, client: SocketClientCommunication, min_poll_interval: float = 0.0005,
+                 max_poll_interval: float = 0.02, report_interval: float | None = None, name: str = "receiver"):
+        """
+        MessageReceiver constructor.
+
+        Parameters
+        ----------
+        client : SocketClientCommunication
+            The communication client to receive from.
+        min_poll_interval : float, optional
+            First interval between two polls after a message, in seconds (default is 0.5 ms).
+        max_poll_interval : float, optional
+            Longest interval between two polls, in seconds (default is 20 ms).
+        report_interval : float, optional
+            Interval in seconds to print the statistics, None to never print them (default is None).
+        name : str, optional
+            Name printed with the statistics (default is "receiver").
+        """
+        self.client: SocketClientCommunication = client
+        self.min_poll_interval: float = min_poll_interval
+        self.max_poll_interval: float = max_poll_interval
+        self.report_interval: float | None = report_interval
+        self.name: str = name
+        self.stats: ReceiverStats = ReceiverStats()
+        self.reporters: list[Callable[[], str]] = []
+        self.poll_interval: float = min_poll_interval
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Sleep until a message is pending or the timeout expires.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Longest time to wait in seconds, None to wait until a message arrives.
+
+        Returns
+        -------
+        bool
+            True if a message is pending, False if the timeout expired.
+        """
+        if self.client.has_receive_msg():
+            return True
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout
+        try:
+            wait_for_msg = getattr(self.client, "wait_for_msg", None)
+            if wait_for_msg is not None:
+                while not wait_for_msg(self.max_poll_interval if deadline is None
+                                       else max(0.0, deadline - time.perf_counter())):
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        return False
+                return True
+            while not self.client.has_receive_msg():
+                now = time.perf_counter()
+                if deadline is not None and now >= deadline:
+                    return False
+                time.sleep(self.poll_interval if deadline is None else min(self.poll_interval, deadline - now))
+                self.poll_interval = min(2 * self.poll_interval, self.max_poll_interval)
+            return True
+        finally:
+            self.stats.idle_time += time.perf_counter() - start
+
+    def receive_all(self, timeout: float | None = None) -> list[Any]:
+        """
+        Wait for messages and take all pending messages at once.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Longest time to wait in seconds, None to wait until a message arrives.
+
+        Returns
+        -------
+        list[Any]
+            The pending messages in the order they arrived, empty if the timeout expired.
+        """
+        messages = []
+        if self.wait(timeout):
+            while self.client.has_receive_msg():
+                messages.append(self.client.receive_msg())
+            self.poll_interval = self.min_poll_interval
+            self.stats.messages += len(messages)
+            self.stats.wakeups += 1
+        self.report()
+        return messages
+
+    def report(self):
+        """
+        Print the statistics and start a new measurement, if the report interval has passed.
+        """
+        if self.report_interval is None:
+            return
+        if time.perf_counter() - self.stats.start_time >= self.report_interval:
+            print(f"[{self.name}] " + "; ".join([self.stats.summary()] + [reporter() for reporter in self.reporters]))
+            self.stats = ReceiverStats()
@@ -0,0 +1,364 @@
+"""
+Pipeline Module
+
+This module provides the CoordinatorPipeline class, which runs the coordinator in three threads connected by
+bounded mailboxes: a receiver, which decodes the messages and forwards them to the GUI, a compute worker,
+which updates the positions and computes the speed factors, and a sender, which sends the speed factors.
+
+The mailboxes keep only the latest item per robot, so under overload stale positions and speed factors are
+replaced instead of queued, and a slow send or a burst of prints does not delay the following messages.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from challenge.coordinator.coordinator import Coordinator
+
+MAILBOX_SIZE: int = 1000  # most robots a mailbox holds an item for
+STOP_TIMEOUT: float = 0.1  # longest time in seconds a stage waits before checking whether the pipeline stopped
+
+
+class LatestMailbox:
+    """
+    A bounded mailbox between two pipeline stages, which keeps only the latest item per key.
+    Putting an item for a key that is already waiting replaces the stale item.
+
+    Attributes
+    ----------
+    name : str
+        Name printed with the statistics.
+    maxsize : int
+        Most keys waiting at once, items for further keys are rejected.
+    items : dict[str, tuple[Any, int]]
+        The waiting item and the perf_counter_ns time it was put, by key.
+    put_count : int
+        Number of items put.
+    stale_count : int
+        Number of waiting items replaced by a newer item.
+    rejected_count : int
+        Number of items rejected because the mailbox was full.
+    taken_count : int
+        Number of items taken.
+    max_depth : int
+        Most items waiting at once.
+    total_wait_ns : int
+        Sum of the time the taken items waited, in ns.
+    max_wait_ns : int
+        Longest time a taken item waited, in ns.
+    """
+
+    def __init__(self, name: str, maxsize: int = MAILBOX_SIZE):
+        """
+        LatestMailbox constructor.
+
+        Parameters
+        ----------
+        name : str
+            Name printed with the statistics.
+        maxsize : int, optional
+            Most keys waiting at once (default is MAILBOX_SIZE).
+        """
+        self.name: str = name
+        self.maxsize: int = maxsize
+        self.items: dict[str, tuple[Any, int]] = {}
+        self.condition: threading.Condition = threading.Condition()
+        self.closed: bool = False
+        self.put_count: int = 0
+        self.stale_count: int = 0
+        self.rejected_count: int = 0
+        self.taken_count: int = 0
+        self.max_depth: int = 0
+        self.total_wait_ns: int = 0
+        self.max_wait_ns: int = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def put(self, key: str, item: Any) -> bool:
+        """
+        Put the latest item for a key, replacing a waiting item for the same key.
+
+        Parameters
+        ----------
+        key : str
+            The key of the item, e.g. the robot id.
+        item : Any
+            The item.
+
+        Returns
+        -------
+        bool
+            True if the item was put, False if the mailbox was full.
+        """
+        now = time.perf_counter_ns()
+        with self.condition:
+            if key in self.items:
+                self.stale_count += 1
+            elif len(self.items) >= self.maxsize:
+                self.rejected_count += 1
+                return False
+            self.items[key] = (item, now)
+            self.put_count += 1
+            self.max_depth = max(self.max_depth, len(self.items))
+            self.condition.notify()
+        return True
+
+    def send_msg_to(self, dest_client_id: str, msg: Any):
+        """
+        Put a message for a client, so the mailbox can replace the client of a SpeedAdjustor.
+
+        Parameters
+        ----------
+        dest_client_id : str
+            The id of the receiver.
+        msg : Any
+            The message.
+
+        Raises
+        ------
+        queue.Full
+            If the mailbox is full, so the sender knows the message was not sent.
+        """
+        if not self.put(dest_client_id, msg):
+            raise queue.Full
+
+    def take_all(self, timeout: float | None = None) -> list[tuple[str, Any]]:
+        """
+        Wait for items and take all waiting items at once.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Longest time to wait in seconds, None to wait until an item is put or the mailbox is closed.
+
+        Returns
+        -------
+        list[tuple[str, Any]]
+            The key and item of the waiting items in the order their keys were put, empty if the timeout expired.
+        """
+        with self.condition:
+            if not self.items and not self.closed:
+                self.condition.wait(timeout)
+            items = self.items
+            self.items = {}
+        now = time.perf_counter_ns()
+        for _, put_time in items.values():
+            self.total_wait_ns += now - put_time
+            self.max_wait_ns = max(self.max_wait_ns, now - put_time)
+        self.taken_count += len(items)
+        return [(key, item) for key, (item, _) in items.items()]
+
+    def close(self):
+        """
+        Wake up the stage waiting in take_all, e.g. to stop the pipeline.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def summary(self) -> str:
+        """
+        Returns
+        -------
+        str
+            The depth, the numbers of put, stale and rejected items, and the time the items waited.
+        """
+        average_wait = self.total_wait_ns / self.taken_count / 1e6 if self.taken_count else 0
+        return (f"{self.name}: depth {len(self.items)} (max {self.max_depth}), {self.put_count} in, "
+                f"{self.stale_count} stale, {self.rejected_count} rejected, "
+                f"wait {average_wait:.2f} ms avg {self.max_wait_ns / 1e6:.2f} ms max")
+
+
+class CoordinatorPipeline:
+    """
+    Runs a Coordinator as a pipeline of a receiver, a compute worker and a sender thread.
+
+    The receiver takes the messages from the client, forwards them to the GUI and puts the decoded positions
+    into the positions mailbox. The compute worker takes the latest position of every robot, updates the track
+    order and lets the SpeedAdjustor put the speed factors into the outbox. The sender sends them to the robots.
+
+    Attributes
+    ----------
+    coordinator : Coordinator
+        The coordinator whose client, receiver and speed adjustor the stages use.
+    positions : LatestMailbox
+        The latest decoded position message of every robot, between the receiver and the compute worker.
+    outbox : LatestMailbox
+        The latest speed factor message of every robot, between the compute worker and the sender.
+        Pass it to Coordinator.init_speed_adjustor as the client of the SpeedAdjustor.
+    busy_ns : dict[str, int]
+        Time in ns every stage spent working, by stage name.
+    errors : dict[str, int]
+        Number of messages a stage failed to handle and skipped, by stage name.
+    failure : BaseException or None
+        The error that ended a stage thread, which stops the whole pipeline.
+    """
+
+    def __init__(self, coordinator: 'Coordinator', maxsize: int = MAILBOX_SIZE):
+        """
+        CoordinatorPipeline constructor. The client of the coordinator must be initialized.
+
+        Parameters
+        ----------
+        coordinator : Coordinator
+            The coordinator to run.
+        maxsize : int, optional
+            Most robots the mailboxes hold an item for (default is MAILBOX_SIZE).
+        """
+        self.coordinator: 'Coordinator' = coordinator
+        self.positions: LatestMailbox = LatestMailbox("positions", maxsize)
+        self.outbox: LatestMailbox = LatestMailbox("speed factors", maxsize)
+        self.busy_ns: dict[str, int] = {"receiver": 0, "compute": 0, "sender": 0}
+        self.stopped: threading.Event = threading.Event()
+        self.start_time: float = time.perf_counter()
+        self.errors: dict[str, int] = {"receiver": 0, "compute": 0, "sender": 0}
+        self.failure: BaseException | None = None
+        self.threads: list[threading.Thread] = [
+            threading.Thread(target=self.__run_stage, args=("receiver", self.__receive), name="coordinator receiver",
+                             daemon=True),
+            threading.Thread(target=self.__run_stage, args=("compute", self.__compute), name="coordinator compute",
+                             daemon=True),
+            threading.Thread(target=self.__run_stage, args=("sender", self.__send), name="coordinator sender",
+                             daemon=True),
+        ]
+        if coordinator.receiver is not None:
+            coordinator.receiver.reporters.append(self.summary)
+
+    def start(self):
+        """
+        Start the threads of the stages.
+        """
+        self.start_time = time.perf_counter()
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """
+        Stop the stages and wait for their threads to finish.
+        """
+        self.stopped.set()
+        self.positions.close()
+        self.outbox.close()
+        for thread in self.threads:
+            if thread.is_alive():
+                thread.join()
+
+    def run(self):
+        """
+        Start the stages and block until the pipeline is stopped or interrupted.
+
+        Raises
+        ------
+        RuntimeError
+            If a stage thread ended with an error, which stopped the pipeline.
+        """
+        self.start()
+        try:
+            while not self.stopped.wait(STOP_TIMEOUT):
+                pass
+        finally:
+            self.stop()
+        if self.failure is not None:
+            raise RuntimeError("a stage of the coordinator pipeline failed") from self.failure
+
+    def summary(self) -> str:
+        """
+        Returns
+        -------
+        str
+            The statistics of both mailboxes, the share of the time every stage was busy and its errors.
+        """
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        busy = ", ".join(f"{stage} {busy_ns / 1e9 / elapsed:.0%}" for stage, busy_ns in self.busy_ns.items())
+        errors = ", ".join(f"{stage} {count}" for stage, count in self.errors.items())
+        return f"{self.positions.summary()}; {self.outbox.summary()}; busy {busy}; errors {errors}"
+
+    def __run_stage(self, name: str, loop: Callable[[], None]):
+        """
+        Run the loop of a stage. If it ends with an error, keep the error and stop the other stages,
+        so the pipeline does not keep running without the stage.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage.
+        loop : Callable[[], None]
+            The loop of the stage, which returns when the pipeline is stopped.
+        """
+        try:
+            loop()
+        except BaseException as error:
+            print(f"[{name}] stage of the coordinator pipeline failed: {error!r}")
+            self.failure = error
+            self.stopped.set()
+            self.positions.close()
+            self.outbox.close()
+
+    def __skip(self, name: str, error: Exception):
+        """
+        Count and log a message a stage failed to handle.
+        """
+        self.errors[name] += 1
+        print(f"[{name}] skipping message ({self.errors[name]} so far): {error!r}")
+
+    def __receive(self):
+        """
+        Receiver stage: forward every message to the GUI and put the decoded positions into the mailbox.
+        """
+        coordinator = self.coordinator
+        while not self.stopped.is_set():
+            messages = coordinator.receiver.receive_all(STOP_TIMEOUT)
+            start = time.perf_counter_ns()
+            for msg in messages:
+                try:
+                    # Messages that can't be decoded are counted in coordinator.invalid_messages
+                    position_message = coordinator.decode_message(msg)
+                    coordinator.forward_to_gui(msg, position_message)
+                    if position_message is not None:
+                        self.positions.put(position_message.robot_id, position_message)
+                except Exception as error:
+                    self.__skip("receiver", error)
+            self.busy_ns["receiver"] += time.perf_counter_ns() - start
+
+    def __compute(self):
+        """
+        Compute worker stage: apply the latest position of every robot and queue the speed factors.
+        """
+        coordinator = self.coordinator
+        while not self.stopped.is_set():
+            position_messages = self.positions.take_all(STOP_TIMEOUT)
+            if not position_messages:
+                continue
+            start = time.perf_counter_ns()
+            for _, position_message in position_messages:
+                try:
+                    coordinator.update_position(position_message)
+                except Exception as error:
+                    self.__skip("compute", error)
+            coordinator.speed_adjustor.flush()
+            self.busy_ns["compute"] += time.perf_counter_ns() - start
+
+    def __send(self):
+        """
+        Sender stage: send the latest speed factor message of every robot.
+        """
+        client = self.coordinator.client
+        while not self.stopped.is_set():
+            messages = self.outbox.take_all(STOP_TIMEOUT)
+            start = time.perf_counter_ns()
+            for robot_id, msg in messages:
+                try:
+                    client.send_msg_to(robot_id, msg)
+                except Exception as error:
+                    self.__skip("sender", error)
+            self.busy_ns["sender"] += time.perf_counter_ns() - start
@@ -12,14 +12,28 @@ Date:
     18 May 2025
 """
 
+import queue
+import time
+from typing import Callable
+
 from unifr_api_epuck.communication.socket_client_communication import SocketClientCommunication
 
+MIN_SPEED_FACTOR: float = -0.5
+MAX_SPEED_FACTOR: float = 2.0
+STOP_SPEED_FACTOR: float = 0.01  # sent instead of 0, a robot at or below it is stopped
+
 
 class SpeedAdjustor:
     """
     Class to adjust the speed of the robots to keep the optimal distance to the next robot.
     Calculates the speed factor to reach the optimal distance and sends it to the robot.
 
+    To save radio traffic and message handling on the robots, a speed factor is only sent if it differs
+    from the last factor sent to the robot by more than the deadband, if it reached a bound of the speed factor,
+    if it enters or leaves the stop region (at or below STOP_SPEED_FACTOR) or changes its sign,
+    or if nothing was sent to the robot for max_silence seconds. Speed factors queued with queue_speed_factor
+    are coalesced, so only the latest factor per robot is considered when they are flushed.
+
     Attributes
     ----------
     client : SocketClientCommunication
@@ -29,9 +43,29 @@ class SpeedAdjustor:
     sensitivity_range : float
         Determines how sensitive the speed factor is to the distance to the next robot.
         The speed factor at the optimal distance is 1.0, and the speed at optimal distance - sensitivity_range is 0.
+    deadband : float
+        Smallest change of the speed factor that is sent to a robot.
+    max_silence : float
+        Longest time in seconds without sending the speed factor to a robot, even if it did not change.
+    clock : Callable[[], float]
+        Clock in seconds to measure the silence.
+    last_sent : dict[str, tuple[float, float]]
+        The last speed factor sent to each robot and the time it was sent, by robot id.
+    pending : dict[str, float]
+        The latest queued speed factor of each robot, sent on the next flush.
+    sent_messages : int
+        Number of speed factors sent.
+    suppressed_messages : int
+        Number of speed factors not sent, as they were within the deadband of the last factor sent.
+    coalesced_messages : int
+        Number of queued speed factors replaced by a later factor before they were flushed.
+    failed_messages : int
+        Number of speed factors the client refused with queue.Full, e.g. the full outbox of a CoordinatorPipeline.
+        They are not remembered as sent, so the next factor for the robot is not held back by the deadband.
     """
 
-    def __init__(self, client: SocketClientCommunication, optimal_distance: float, sensitivity_range: float = 0.25):
+    def __init__(self, client: SocketClientCommunication, optimal_distance: float, sensitivity_range: float = 0.25,
+                 deadband: float = 0.05, max_silence: float = 2.0, clock: Callable[[], float] = time.monotonic):
         """
         SpeedAdjustor constructor.
 
@@ -44,10 +78,25 @@ class SpeedAdjustor:
         sensitivity_range : float, optional
             Determines how sensitive the speed factor is to the distance to the next robot.
             The speed factor at the optimal distance is 1.0, and the speed at optimal distance - sensitivity_range is 0.
+        deadband : float, optional
+            Smallest change of the speed factor that is sent to a robot (default is 0.05).
+        max_silence : float, optional
+            Longest time in seconds without sending the speed factor to a robot (default is 2.0).
+        clock : Callable[[], float], optional
+            Clock in seconds to measure the silence (default is time.monotonic).
         """
         self.optimal_distance = optimal_distance
         self.client = client
         self.sensitivity_range = sensitivity_range
+        self.deadband: float = deadband
+        self.max_silence: float = max_silence
+        self.clock: Callable[[], float] = clock
+        self.last_sent: dict[str, tuple[float, float]] = {}
+        self.pending: dict[str, float] = {}
+        self.sent_messages: int = 0
+        self.suppressed_messages: int = 0
+        self.coalesced_messages: int = 0
+        self.failed_messages: int = 0
 
     def calculate_speed_factor_to_reach_optimal_distance(self, distance_to_next_robot: float) -> float | None:
         """
@@ -73,15 +122,16 @@ class SpeedAdjustor:
         x = distance_to_next_robot - self.optimal_distance
         m = (1 / self.optimal_distance) / self.sensitivity_range
         speed_factor = m * x + 1.0
-        bounded_speed_factor = max(-0.5, min(speed_factor, 2.0))
+        bounded_speed_factor = max(MIN_SPEED_FACTOR, min(speed_factor, MAX_SPEED_FACTOR))
         if bounded_speed_factor == 0.0:
-            bounded_speed_factor = 0.01  # needed as else the robot can't receive the message
+            bounded_speed_factor = STOP_SPEED_FACTOR  # needed as else the robot can't receive the message
 
         return bounded_speed_factor
 
     def send_speed_factor(self, robot_id: str, distance_to_next_robot: float):
         """
-        Send the speed factor to the robot.
+        Send the speed factor to the robot, if it changed by more than the deadband
+        or nothing was sent to the robot for max_silence seconds.
 
         Parameters
         ----------
@@ -96,6 +146,84 @@ class SpeedAdjustor:
         """
         speed_factor = self.calculate_speed_factor_to_reach_optimal_distance(distance_to_next_robot)
         if speed_factor is not None:
-            self.client.send_msg_to(robot_id, {"speed_factor": speed_factor})
-            print(f"sending speed factor to {robot_id.split('_')[-1]}: {speed_factor}")
+            self.__send_if_changed(robot_id, speed_factor)
+
+    def queue_speed_factor(self, robot_id: str, distance_to_next_robot: float):
+        """
+        Queue the speed factor for the robot until the next flush, replacing a factor queued before.
 
+        Parameters
+        ----------
+        robot_id : str
+            The id of the robot, where the speed factor should be sent to.
+        distance_to_next_robot : float
+            The distance to the next robot in meters.
+
+        Returns
+        -------
+        None
+        """
+        speed_factor = self.calculate_speed_factor_to_reach_optimal_distance(distance_to_next_robot)
+        if speed_factor is not None:
+            if robot_id in self.pending:
+                self.coalesced_messages += 1
+            self.pending[robot_id] = speed_factor
+
+    def flush(self):
+        """
+        Send the queued speed factors, one per robot, with the same rules as send_speed_factor.
+
+        Returns
+        -------
+        None
+        """
+        pending, self.pending = self.pending, {}
+        for robot_id, speed_factor in pending.items():
+            self.__send_if_changed(robot_id, speed_factor)
+
+    def summary(self) -> str:
+        """
+        Summarize the counters of the sent and saved messages.
+
+        Returns
+        -------
+        str
+            The number of speed factors sent, suppressed, coalesced and failed.
+        """
+        return (f"speed factors: {self.sent_messages} sent, {self.suppressed_messages} within deadband, "
+                f"{self.coalesced_messages} coalesced, {self.failed_messages} failed")
+
+    def __send_if_changed(self, robot_id: str, speed_factor: float):
+        """
+        Send the speed factor to the robot, unless it is within the deadband of the last factor sent,
+        does not change whether the robot stops, reverses or drives forward at the bounds,
+        and the last factor was sent less than max_silence seconds ago.
+
+        Parameters
+        ----------
+        robot_id : str
+            The id of the robot, where the speed factor should be sent to.
+        speed_factor : float
+            The speed factor to send.
+        """
+        now = self.clock()
+        last = self.last_sent.get(robot_id)
+        if last is not None:
+            last_speed_factor, last_time = last
+            changed = abs(speed_factor - last_speed_factor) > self.deadband
+            # Always send when reaching a bound, even if the last factor was close
+            bound_reached = speed_factor != last_speed_factor and speed_factor in (MIN_SPEED_FACTOR, MAX_SPEED_FACTOR)
+            # Always send when the robot has to stop, start again or change its direction, e.g. 0.04 -> 0.01
+            stop_changed = (speed_factor <= STOP_SPEED_FACTOR) != (last_speed_factor <= STOP_SPEED_FACTOR)
+            sign_changed = (speed_factor < 0) != (last_speed_factor < 0)
+            if not (changed or bound_reached or stop_changed or sign_changed) and now - last_time < self.max_silence:
+                self.suppressed_messages += 1
+                return
+        try:
+            self.client.send_msg_to(robot_id, {"speed_factor": speed_factor})
+        except queue.Full:
+            self.failed_messages += 1
+            return
+        self.last_sent[robot_id] = (speed_factor, now)
+        self.sent_messages += 1
+        print(f"sending speed factor to {robot_id.split('_')[-1]}: {speed_factor}")
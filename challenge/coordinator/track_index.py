@@ -0,0 +1,152 @@
+"""
+Track Index Module
+
+This module provides the TrackIndex class, which assigns every beacon of a track the length of the track
+from the first beacon to it, so a position on the track becomes a single lap coordinate and the distance
+between two robots becomes one subtraction.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+from challenge.core.beacon import Beacon
+from challenge.core.position_on_track import PositionOnTrack
+
+
+class TrackIndex:
+    """
+    Cumulative arc length index over the beacons of a track, following their next_beacon links.
+
+    If the links close a loop, the lap coordinates are taken modulo the lap length and every robot is
+    ahead of every other robot. Otherwise, the track ends at the last beacon and a robot is only ahead
+    of the robots before it.
+
+    The index is rebuilt on its next use after the next_beacon of any beacon changed.
+
+    Attributes
+    ----------
+    origin : Beacon
+        The first beacon, at lap coordinate 0.
+    offsets : dict[str, float]
+        Length of the track from the origin to each beacon, by beacon name, in meters.
+    beacons : list[Beacon]
+        The beacons of the track, in the order they are driven from the origin.
+    lap_length : float or None
+        Length of the whole loop in meters, or None if the track is not a loop.
+    revision : int
+        The revision of the beacons the index was built for.
+    """
+
+    # Indexes shared by all lookups through for_beacon, by beacon
+    indexes: dict[Beacon, 'TrackIndex'] = {}
+
+    def __init__(self, origin: Beacon):
+        """
+        TrackIndex constructor.
+
+        Parameters
+        ----------
+        origin : Beacon
+            The first beacon of the track, at lap coordinate 0.
+        """
+        self.origin: Beacon = origin
+        self.offsets: dict[str, float] = {}
+        self.beacons: list[Beacon] = []
+        self.lap_length: float | None = None
+        self.revision: int = -1
+        self.rebuild()
+
+    @classmethod
+    def for_beacon(cls, beacon: Beacon) -> 'TrackIndex':
+        """
+        Get the shared index of the track the beacon is part of, building it on first use.
+
+        Parameters
+        ----------
+        beacon : Beacon
+            A beacon of the track.
+
+        Returns
+        -------
+        TrackIndex
+            An index containing the beacon.
+        """
+        index = cls.indexes.get(beacon)
+        if index is None or index.revision != Beacon.revision:
+            index = cls(beacon)
+            for indexed_beacon in index.beacons:
+                cls.indexes[indexed_beacon] = index
+        return index
+
+    def rebuild(self):
+        """
+        Walk the track from the origin once and store the offset of every beacon and the lap length.
+        """
+        self.offsets = {}
+        self.beacons = []
+        self.lap_length = None
+        offset = 0
+        beacon = self.origin
+        while beacon.name not in self.offsets:
+            self.offsets[beacon.name] = offset
+            self.beacons.append(beacon)
+            if beacon.next_beacon is None:
+                break
+            beacon, segment_length = beacon.next_beacon
+            offset += segment_length
+        else:
+            if beacon is self.origin:
+                self.lap_length = offset
+        self.revision = Beacon.revision
+
+    def coordinate(self, position: PositionOnTrack) -> float | None:
+        """
+        Compute the lap coordinate of a position, i.e. the length of the track from the origin to it.
+
+        Parameters
+        ----------
+        position : PositionOnTrack
+            The position on the track.
+
+        Returns
+        -------
+        float or None
+            The lap coordinate in meters, or None if the beacon of the position is unknown or not on this track.
+        """
+        if self.revision != Beacon.revision:
+            self.rebuild()
+        if position.from_beacon is None:
+            return None
+        offset = self.offsets.get(position.from_beacon.name)
+        if offset is None:
+            return None
+        coordinate = offset + position.distance
+        return coordinate % self.lap_length if self.lap_length else coordinate
+
+    def gap(self, rear_robot: PositionOnTrack, front_robot: PositionOnTrack) -> float | None:
+        """
+        Compute the distance along the track from the rear robot forward to the front robot.
+
+        Parameters
+        ----------
+        rear_robot : PositionOnTrack
+            PositionOnTrack object of the rear robot.
+        front_robot : PositionOnTrack
+            PositionOnTrack object of the front robot.
+
+        Returns
+        -------
+        float or None
+            Distance in meters between the two robots, or None if it cannot be computed.
+        """
+        rear = self.coordinate(rear_robot)
+        front = self.coordinate(front_robot)
+        if rear is None or front is None:
+            return None
+        if self.lap_length:
+            return (front - rear) % self.lap_length
+        return front - rear if front >= rear else None
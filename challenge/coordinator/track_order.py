@@ -0,0 +1,182 @@
+"""
+Track Order Module
+
+This module provides the TrackOrder class, which keeps the robots sorted by their position along the track,
+so the coordinator only has to look at the neighbours of a robot when its position changes.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import bisect
+
+from challenge.coordinator.track_index import TrackIndex
+from challenge.core.beacon import Beacon
+from challenge.core.position_on_track import PositionOnTrack
+
+
+class TrackOrder:
+    """
+    Keeps the robots in the order they drive on the track, as a sorted list of their lap coordinates
+    from the TrackIndex of the track. The track is a loop, so the robot ahead of the last robot is the first robot.
+
+    Updating the position of a robot finds its place by bisection and returns the robots whose robot ahead
+    or distance to it changed, i.e. the robot itself and the robots behind its old and its new place.
+
+    Attributes
+    ----------
+    track_index : TrackIndex
+        Converts the positions to lap coordinates.
+    keys : list[tuple[float, str]]
+        The lap coordinate and id of every placed robot, sorted along the track.
+    coordinates : dict[str, float]
+        The lap coordinate of every placed robot, by robot id, as it was when the robot was placed.
+    """
+
+    def __init__(self, beacons: list[Beacon]):
+        """
+        TrackOrder constructor.
+
+        Parameters
+        ----------
+        beacons : list[Beacon]
+            The beacons of the track, linked by their next_beacon. The first beacon is the origin of the coordinates.
+        """
+        self.track_index: TrackIndex = TrackIndex.for_beacon(beacons[0])
+        self.keys: list[tuple[float, str]] = []
+        self.coordinates: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def robots(self) -> list[str]:
+        """
+        Returns
+        -------
+        list[str]
+            The ids of the placed robots, sorted along the track from the first beacon.
+        """
+        return [robot_id for _, robot_id in self.keys]
+
+    def coordinate(self, position: PositionOnTrack) -> float | None:
+        """
+        Compute the lap coordinate of a position.
+
+        Parameters
+        ----------
+        position : PositionOnTrack
+            The position on the track.
+
+        Returns
+        -------
+        float or None
+            The lap coordinate in meters, or None if the position has no known beacon.
+        """
+        return self.track_index.coordinate(position)
+
+    def update(self, robot_id: str, position: PositionOnTrack) -> list[str]:
+        """
+        Move a robot to its new position, or remove it if the position has no known beacon.
+
+        Parameters
+        ----------
+        robot_id : str
+            The id of the robot.
+        position : PositionOnTrack
+            The new position of the robot.
+
+        Returns
+        -------
+        list[str]
+            The robots whose robot ahead or distance to it changed, without duplicates.
+        """
+        affected = []
+        if robot_id in self.coordinates:
+            rear = self.rear_of(robot_id)
+            if rear is not None:
+                affected.append(rear)
+            self.__remove(robot_id)
+        coordinate = self.coordinate(position)
+        if coordinate is not None:
+            bisect.insort(self.keys, (coordinate, robot_id))
+            self.coordinates[robot_id] = coordinate
+            affected.append(robot_id)
+            rear = self.rear_of(robot_id)
+            if rear is not None:
+                affected.append(rear)
+        return [robot for robot in dict.fromkeys(affected) if robot in self.coordinates]
+
+    def remove(self, robot_id: str) -> list[str]:
+        """
+        Remove a robot, e.g. when it stopped.
+
+        Parameters
+        ----------
+        robot_id : str
+            The id of the robot.
+
+        Returns
+        -------
+        list[str]
+            The robot behind the removed robot, whose robot ahead changed, if there is one.
+        """
+        if robot_id not in self.coordinates:
+            return []
+        rear = self.rear_of(robot_id)
+        self.__remove(robot_id)
+        return [rear] if rear is not None and rear in self.coordinates else []
+
+    def front_of(self, robot_id: str) -> str | None:
+        """
+        Get the robot ahead of a robot on the loop.
+
+        Parameters
+        ----------
+        robot_id : str
+            The id of a placed robot.
+
+        Returns
+        -------
+        str or None
+            The id of the robot ahead, or None if the robot is alone on the track.
+        """
+        index = self.__index(robot_id)
+        if len(self.keys) < 2:
+            return None
+        return self.keys[(index + 1) % len(self.keys)][1]
+
+    def rear_of(self, robot_id: str) -> str | None:
+        """
+        Get the robot behind a robot on the loop.
+
+        Parameters
+        ----------
+        robot_id : str
+            The id of a placed robot.
+
+        Returns
+        -------
+        str or None
+            The id of the robot behind, or None if the robot is alone on the track.
+        """
+        index = self.__index(robot_id)
+        if len(self.keys) < 2:
+            return None
+        return self.keys[index - 1][1]
+
+    def __index(self, robot_id: str) -> int:
+        """
+        Find the index of a placed robot in the sorted keys by bisection.
+        """
+        return bisect.bisect_left(self.keys, (self.coordinates[robot_id], robot_id))
+
+    def __remove(self, robot_id: str):
+        """
+        Remove a placed robot from the sorted keys.
+        """
+        del self.keys[self.__index(robot_id)]
+        del self.coordinates[robot_id]
@@ -28,7 +28,11 @@ class Beacon:
         Orientation of the robot at the beacon, when driving clockwise on the track (in radians).
     next_beacon : tuple[Beacon, float] or None
         Tuple containing the next beacon and the distance to it, when approached clockwise.
+    revision : int
+        Class attribute counting the changes of the next_beacon of any beacon, so indexes
+        over the track can detect that they are outdated.
     """
+    revision: int = 0
 
     def __init__(self, name: str, x: float, y: float, orientation: float, next_beacon: tuple['Beacon', float] = None):
         """
@@ -53,3 +57,19 @@ class Beacon:
         self.orientation: float = orientation
         self.next_beacon: tuple[Beacon, float] = next_beacon
 
+    @property
+    def next_beacon(self) -> tuple['Beacon', float] | None:
+        """
+        The next beacon and the distance to it, when approached clockwise.
+
+        Returns
+        -------
+        tuple[Beacon, float] or None
+            The next beacon and the distance to it in meters, or None if there is no next beacon.
+        """
+        return self._next_beacon
+
+    @next_beacon.setter
+    def next_beacon(self, next_beacon: tuple['Beacon', float] | None):
+        self._next_beacon = next_beacon
+        Beacon.revision += 1
@@ -0,0 +1,207 @@
+"""
+Position Message Module
+
+This module provides the compact binary encoding of the position messages the robot controllers send
+to the coordinator, and the decoding of both the binary and the former dictionary form.
+
+A binary message is a fixed-layout header followed by the robot id in UTF-8:
+
+    version (uint8), beacon index (uint8, 255 if no beacon), sequence number (uint32), timestamp in ns (int64),
+    distance from the beacon, x, y and theta (float32 each), all little-endian.
+
+The beacon index refers to the list of beacons shared by the robots and the coordinator,
+so the beacon is found without comparing names.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import struct
+
+from challenge.core.beacon import Beacon
+from challenge.core.position_on_track import PositionOnTrack, position_from_dict
+
+WIRE_VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<BBIqffff")
+NO_BEACON: int = 0xFF
+
+
+class PositionMessage:
+    """
+    A decoded position message of a robot.
+
+    Attributes
+    ----------
+    robot_id : str
+        The id of the robot that sent the message.
+    position_on_track : PositionOnTrack
+        The position of the robot on the track.
+    robot_position : list[float]
+        The position [x, y] of the robot from the odometry.
+    theta : float or None
+        The orientation of the robot in radians, None if the message did not contain it.
+    sequence : int or None
+        The number of the message, counting per robot, None if the message did not contain it.
+    timestamp : int or None
+        The time the message was sent, in ns of the robot's clock, None if the message did not contain it.
+    """
+
+    def __init__(self, robot_id: str, position_on_track: PositionOnTrack, robot_position: list[float],
+                 theta: float | None = None, sequence: int | None = None, timestamp: int | None = None):
+        """
+        PositionMessage constructor.
+
+        Parameters
+        ----------
+        robot_id : str
+            The id of the robot that sent the message.
+        position_on_track : PositionOnTrack
+            The position of the robot on the track.
+        robot_position : list[float]
+            The position [x, y] of the robot from the odometry.
+        theta : float, optional
+            The orientation of the robot in radians.
+        sequence : int, optional
+            The number of the message, counting per robot.
+        timestamp : int, optional
+            The time the message was sent, in ns of the robot's clock.
+        """
+        self.robot_id: str = robot_id
+        self.position_on_track: PositionOnTrack = position_on_track
+        self.robot_position: list[float] = robot_position
+        self.theta: float | None = theta
+        self.sequence: int | None = sequence
+        self.timestamp: int | None = timestamp
+
+    def to_dict(self) -> dict:
+        """
+        Convert the message to the dictionary form, e.g. for the GUI.
+
+        Returns
+        -------
+        dict
+            The message with the keys robot_id, robot_position and position_on_track,
+            and theta, sequence and timestamp if they are known.
+        """
+        msg = {"robot_id": self.robot_id, "robot_position": list(self.robot_position),
+               "position_on_track": self.position_on_track.to_dict()}
+        for key in ("theta", "sequence", "timestamp"):
+            if getattr(self, key) is not None:
+                msg[key] = getattr(self, key)
+        return msg
+
+
+class PositionCodec:
+    """
+    Encodes and decodes position messages for a list of beacons shared by the robots and the coordinator.
+
+    Attributes
+    ----------
+    beacons : list[Beacon]
+        The beacons of the track, their index in the list is sent instead of their name.
+    beacon_indexes : dict[str, int]
+        The index of every beacon, by beacon name.
+    """
+
+    def __init__(self, beacons: list[Beacon]):
+        """
+        PositionCodec constructor.
+
+        Parameters
+        ----------
+        beacons : list[Beacon]
+            The beacons of the track, in the same order on the robots and the coordinator.
+        """
+        if len(beacons) >= NO_BEACON:
+            raise ValueError(f"at most {NO_BEACON - 1} beacons can be encoded, got {len(beacons)}")
+        self.beacons: list[Beacon] = beacons
+        self.beacon_indexes: dict[str, int] = {beacon.name: index for index, beacon in enumerate(beacons)}
+
+    def encode(self, robot_id: str, position_on_track: PositionOnTrack, x: float, y: float, theta: float,
+               sequence: int, timestamp: int) -> bytes:
+        """
+        Encode a position message in the binary form.
+
+        Parameters
+        ----------
+        robot_id : str
+            The id of the robot.
+        position_on_track : PositionOnTrack
+            The position of the robot on the track.
+        x : float
+            The x position of the robot from the odometry.
+        y : float
+            The y position of the robot from the odometry.
+        theta : float
+            The orientation of the robot in radians.
+        sequence : int
+            The number of the message, wraps around at 2**32.
+        timestamp : int
+            The time the message is sent, in ns.
+
+        Returns
+        -------
+        bytes
+            The encoded message.
+        """
+        from_beacon = position_on_track.from_beacon
+        beacon_index = self.beacon_indexes[from_beacon.name] if from_beacon is not None else NO_BEACON
+        header = HEADER.pack(WIRE_VERSION, beacon_index, sequence & 0xFFFFFFFF, timestamp,
+                             position_on_track.distance, x, y, theta)
+        return header + robot_id.encode("utf-8")
+
+    def decode(self, msg: bytes | dict) -> PositionMessage | None:
+        """
+        Decode a position message in the binary or the dictionary form.
+
+        Parameters
+        ----------
+        msg : bytes or dict
+            The received message.
+
+        Returns
+        -------
+        PositionMessage or None
+            The decoded message, or None if the message is not a position message.
+
+        Raises
+        ------
+        ValueError
+            If a binary message has an unknown version or beacon index.
+        """
+        if isinstance(msg, (bytes, bytearray, memoryview)):
+            return self.__decode_binary(bytes(msg))
+        if not isinstance(msg, dict) or msg.get("position_on_track") is None:
+            return None
+        return PositionMessage(msg.get("robot_id"), position_from_dict(msg["position_on_track"], self.beacons),
+                               msg.get("robot_position"), msg.get("theta"), msg.get("sequence"), msg.get("timestamp"))
+
+    def __decode_binary(self, payload: bytes) -> PositionMessage:
+        """
+        Decode a message in the binary form.
+
+        Parameters
+        ----------
+        payload : bytes
+            The encoded message.
+
+        Returns
+        -------
+        PositionMessage
+            The decoded message.
+        """
+        if len(payload) < HEADER.size or payload[0] != WIRE_VERSION:
+            raise ValueError(f"unknown position message version {payload[0] if payload else None}")
+        version, beacon_index, sequence, timestamp, distance, x, y, theta = HEADER.unpack_from(payload)
+        if beacon_index == NO_BEACON:
+            from_beacon = None
+        elif beacon_index < len(self.beacons):
+            from_beacon = self.beacons[beacon_index]
+        else:
+            raise ValueError(f"unknown beacon index {beacon_index}")
+        return PositionMessage(payload[HEADER.size:].decode("utf-8"), PositionOnTrack(distance, from_beacon),
+                               [x, y], theta, sequence, timestamp)
@@ -0,0 +1,157 @@
+"""
+actuator_cache.py
+
+Suppresses redundant motor and LED commands to the ePuck robot by remembering the last commanded state.
+The commands are sent holding the robot I/O lock, which a SensorPrefetcher holds while calling go_on,
+so a command packet is never sent while it is only partly updated.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import threading
+from time import perf_counter_ns
+from typing import Callable
+
+
+class ActuatorCache:
+    """
+    The ActuatorCache class wraps a robot and only forwards set_speed and LED commands that change
+    the commanded state. Optionally, an unchanged command is repeated after a keep-alive period.
+    All other attributes are passed through to the robot, so the cache can be used wherever a robot is expected.
+
+    Attributes:
+        robot: The wrapped robot instance.
+        keep_alive_ns (int | None): Period in ns after which an unchanged command is sent again, never if None.
+        sent (int): Number of commands forwarded to the robot.
+        suppressed (int): Number of commands that did not change anything and were dropped.
+        lock (threading.RLock): Robot I/O lock, held while a command is written to the robot.
+            Share it with the sensor reader and hold it around other robot calls, e.g. of the camera.
+    """
+
+    def __init__(self, robot, keep_alive_ns: int | None = None, clock: Callable[[], int] = perf_counter_ns,
+                 lock: 'threading.RLock | None' = None):
+        """
+        Initialize the ActuatorCache.
+
+        Args:
+            robot: The robot instance to send the commands to.
+            keep_alive_ns (int | None): Period in ns after which an unchanged command is sent again. Defaults to None.
+            clock (Callable[[], int]): Clock in ns for the keep-alive period.
+            lock (threading.RLock | None): Robot I/O lock, a new one if None.
+        """
+        self.robot = robot
+        self.keep_alive_ns: int | None = keep_alive_ns
+        self.clock: Callable[[], int] = clock
+        self.state: dict[object, tuple] = {}  # last commanded state per actuator
+        self.last_sent_ns: dict[object, int] = {}
+        self.sent: int = 0
+        self.suppressed: int = 0
+        self.lock: threading.RLock = lock if lock is not None else threading.RLock()
+
+    def __getattr__(self, name: str):
+        """
+        Pass all attributes that are not cached through to the robot.
+        """
+        return getattr(self.robot, name)
+
+    def should_send(self, actuator, state: tuple) -> bool:
+        """
+        Check if a command changes the state of an actuator or its keep-alive period is over,
+        and remember it as sent if so.
+
+        Args:
+            actuator: Key of the actuator, e.g. "speed" or the LED position.
+            state (tuple): The commanded state.
+
+        Returns:
+            bool: True if the command has to be sent, False if it can be suppressed.
+        """
+        now = self.clock() if self.keep_alive_ns is not None else 0
+        if self.state.get(actuator) == state and (
+                self.keep_alive_ns is None or now - self.last_sent_ns[actuator] < self.keep_alive_ns):
+            self.suppressed += 1
+            return False
+        self.state[actuator] = state
+        self.last_sent_ns[actuator] = now
+        self.sent += 1
+        return True
+
+    def set_speed(self, speed_left: float, speed_right: float | None = None):
+        """
+        Set the speed of the wheels, if it differs from the last commanded speed.
+
+        Args:
+            speed_left (float): Speed of the left wheel.
+            speed_right (float | None): Speed of the right wheel, same as the left one if None.
+        """
+        if speed_right is None:
+            speed_right = speed_left
+        if self.should_send("speed", (speed_left, speed_right)):
+            with self.lock:
+                self.robot.set_speed(speed_left, speed_right)
+
+    def enable_led(self, led_position: int, red: int | None = None, green: int | None = None,
+                   blue: int | None = None):
+        """
+        Turn on an LED, if it is not already on with the same colour.
+
+        Args:
+            led_position (int): Position of the LED between 0 and 7.
+            red (int | None): Red intensity between 0 and 100, only for RGB LEDs.
+            green (int | None): Green intensity between 0 and 100, only for RGB LEDs.
+            blue (int | None): Blue intensity between 0 and 100, only for RGB LEDs.
+        """
+        if self.should_send(led_position, (True, red, green, blue)):
+            with self.lock:
+                self.robot.enable_led(led_position, red, green, blue)
+
+    def disable_led(self, led_position: int):
+        """
+        Turn off an LED, if it is not already off.
+
+        Args:
+            led_position (int): Position of the LED between 0 and 7.
+        """
+        if self.should_send(led_position, (False,)):
+            with self.lock:
+                self.robot.disable_led(led_position)
+
+    def enable_all_led(self):
+        for i in range(self.robot.LED_COUNT_ROBOT):
+            self.enable_led(i)
+
+    def disable_all_led(self):
+        for i in range(self.robot.LED_COUNT_ROBOT):
+            self.disable_led(i)
+
+    def enable_body_led(self):
+        if self.should_send("body", (True,)):
+            with self.lock:
+                self.robot.enable_body_led()
+
+    def disable_body_led(self):
+        if self.should_send("body", (False,)):
+            with self.lock:
+                self.robot.disable_body_led()
+
+    def invalidate(self):
+        """
+        Forget the commanded state, so the next command to every actuator is sent.
+        Needed if the robot was commanded without going through the cache.
+        """
+        self.state.clear()
+        self.last_sent_ns.clear()
+
+    def summary(self) -> str:
+        """
+        Returns:
+            str: The number of sent and suppressed commands.
+        """
+        total = self.sent + self.suppressed
+        share = self.suppressed / total * 100 if total else 0
+        return f"actuator commands: {self.sent} sent, {self.suppressed} suppressed ({share:.1f}%)"
@@ -11,116 +11,169 @@ Date:
     18 May 2025
 """
 
+import math
+
+import numpy as np
+
 from challenge.core.beacon import Beacon
 from challenge.robot.grey_area import GreyArea
+from challenge.robot.ground_classifier import HAS_GREY
+from challenge.robot.run_index import Run, RunIndex
+
+# Symbols of the grey areas in a beacon pattern
+SHORT_GREY_AREA: int = 1
+LONG_GREY_AREA: int = 2
 
 
 class BeaconDetector:
     """
     The BeaconDetector class is responsible for detecting beacons on the track
-    by analyzing the ground sensor values of the robot. It keeps track of the
-    number and length of grey areas passed, and determines when a beacon is detected
-    based on predefined beacon patterns.
+    by analyzing the ground codes of the robot's GroundClassifier.
+
+    The grey flags of the ground are run-length encoded into a RunIndex, measuring the runs in travelled distance
+    if the GreyArea is distance based, or in steps otherwise. Every grey run long enough
+    to be a grey area adds a symbol (SHORT_GREY_AREA or LONG_GREY_AREA) to the pattern of the current
+    possible beacon. Once the robot has been off grey for long enough, the pattern is looked up in the beacons.
+    Online, each step only extends the current run. Offline, whole recordings are matched run by run.
     """
 
-    def __init__(self, grey_area: GreyArea, grey_min_value: int,
-                 grey_max_value: int, beacons: dict[int, Beacon]):
+    def __init__(self, grey_area: GreyArea, beacons: dict[int | tuple[int, ...], Beacon]):
         """
         Initialize the BeaconDetector.
 
         Args:
             grey_area (GreyArea): GreyArea object to define a gray area.
-            grey_min_value (int): Minimum value of the ground to be considered grey.
-            grey_max_value (int): Maximum value of the ground to be considered grey.
-            beacons (dict[int, Beacon]): Dictionary of beacons on the track,
-                where the key is the number of grey areas of the beacon
-                and the value is the Beacon object.
-        """
-        self.grey_length: int = 0  # Length of the grey area the robot is currently in
-        self.grey_distance: int = 0  # Distance from the last grey area
-        self.grey_area_count: int = 0  # Number of grey areas passed in the current possible beacon
+            beacons (dict[int | tuple[int, ...], Beacon]): Dictionary of beacons on the track, where the key is
+                either the pattern of the grey areas of the beacon, as a tuple of SHORT_GREY_AREA and LONG_GREY_AREA,
+                or the number of grey areas of any length, and the value is the Beacon object.
+        """
+        self.runs: RunIndex = RunIndex(max_runs=2)  # Runs of grey and not grey ground, only the last two are needed
+        self.pattern: list[int] = []  # Symbols of the grey areas passed in the current possible beacon
         self.__new_beacon_event: bool = False  # True if a new beacon was found
         self.last_beacon: Beacon | None = None  # The last beacon that was detected
 
         self.grey_area: GreyArea = grey_area
-        self.grey_min_value: int = grey_min_value
-        self.grey_max_value: int = grey_max_value
-        self.beacons: dict[int, Beacon] = beacons
+        self.beacons: dict[int | tuple[int, ...], Beacon] = beacons
+
+    @property
+    def grey_area_count(self) -> int:
+        """
+        Returns:
+            int: Number of grey areas passed in the current possible beacon.
+        """
+        return len(self.pattern)
 
     def reset(self):
         """
         Reset the detector to its initial state.
-        Resets the grey area length, distance, and area count.
+        Forgets the grey areas of the current possible beacon.
         """
-        self.grey_length = 0
-        self.grey_distance = 0
-        self.grey_area_count = 0
+        self.pattern = []
 
-    def receive_ground(self, gs: list[int]):
+    def receive_ground(self, ground_code: int, distance: float = 1):
         """
-        Receive the ground sensor values and check if the robot is in a grey area.
+        Receive the ground code and check if the robot is in a grey area.
         Updates the detector state based on the sensor readings.
 
         Args:
-            gs (list[int]): List of the ground sensor values.
+            ground_code (int): The ground code of the ground sensor values.
+            distance (float): The distance travelled since the previous ground code, in m if the GreyArea
+                is distance based. Defaults to 1 step.
         """
-        # Check if any ground sensor is in the grey area
-        if any([self.in_grey(x) for x in gs]):
-            self.handle_on_grey()
-        else:
-            self.handle_off_grey()
+        finished_run = self.runs.append(HAS_GREY[ground_code], distance)
+        # If the robot just left a grey area, check if it was long enough to count
+        if finished_run is not None and finished_run.label:
+            self.handle_grey_run(finished_run)
 
         # After updating state, check if a beacon has been detected
         self.check_for_beacon_detection()
 
+    def handle_grey_run(self, run: Run, verbose: bool = True):
+        """
+        Add a finished grey run to the pattern of the current possible beacon, if it is long enough to be a grey area.
+
+        Args:
+            run (Run): The grey run the robot just left.
+            verbose (bool): If True, print the length of the grey area.
+        """
+        if run.distance >= self.grey_area.grey_min_length():
+            if verbose:
+                print(f"grey length: {run.distance:g}")
+            self.pattern.append(LONG_GREY_AREA if run.distance >= self.grey_area.grey_long_length() else SHORT_GREY_AREA)
+
     def check_for_beacon_detection(self):
         """
         Check if the robot has passed enough grey areas to detect a beacon.
         If a beacon is detected, set the event flag and store the beacon.
         """
         # If the distance since the last grey area exceeds the threshold, check for beacon
-        if self.grey_distance >= self.grey_area.grey_distance_max():
-            detected_beacon: Beacon = self.beacons.get(self.grey_area_count)
+        run = self.runs.current
+        if self.pattern and not run.label and run.distance >= self.grey_area.grey_distance_max():
+            detected_beacon = self.match(self.pattern)
             if detected_beacon is not None:
                 self.__new_beacon_event = True
                 self.last_beacon = detected_beacon
             self.reset()
 
-    def handle_off_grey(self):
-        """
-        Handle the case when the robot is not in a grey area.
-        Increments the grey area count if a valid grey area was just left,
-        and increases the distance from the last grey area.
+    def match(self, pattern: list[int]) -> Beacon | None:
         """
-        # If the robot just left a grey area, check if it was long enough to count
-        if self.grey_length > 0:
-            if self.grey_length >= self.grey_area.grey_min_length():
-                print(f"grey length: {self.grey_length}")
-                self.grey_area_count += 1
-            self.grey_length = 0
-        # If any grey areas have been counted, increment the distance since last
-        if self.grey_area_count > 0:
-            self.grey_distance += 1
+        Look up the beacon of a pattern of grey areas, first by the exact pattern, then by the number of grey areas.
 
-    def handle_on_grey(self):
-        """
-        Handle the case when the robot is in a grey area.
-        Increments the current grey area length and resets the distance from the last grey area.
+        Args:
+            pattern (list[int]): The symbols of the grey areas.
+
+        Returns:
+            Beacon | None: The matching beacon, or None if there is none.
         """
-        self.grey_length += 1
-        self.grey_distance = 0
+        beacon = self.beacons.get(tuple(pattern))
+        return beacon if beacon is not None else self.beacons.get(len(pattern))
 
-    def in_grey(self, value: int) -> bool:
+    def detect_offline(self, grey: np.ndarray, distances: np.ndarray | None = None) -> list[tuple[int, Beacon]]:
         """
-        Check if the value is in the grey area.
+        Detect the beacons in a whole recording at once, with the same results as receiving it step by step.
+        Works run by run instead of step by step, and does not change the online state of the detector.
+
+        Args:
+            grey (np.ndarray): For every step, True if any ground sensor is grey.
+            distances (np.ndarray | None): The distance travelled in every step, in m if the GreyArea
+                is distance based. Defaults to 1 step per step.
+
+        Returns:
+            list[tuple[int, Beacon]]: The steps where a beacon was detected, with the beacon.
+        """
+        detector = BeaconDetector(self.grey_area, self.beacons)
+        distance_max = self.grey_area.grey_distance_max()
+        events = []
+        for run in RunIndex.from_labels(grey, distances).runs:
+            if run.label:
+                # Runs at the end of the recording are not finished, like online
+                if run.end < len(grey):
+                    detector.handle_grey_run(run, verbose=False)
+            elif detector.pattern and run.distance >= distance_max:
+                detected_beacon = detector.match(detector.pattern)
+                if detected_beacon is not None:
+                    # Detected in the step where the run reached the maximum distance
+                    events.append((run.start + self.__steps_to_reach(run, distances, distance_max), detected_beacon))
+                detector.reset()
+        return events
+
+    @staticmethod
+    def __steps_to_reach(run: Run, distances: np.ndarray | None, distance: float) -> int:
+        """
+        Find the step of a run in which the distance travelled since the start of the run reached a distance.
 
         Args:
-            value (int): Value of one of the ground sensors.
+            run (Run): The run, which travelled at least the distance.
+            distances (np.ndarray | None): The distance travelled in every step, or None for 1 per step.
+            distance (float): The distance to reach.
 
         Returns:
-            bool: True if the value is in the grey area, False otherwise.
+            int: The index of the step within the run.
         """
-        return self.grey_min_value <= value <= self.grey_max_value
+        if distances is None:
+            return max(math.ceil(distance), 1) - 1
+        travelled = np.cumsum(distances[run.start:run.end])
+        return int(np.argmax(travelled >= distance))
 
     def new_beacon_found(self) -> bool:
         """
@@ -0,0 +1,209 @@
+"""
+calibration_store.py
+
+Stores the odometry calibration of the ePuck robots in a JSON file shared by all robot controllers.
+
+The controllers started by the coordinator run in separate processes and may calibrate at the same time,
+so every change is made under an exclusive file lock, on the latest content of the file, and written to
+a temporary file that atomically replaces the calibration file. Readers never see a partially written file.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import json
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CALIBRATION_FILE: str = "calibrate.json"
+MAX_HISTORY: int = 50  # measurements kept per robot and segment
+RECENT_MEASUREMENTS: int = 10  # latest measurements of a robot combined into its correction factors
+
+
+class CalibrationStore:
+    """
+    The CalibrationStore keeps the history of the calibration measurements of every robot per segment
+    between two beacons, e.g. "beacon1->beacon2", and the correction factors derived from them:
+
+        {"<robot id>": {"distance_correction_factor": 1.02, "theta_correction_factor": 0.98,
+                        "segments": {"beacon1->beacon2": [{"distance_correction_factor": 1.02,
+                                                           "theta_correction_factor": 0.98,
+                                                           "time": 1760000000.0}, ...]}}}
+
+    The correction factors of a robot are the medians of its latest measurements over all segments,
+    so a single bad measurement, e.g. after a missed beacon, does not spoil the calibration.
+    Files in the former format with one measurement per robot are read as a history of one measurement.
+
+    Loading is cached and only parses the file again if its modification time or size changed.
+    """
+
+    def __init__(self, path: str = CALIBRATION_FILE):
+        """
+        Initialize the CalibrationStore.
+
+        Args:
+            path (str): Path of the calibration file. Defaults to calibrate.json in the working directory.
+        """
+        self.path: str = path
+        self.lock_path: str = path + ".lock"
+        self.cache: dict = {}
+        self.cache_key: tuple[int, int] | None = None  # modification time and size of the cached file
+
+    def load(self) -> dict:
+        """
+        Get the content of the calibration file, parsing it only if it changed since the last load.
+
+        Returns:
+            dict: The calibrations by robot id, empty if there is no calibration file.
+                Do not modify it, it is shared with later loads.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.cache, self.cache_key = {}, None
+            return self.cache
+        key = (stat.st_mtime_ns, stat.st_size)
+        if key != self.cache_key:
+            with open(self.path, "r") as f:
+                self.cache = upgrade(json.load(f))
+            self.cache_key = key
+        return self.cache
+
+    def factors(self, robot_id: str) -> tuple[float, float] | None:
+        """
+        Get the correction factors of a robot.
+
+        Args:
+            robot_id (str): The robot's unique identifier.
+
+        Returns:
+            tuple[float, float] | None: The distance and theta correction factors, None if the robot
+                was never calibrated.
+        """
+        calibration = self.load().get(robot_id)
+        if calibration is None:
+            return None
+        return calibration["distance_correction_factor"], calibration["theta_correction_factor"]
+
+    def record(self, robot_id: str, from_beacon: str, to_beacon: str, distance_correction_factor: float,
+               theta_correction_factor: float):
+        """
+        Add a measurement of a robot on the segment between two beacons, and update its correction factors.
+        Safe to call from several processes at the same time, no measurement is lost.
+
+        Args:
+            robot_id (str): The robot's unique identifier.
+            from_beacon (str): Name of the beacon at the start of the segment.
+            to_beacon (str): Name of the beacon at the end of the segment.
+            distance_correction_factor (float): Correction factor for distance.
+            theta_correction_factor (float): Correction factor for orientation.
+        """
+        measurement = {"distance_correction_factor": distance_correction_factor,
+                       "theta_correction_factor": theta_correction_factor,
+                       "time": time.time()}
+        with self.__locked():
+            # Read the file again, the mtime may not have changed if another process wrote within its resolution
+            self.cache_key = None
+            calibrations = dict(self.load())
+            calibration = dict(calibrations.get(robot_id, {"segments": {}}))
+            segments = dict(calibration["segments"])
+            history = segments.get(f"{from_beacon}->{to_beacon}", []) + [measurement]
+            segments[f"{from_beacon}->{to_beacon}"] = history[-MAX_HISTORY:]
+            calibration["segments"] = segments
+            calibration.update(combine(segments))
+            calibrations[robot_id] = calibration
+            self.__write(calibrations)
+
+    @contextmanager
+    def __locked(self) -> Iterator[None]:
+        """
+        Hold an exclusive lock on the lock file next to the calibration file, waiting for other processes.
+        """
+        with open(self.lock_path, "a+") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __write(self, calibrations: dict):
+        """
+        Write the calibrations to a temporary file and rename it to the calibration file.
+
+        Args:
+            calibrations (dict): The calibrations by robot id.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary_path = tempfile.mkstemp(prefix=".calibrate-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(calibrations, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        self.cache = calibrations
+        stat = os.stat(self.path)
+        self.cache_key = (stat.st_mtime_ns, stat.st_size)
+
+
+def combine(segments: dict[str, list[dict]]) -> dict[str, float]:
+    """
+    Combine the latest measurements of all segments of a robot into its correction factors.
+
+    Args:
+        segments (dict[str, list[dict]]): The history of the measurements per segment.
+
+    Returns:
+        dict[str, float]: The distance_correction_factor and theta_correction_factor.
+    """
+    measurements = sorted((m for history in segments.values() for m in history), key=lambda m: m.get("time", 0))
+    recent = measurements[-RECENT_MEASUREMENTS:]
+    return {"distance_correction_factor": statistics.median(m["distance_correction_factor"] for m in recent),
+            "theta_correction_factor": statistics.median(m["theta_correction_factor"] for m in recent)}
+
+
+def upgrade(calibrations: dict) -> dict:
+    """
+    Convert the calibrations of the former format, one measurement per robot with its "from" and "to" beacon,
+    to the format with a history per segment.
+
+    Args:
+        calibrations (dict): The content of a calibration file.
+
+    Returns:
+        dict: The calibrations with a history per segment for every robot.
+    """
+    upgraded = {}
+    for robot_id, calibration in calibrations.items():
+        if "segments" not in calibration:
+            measurement = {"distance_correction_factor": calibration["distance_correction_factor"],
+                           "theta_correction_factor": calibration["theta_correction_factor"]}
+            segment = f"{calibration.get('from')}->{calibration.get('to')}"
+            calibration = {**measurement, "segments": {segment: [measurement]}}
+        upgraded[robot_id] = calibration
+    return upgraded
@@ -11,39 +11,72 @@ Date:
     18 May 2025
 """
 
+# The grey areas of the beacons are about 0.021 m long along the track, and the grey areas of one beacon about
+# 0.022 m apart. A grey area counts from 0.015 m, so the maximum gap between the areas of a beacon is 0.03 m.
+GREY_MIN_DISTANCE: float = 0.015  # in m
+
+
 class GreyArea:
     """
     The GreyArea class provides methods to determine the minimum length
-    and maximum distance between grey areas based on the robot's speed.
+    and maximum distance between grey areas.
     This is used to help detect beacons by analyzing how long and how far apart
     the robot travels over grey areas.
+
+    The lengths are either measured in travelled distance (in m), if grey_min_distance is given,
+    or in control steps scaled by the robot's speed. Distances do not depend on the rate of the
+    control loop or on changes of the speed, so they are preferred whenever the odometry is available.
     """
-    def __init__(self, speed: float):
+    def __init__(self, speed: float, grey_min_steps: float = 20, grey_min_distance: float | None = None):
         """
         Initialize the GreyArea.
 
         Args:
             speed (float): The speed of the robot in rad/s. Used to calculate
                 the time and steps required to cross a grey area.
+            grey_min_steps (float): Minimum number of steps in a grey area at a speed of 1 rad/s.
+            grey_min_distance (float | None): Minimum distance travelled in a grey area in m.
+                If given, all lengths are in m instead of steps.
         """
         self.norm_speed = speed
+        self.grey_min_steps = grey_min_steps
+        self.grey_min_distance = grey_min_distance
+
+    def is_distance_based(self) -> bool:
+        """
+        Returns:
+            bool: True if the lengths are in m, False if they are in steps.
+        """
+        return self.grey_min_distance is not None
 
     def grey_min_length(self) -> float:
         """
-        Calculate the minimum number of steps the robot should be in a grey area
+        Calculate the minimum length the robot should be in a grey area
         for it to be considered valid.
 
         Returns:
-            float: Minimum steps in the grey area.
+            float: Minimum distance (in m) or steps in the grey area.
         """
-        return 20 / self.norm_speed
+        if self.grey_min_distance is not None:
+            return self.grey_min_distance
+        return self.grey_min_steps / self.norm_speed
 
     def grey_distance_max(self) -> float:
         """
-        Calculate the maximum number of steps allowed between grey areas
+        Calculate the maximum distance (in m) or number of steps allowed between grey areas
         for them to be counted as part of the same beacon.
 
         Returns:
-            float: Maximum steps between grey areas.
+            float: Maximum distance or steps between grey areas.
+        """
+        return 2 * self.grey_min_length()
+
+    def grey_long_length(self) -> float:
+        """
+        Calculate the minimum length the robot should be in a grey area
+        for it to be considered a long grey area in a beacon pattern.
+
+        Returns:
+            float: Minimum distance (in m) or steps in a long grey area.
         """
-        return 2 * self.grey_min_length()
\ No newline at end of file
+        return 2 * self.grey_min_length()
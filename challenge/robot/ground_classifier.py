@@ -0,0 +1,123 @@
+"""
+ground_classifier.py
+
+Classifies the ground sensor values of the ePuck robot into black, grey and white.
+
+The three sensors are quantized once per step and packed into a single ground code
+(the colors of the left, middle and right sensor as base 3 digits). Modules reacting
+to the ground, like the TrackFollower and the BeaconDetector, look up their decisions
+for a code in tables precomputed from COLORS instead of comparing the values again.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import numpy as np
+
+BLACK: int = 0
+GREY: int = 1
+WHITE: int = 2
+COLOR_NAMES: tuple[str, str, str] = ("black", "grey", "white")
+
+NUMBER_OF_SENSORS: int = 3
+NUMBER_OF_CODES: int = 3 ** NUMBER_OF_SENSORS
+
+
+def pack(colors: tuple[int, ...] | list[int]) -> int:
+    """
+    Pack the colors of the three ground sensors into a ground code.
+
+    Args:
+        colors (tuple[int, ...] | list[int]): The color (BLACK, GREY or WHITE) of each sensor, from left to right.
+
+    Returns:
+        int: The ground code, between 0 and NUMBER_OF_CODES - 1.
+    """
+    code = 0
+    for color in colors:
+        code = code * 3 + color
+    return code
+
+
+def unpack(code: int) -> tuple[int, int, int]:
+    """
+    Unpack a ground code into the colors of the three ground sensors.
+
+    Args:
+        code (int): The ground code.
+
+    Returns:
+        tuple[int, int, int]: The color of each sensor, from left to right.
+    """
+    return code // 9, code // 3 % 3, code % 3
+
+
+# Lookup tables indexed by the ground code
+COLORS: list[tuple[int, int, int]] = [unpack(code) for code in range(NUMBER_OF_CODES)]
+MIRRORED: list[int] = [pack(colors[::-1]) for colors in COLORS]  # code with the left and right sensor swapped
+HAS_GREY: list[bool] = [GREY in colors for colors in COLORS]
+HAS_WHITE: list[bool] = [WHITE in colors for colors in COLORS]
+
+
+class GroundClassifier:
+    """
+    The GroundClassifier quantizes the ground sensor values into black, grey and white.
+    Values below grey_min_value are black, values above grey_max_value are white, the rest is grey.
+    """
+    def __init__(self, grey_min_value: float, grey_max_value: float):
+        """
+        Initialize the GroundClassifier.
+
+        Args:
+            grey_min_value (float): Minimum value of the ground to be considered grey.
+            grey_max_value (float): Maximum value of the ground to be considered grey.
+        """
+        self.grey_min_value: float = grey_min_value
+        self.grey_max_value: float = grey_max_value
+
+    def classify(self, value: float) -> int:
+        """
+        Classify the value of one ground sensor.
+
+        Args:
+            value (float): The ground sensor value.
+
+        Returns:
+            int: BLACK, GREY or WHITE.
+        """
+        if value < self.grey_min_value:
+            return BLACK
+        if value <= self.grey_max_value:
+            return GREY
+        return WHITE
+
+    def encode(self, gs: list[float]) -> int:
+        """
+        Classify the values of the three ground sensors and pack them into a ground code.
+
+        Args:
+            gs (list[float]): List of the ground sensor values, from left to right.
+
+        Returns:
+            int: The ground code.
+        """
+        left, middle, right = gs
+        return self.classify(left) * 9 + self.classify(middle) * 3 + self.classify(right)
+
+    def encode_array(self, gs: np.ndarray) -> np.ndarray:
+        """
+        Classify a whole recording of ground sensor values at once, e.g. to replay a log.
+        Gives the same codes as calling encode for every row.
+
+        Args:
+            gs (np.ndarray): Array of shape (n, 3) with the ground sensor values, from left to right.
+
+        Returns:
+            np.ndarray: Array of shape (n,) with the ground codes.
+        """
+        colors = (gs >= self.grey_min_value).astype(np.int8) + (gs > self.grey_max_value)
+        return colors @ np.array([9, 3, 1])
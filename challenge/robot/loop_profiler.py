@@ -0,0 +1,192 @@
+"""
+loop_profiler.py
+
+Measures where the time of the control loop of the ePuck robot goes, with fixed-memory latency
+histograms per stage of the loop and for the loop period itself.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import math
+from time import perf_counter_ns
+from typing import Callable
+
+
+class LatencyHistogram:
+    """
+    The LatencyHistogram class counts durations in logarithmically spaced buckets, so the memory
+    stays fixed no matter how many durations are recorded. Percentiles are accurate to the bucket
+    width, the count, mean and maximum are exact.
+    """
+
+    def __init__(self, min_ns: int = 1_000, max_ns: int = 10_000_000_000, buckets_per_decade: int = 20):
+        """
+        Initialize the LatencyHistogram.
+
+        Args:
+            min_ns (int): Upper bound of the first bucket in ns, shorter durations are counted there.
+            max_ns (int): Lower bound of the last bucket in ns, longer durations are counted there.
+            buckets_per_decade (int): Number of buckets per factor 10, determines the resolution.
+        """
+        self.min_ns: int = min_ns
+        self.buckets_per_decade: int = buckets_per_decade
+        self.bucket_count: int = math.ceil(math.log10(max_ns / min_ns) * buckets_per_decade) + 2
+        self.buckets: list[int] = [0] * self.bucket_count
+        self.count: int = 0
+        self.total_ns: int = 0
+        self.max_ns: int = 0
+
+    def record(self, duration_ns: int):
+        """
+        Add a duration to the histogram.
+
+        Args:
+            duration_ns (int): The duration in ns.
+        """
+        if duration_ns <= self.min_ns:
+            index = 0
+        else:
+            index = min(int(math.log10(duration_ns / self.min_ns) * self.buckets_per_decade) + 1,
+                        self.bucket_count - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def bucket_upper_bound(self, index: int) -> float:
+        """
+        Get the largest duration counted in a bucket.
+
+        Args:
+            index (int): Index of the bucket.
+
+        Returns:
+            float: The upper bound in ns.
+        """
+        return self.min_ns * 10 ** (index / self.buckets_per_decade)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get the duration below which the given percentage of the recorded durations lie.
+
+        Args:
+            percent (float): Percentage between 0 and 100.
+
+        Returns:
+            float: The percentile in ns, 0 if nothing was recorded.
+        """
+        if self.count == 0:
+            return 0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                # The bucket bound can overshoot the largest duration actually seen
+                return min(self.bucket_upper_bound(index), self.max_ns)
+        return self.max_ns
+
+    def mean(self) -> float:
+        """
+        Returns:
+            float: The mean duration in ns, 0 if nothing was recorded.
+        """
+        return self.total_ns / self.count if self.count else 0
+
+    def reset(self):
+        """
+        Remove all recorded durations.
+        """
+        self.buckets = [0] * self.bucket_count
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class LoopProfiler:
+    """
+    The LoopProfiler class records the wall time of each stage of a control loop and the jitter of the loop period.
+
+    Call start_tick at the beginning of every loop iteration and mark after each stage. The time since the
+    previous mark (or the start of the tick) is recorded for the stage. A disabled profiler returns immediately,
+    so the calls can stay in the loop.
+    """
+
+    def __init__(self, enabled: bool = True, clock: Callable[[], int] = perf_counter_ns):
+        """
+        Initialize the LoopProfiler.
+
+        Args:
+            enabled (bool): If False, nothing is measured.
+            clock (Callable[[], int]): Clock in ns to measure the stages with.
+        """
+        self.enabled: bool = enabled
+        self.clock: Callable[[], int] = clock
+        self.stages: dict[str, LatencyHistogram] = {}
+        self.period: LatencyHistogram = LatencyHistogram()
+        self.jitter: LatencyHistogram = LatencyHistogram()
+        self.tick_start_ns: int | None = None
+        self.last_mark_ns: int = 0
+        self.last_period_ns: int | None = None
+
+    def start_tick(self):
+        """
+        Mark the start of a loop iteration and record the period since the previous one.
+        """
+        if not self.enabled:
+            return
+        now = self.clock()
+        if self.tick_start_ns is not None:
+            period = now - self.tick_start_ns
+            self.period.record(period)
+            if self.last_period_ns is not None:
+                self.jitter.record(abs(period - self.last_period_ns))
+            self.last_period_ns = period
+        self.tick_start_ns = now
+        self.last_mark_ns = now
+
+    def mark(self, stage: str):
+        """
+        Record the time since the previous mark as the duration of the given stage.
+
+        Args:
+            stage (str): Name of the stage that just finished.
+        """
+        if not self.enabled:
+            return
+        now = self.clock()
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram()
+        histogram.record(now - self.last_mark_ns)
+        self.last_mark_ns = now
+
+    def summary(self) -> str:
+        """
+        Create a table with the latency statistics of every stage, the loop period and the jitter.
+
+        Returns:
+            str: The formatted summary.
+        """
+        rows = [f"{'stage':<20}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  [ms]"]
+        for name, histogram in [*self.stages.items(), ("loop period", self.period), ("loop jitter", self.jitter)]:
+            rows.append(f"{name:<20}{histogram.count:>8}" + "".join(
+                f"{value / 1e6:>10.3f}" for value in (histogram.mean(), histogram.percentile(50),
+                                                      histogram.percentile(95), histogram.percentile(99),
+                                                      histogram.max_ns)))
+        if self.period.count:
+            rows.append(f"loop rate: {1e9 / self.period.mean():.1f} Hz")
+        return "\n".join(rows)
+
+    def print_summary(self):
+        """
+        Print the summary if the profiler is enabled and has measured anything.
+        """
+        if self.enabled and self.period.count:
+            print(self.summary())
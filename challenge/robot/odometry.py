@@ -12,17 +12,25 @@ Date:
     18 May 2025
 """
 
-import json
 import math
-import os
+from typing import TYPE_CHECKING, Callable
 
+import numpy as np
 from unifr_api_epuck.epuck.epuck_wifi import WifiEpuck
 from time import perf_counter_ns
 
 from challenge.core.beacon import Beacon
 from challenge.core.position_on_track import PositionOnTrack
+from challenge.robot.calibration_store import CalibrationStore
 from challenge.robot.step_counter import StepCounter
 
+if TYPE_CHECKING:
+    from challenge.robot.trajectory import Trajectory
+
+WHEEL_DIAMETER: float = 0.041  # in m, source https://www.gctronic.com/doc/index.php/e-puck2
+DISTANCE_BETWEEN_WHEELS: float = 0.053  # in m
+POSITION_SCALE: float = 1500  # Scaling factor for simulation, applied to x and y
+
 
 def wheel_distance(angular_speed: float, wheel_radius: float, time_delta: float) -> float:
     """
@@ -38,27 +46,108 @@ def wheel_distance(angular_speed: float, wheel_radius: float, time_delta: float)
     """
     return angular_speed * wheel_radius * time_delta
 
+
+class OdometryBatch:
+    """
+    The poses of a batch of wheel speed samples integrated at once, one entry per sample.
+
+    Attributes:
+        timestamps (np.ndarray): Time of each sample in ns, the end of the interval it was driven for.
+        x (np.ndarray): X position after each sample.
+        y (np.ndarray): Y position after each sample.
+        theta (np.ndarray): Orientation after each sample in radians.
+        distance (np.ndarray): Corrected distance travelled in each sample, in m.
+        distance_left (np.ndarray): Uncorrected distance travelled by the left wheel in each sample, in m.
+        distance_right (np.ndarray): Uncorrected distance travelled by the right wheel in each sample, in m.
+    """
+
+    def __init__(self, timestamps: np.ndarray, x: np.ndarray, y: np.ndarray, theta: np.ndarray,
+                 distance: np.ndarray, distance_left: np.ndarray, distance_right: np.ndarray):
+        self.timestamps: np.ndarray = timestamps
+        self.x: np.ndarray = x
+        self.y: np.ndarray = y
+        self.theta: np.ndarray = theta
+        self.distance: np.ndarray = distance
+        self.distance_left: np.ndarray = distance_left
+        self.distance_right: np.ndarray = distance_right
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+def integrate_wheel_speeds(timestamps_ns: np.ndarray, speeds_left: np.ndarray, speeds_right: np.ndarray,
+                           last_time_ns: int, x: float = 0, y: float = 0, theta: float = 0,
+                           distance_correction_factor: float = 1.0,
+                           theta_correction_factor: float = 1.0) -> OdometryBatch:
+    """
+    Integrate timestamped wheel speeds into poses with NumPy cumulative sums, with the same model and
+    the same order of additions as Odometry.odometry, so the poses equal those of one update per sample.
+
+    Each speed is driven from the previous timestamp (last_time_ns for the first sample) to its own timestamp.
+
+    Args:
+        timestamps_ns (np.ndarray): Increasing time of each sample in ns.
+        speeds_left (np.ndarray): Left wheel speed of each sample in rad/s.
+        speeds_right (np.ndarray): Right wheel speed of each sample in rad/s.
+        last_time_ns (int): Time of the pose before the first sample in ns.
+        x (float): X position before the first sample.
+        y (float): Y position before the first sample.
+        theta (float): Orientation before the first sample in radians.
+        distance_correction_factor (float): Correction factor of the distance, from the calibration.
+        theta_correction_factor (float): Correction factor of the rotation, from the calibration.
+
+    Returns:
+        OdometryBatch: The pose after each sample.
+    """
+    timestamps = np.asarray(timestamps_ns, dtype=np.int64)
+    time_deltas = np.diff(timestamps, prepend=np.int64(last_time_ns)) / 1e9
+    wheel_radius = WHEEL_DIAMETER / 2
+    distance_left = wheel_distance(np.asarray(speeds_left, dtype=np.float64), wheel_radius, time_deltas)
+    distance_right = wheel_distance(np.asarray(speeds_right, dtype=np.float64), wheel_radius, time_deltas)
+
+    distance = ((distance_right + distance_left) / 2) * distance_correction_factor
+    delta_theta = ((distance_left - distance_right) / DISTANCE_BETWEEN_WHEELS) * theta_correction_factor
+
+    # Prepending the start value keeps the order of the additions of the sequential updates
+    thetas = np.cumsum(np.concatenate(([theta], delta_theta)))
+    headings = thetas[:-1] + delta_theta / 2
+    xs = np.cumsum(np.concatenate(([x], distance * np.cos(headings) * POSITION_SCALE)))
+    ys = np.cumsum(np.concatenate(([y], distance * np.sin(headings) * POSITION_SCALE)))
+    return OdometryBatch(timestamps, xs[1:], ys[1:], thetas[1:], distance, distance_left, distance_right)
+
+
 class Odometry:
     """
     The Odometry class tracks the robot's position (x, y) and orientation (theta)
     using wheel speeds and time intervals. It supports calibration and synchronization
     with beacons for improved accuracy.
+
+    With a max_step_ns, an update after a delayed tick is integrated in several samples of at most
+    max_step_ns instead of one large step, which follows the arc driven in the meantime more closely.
     """
-    def __init__(self, robot: WifiEpuck):
+    def __init__(self, robot: WifiEpuck, clock: Callable[[], int] = perf_counter_ns,
+                 trajectory: 'Trajectory | None' = None, max_step_ns: int | None = None):
         """
         Initialize the Odometry object.
 
         Args:
             robot (WifiEpuck): The robot instance.
-            step_counter (StepCounter): Step counter for tracking steps.
+            clock (Callable[[], int]): Clock in ns used to measure the time between two updates.
+            trajectory (Trajectory | None): If given, every update and beacon sync is recorded in it.
+            max_step_ns (int | None): Longest interval integrated in one step, in ns. None never splits an update.
         """
         self.robot: WifiEpuck = robot
+        self.clock: Callable[[], int] = clock
+        self.trajectory: 'Trajectory | None' = trajectory
+        self.max_step_ns: int | None = max_step_ns
+        self.updates: int = 0  # number of updates, recorded as step of the trajectory
         self.theta: float = 0  # orientation in radians
         self.x: float = 0 # in m
         self.y: float = 0 # in m
         self.last_time_ns: float = 0
         self.distance_left: float = 0
         self.distance_right: float = 0
+        self.step_distance: float = 0  # distance travelled in the last update, in m
         self.position_from_beacon: PositionOnTrack = PositionOnTrack(0)
         self.calibrated_by_beacon: bool = False
         self.distance_correction_factor: float = 1.0
@@ -72,12 +161,17 @@ class Odometry:
             speed_left (float): Left wheel speed in rad/s.
             speed_right (float): Right wheel speed in rad/s.
         """
-        wheel_diameter: float = 0.041  # in m, source https://www.gctronic.com/doc/index.php/e-puck2
-        distance_between_wheels: float = 0.053  # in m
-        wheel_radius: float = wheel_diameter / 2
+        wheel_radius: float = WHEEL_DIAMETER / 2
 
-        time_ns: float = perf_counter_ns()
+        time_ns: float = self.clock()
         time_delta = time_ns - self.last_time_ns
+        if self.max_step_ns is not None and self.last_time_ns and time_delta > self.max_step_ns:
+            # The tick was delayed, integrate the interval in equal samples with the same speeds
+            samples = math.ceil(time_delta / self.max_step_ns)
+            timestamps = np.linspace(self.last_time_ns, time_ns, samples + 1)[1:].astype(np.int64)
+            timestamps[-1] = time_ns
+            self.odometry_batch(timestamps, np.full(samples, speed_left), np.full(samples, speed_right))
+            return
         self.last_time_ns = time_ns
 
         # Calculate distance traveled by each wheel
@@ -88,7 +182,7 @@ class Odometry:
         distance: float = ((distance_right + distance_left) / 2) * self.distance_correction_factor
 
         # Calculate change in orientation
-        delta_theta: float = ((distance_left - distance_right) / distance_between_wheels) * self.theta_correction_factor
+        delta_theta: float = ((distance_left - distance_right) / DISTANCE_BETWEEN_WHEELS) * self.theta_correction_factor
 
         # Calculate change in position
         delta_x: float = distance * math.cos(self.theta + (delta_theta / 2))
@@ -96,21 +190,73 @@ class Odometry:
 
         # Update robot's pose
         self.theta += delta_theta
-        self.x += delta_x * 1500  # Scaling factor for simulation
-        self.y += delta_y * 1500
+        self.x += delta_x * POSITION_SCALE
+        self.y += delta_y * POSITION_SCALE
 
         self.distance_left += distance_left
         self.distance_right += distance_right
+        self.step_distance = distance
 
         # If calibrated by beacon, update distance from beacon
         if self.calibrated_by_beacon:
             self.position_from_beacon.distance += distance
 
-    def calibrate_robot(self):
+        self.updates += 1
+        if self.trajectory is not None:
+            self.trajectory.append(self.updates, self.x, self.y, self.theta, time_ns)
+
+    def odometry_batch(self, timestamps_ns: np.ndarray, speeds_left: np.ndarray,
+                       speeds_right: np.ndarray) -> OdometryBatch:
+        """
+        Update the robot's position and orientation with several timestamped wheel speed samples at once,
+        e.g. samples queued while a tick was delayed. Equivalent to one update per sample.
+
+        Args:
+            timestamps_ns (np.ndarray): Increasing time of each sample in ns of the clock, after the last update.
+            speeds_left (np.ndarray): Left wheel speed of each sample in rad/s.
+            speeds_right (np.ndarray): Right wheel speed of each sample in rad/s.
+
+        Returns:
+            OdometryBatch: The pose after each sample.
+        """
+        batch = integrate_wheel_speeds(timestamps_ns, speeds_left, speeds_right, self.last_time_ns,
+                                       self.x, self.y, self.theta,
+                                       self.distance_correction_factor, self.theta_correction_factor)
+        if len(batch) == 0:
+            return batch
+        self.last_time_ns = int(batch.timestamps[-1])
+        self.theta = float(batch.theta[-1])
+        self.x = float(batch.x[-1])
+        self.y = float(batch.y[-1])
+
+        self.distance_left += float(batch.distance_left.sum())
+        self.distance_right += float(batch.distance_right.sum())
+        self.step_distance = float(batch.distance.sum())  # distance since the last update
+
+        if self.calibrated_by_beacon:
+            self.position_from_beacon.distance += self.step_distance
+
+        steps = self.updates + 1 + np.arange(len(batch))
+        self.updates += len(batch)
+        if self.trajectory is not None:
+            self.trajectory.extend(steps, batch.x, batch.y, batch.theta, batch.timestamps)
+        return batch
+
+    def calibrate_robot(self, calibration_store: CalibrationStore | None = None):
         """
-        Calibrate the robot using values from a calibration file.
+        Calibrate the robot using the correction factors from the calibration store.
+
+        Args:
+            calibration_store (CalibrationStore | None): The store to read from. Defaults to calibrate.json.
         """
-        self.read_calibration_file()
+        calibration_store = calibration_store if calibration_store is not None else CalibrationStore()
+        robot_id = self.robot.id
+        factors = calibration_store.factors(robot_id)
+        if factors is not None:
+            self.distance_correction_factor, self.theta_correction_factor = factors
+            print(f"calibration for {robot_id}: {self.distance_correction_factor}, {self.theta_correction_factor}")
+        else:
+            print(f"no calibration for {robot_id}")
 
     def robot_name(self):
         """
@@ -151,24 +297,8 @@ class Odometry:
         self.position_from_beacon.from_beacon = beacon
         self.position_from_beacon.distance = 0
 
-    def read_calibration_file(self):
-        """
-        Read calibration factors from a JSON file and apply them to the robot.
-        """
-        calibration_file = "calibrate.json"
-        if os.path.exists(calibration_file):
-            with open("calibrate.json", "r") as f:
-                string = f.read()
-                calibration_dict = json.loads(string)
-                robot_id = self.robot.id
-                if robot_id in calibration_dict:
-                    self.distance_correction_factor = calibration_dict[robot_id]["distance_correction_factor"]
-                    self.theta_correction_factor = calibration_dict[robot_id]["theta_correction_factor"]
-                    print(f"calibration for {robot_id}: {self.distance_correction_factor}, {self.theta_correction_factor}")
-                else:
-                    print(f"no calibration for {robot_id}")
-        else:
-            print("no calibration file found")
+        if self.trajectory is not None:
+            self.trajectory.append(self.updates, self.x, self.y, self.theta, self.clock(), beacon_sync=True)
 
 
 class OdometryReading:
@@ -0,0 +1,111 @@
+"""
+position_reporter.py
+
+Decides when the ePuck robot reports its position to the coordinator, depending on how far it moved.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+from time import perf_counter_ns
+from typing import Callable
+
+MIN_REPORT_DISTANCE: float = 0.03  # in m, about the length of a grey area and a half
+MAX_REPORT_INTERVAL_NS: int = 1_000_000_000
+STOPPED_SPEED: float = 0.05  # in rad/s, the robot counts as stopped if both wheels are slower
+
+# Reasons for sending a report
+BEACON: str = "beacon"
+DISTANCE: str = "distance"
+INTERVAL: str = "interval"
+STOPPED: str = "stopped"
+
+
+class PositionReporter:
+    """
+    The PositionReporter decides in every step whether the position should be sent to the coordinator.
+    A report is sent right after a beacon sync, as soon as the robot moved min_distance since the last report,
+    or when max_interval_ns passed since the last report. When the robot stops, the position where it stopped
+    is sent once. While it stays stopped, e.g. creeping at the stop speed factor, only a beacon sync
+    or min_distance moved send a report.
+
+    At high speed the coordinator gets frequent updates, at low speed the traffic drops.
+    """
+
+    def __init__(self, min_distance: float = MIN_REPORT_DISTANCE, max_interval_ns: int = MAX_REPORT_INTERVAL_NS,
+                 clock: Callable[[], int] = perf_counter_ns):
+        """
+        Initialize the PositionReporter.
+
+        Args:
+            min_distance (float): Distance in m along the track after which a report is sent.
+            max_interval_ns (int): Longest time in ns between two reports while the robot is moving.
+            clock (Callable[[], int]): Clock in ns, the same as the odometry's.
+        """
+        self.min_distance: float = min_distance
+        self.max_interval_ns: int = max_interval_ns
+        self.clock: Callable[[], int] = clock
+        self.start_time_ns: int = clock()
+        self.last_report_ns: int = self.start_time_ns
+        self.unreported_distance: float = 0  # distance moved since the last report, in m
+        self.was_stopped: bool = True  # the robot stands still before the start
+        self.reports: dict[str, int] = {BEACON: 0, DISTANCE: 0, INTERVAL: 0, STOPPED: 0}
+        self.suppressed: int = 0  # steps without a report
+
+    def update(self, step_distance: float, beacon_synced: bool = False, stopped: bool = False) -> bool:
+        """
+        Add the distance of a step and decide whether to report the position.
+
+        Args:
+            step_distance (float): Distance moved in the step, in m.
+            beacon_synced (bool): True if the odometry was synchronized with a beacon in the step.
+            stopped (bool): True if the robot is stopped, e.g. both wheel speeds are below STOPPED_SPEED.
+                Turning on the spot does not count as stopped.
+
+        Returns:
+            bool: True if the position should be reported now.
+        """
+        now = self.clock()
+        self.unreported_distance += abs(step_distance)
+        just_stopped = stopped and not self.was_stopped
+        self.was_stopped = stopped
+        if beacon_synced:
+            reason = BEACON
+        elif self.unreported_distance >= self.min_distance:
+            reason = DISTANCE
+        elif stopped:
+            # Only report the moving -> stopped transition, not every step of a creeping robot
+            reason = STOPPED if just_stopped and self.unreported_distance > 0 else None
+        elif now - self.last_report_ns >= self.max_interval_ns:
+            reason = INTERVAL
+        else:
+            reason = None
+
+        if reason is None:
+            self.suppressed += 1
+            return False
+        self.reports[reason] += 1
+        self.last_report_ns = now
+        self.unreported_distance = 0
+        return True
+
+    def rate(self) -> float:
+        """
+        Returns:
+            float: The effective number of reports per second since the start.
+        """
+        elapsed = (self.clock() - self.start_time_ns) / 1e9
+        return sum(self.reports.values()) / elapsed if elapsed > 0 else 0
+
+    def summary(self) -> str:
+        """
+        Returns:
+            str: The number of reports by reason, the steps without a report and the effective rate.
+        """
+        reasons = ', '.join(f"{count} {reason}" for reason, count in self.reports.items())
+        return (f"{sum(self.reports.values())} position reports ({reasons}), {self.suppressed} steps without, "
+                f"{self.rate():.2f} reports/s")
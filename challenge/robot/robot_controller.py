@@ -12,27 +12,36 @@ Date:
     18 May 2025
 """
 
-import json
 import os
 import sys, signal
+from time import perf_counter_ns
+from typing import Callable
 
 from unifr_api_epuck import wrapper
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from challenge.core.beacon import Beacon
+from challenge.robot.actuator_cache import ActuatorCache
 from challenge.robot.beacon_detector import BeaconDetector
+from challenge.robot.calibration_store import CalibrationStore
 from challenge.coordinator import coordinator
-from challenge.robot.grey_area import GreyArea
+from challenge.robot.grey_area import GREY_MIN_DISTANCE, GreyArea
+from challenge.robot.ground_classifier import BLACK, GREY, GroundClassifier
+from challenge.robot.loop_profiler import LoopProfiler
 from challenge.robot.obstacle_avoider import ObstacleAvoider
 from challenge.robot.odometry import Odometry
+from challenge.robot.position_reporter import STOPPED_SPEED, PositionReporter
+from challenge.core.position_message import PositionCodec
 from challenge.core.position_on_track import PositionOnTrack
-from challenge.robot.sensor_memory import SensorMemory
+from challenge.robot.sensor_filters import FilterBank
+from challenge.robot.sensor_prefetcher import SensorPrefetcher, SequentialSensorReader
 from challenge.robot.step_counter import StepCounter
 from challenge.robot.track_follower import TrackFollower
+from challenge.robot.trajectory import Trajectory
 
 LINE_MAX: int = 750  # to determine if the sensor is on the line
 GREY_MIN: int = 500  # to determine if the sensor is on the grey area
+MAX_ODOMETRY_STEP_NS: int = 100_000_000  # longer ticks are integrated in several samples by the odometry
 
 
 class RobotController:
@@ -45,37 +54,74 @@ class RobotController:
     Attributes:
         norm_speed (float): The robot's default movement speed. Defaults to 1.
         robot: The robot instance obtained from the wrapper using the provided IP address.
+        actuators (ActuatorCache | None): Sends only the motor and LED commands that change something.
         step_counter (StepCounter | None): Optional module for counting movement steps.
-        proximity_memory (SensorMemory | None): Optional module for storing proximity sensor data.
+        ground_classifier (GroundClassifier | None): Optional module for classifying the ground sensor values.
+        proximity_filters (FilterBank | None): Optional module for filtering the proximity sensor data.
         grey_area (GreyArea | None): Optional module for handling grey area detection and logic.
         obstacle_avoider (ObstacleAvoider | None): Optional module for avoiding detected obstacles.
         beacon_detector (BeaconDetector | None): Optional module for detecting beacons.
         track_follower (TrackFollower | None): Optional module for following predefined tracks.
         odometry (Odometry | None): Optional module for tracking the robot's position and orientation.
+        position_reporter (PositionReporter | None): Decides when to report the position to the coordinator.
+        clock (Callable[[], int]): Clock in ns used by the odometry.
+        profiler (LoopProfiler): Measures the duration of the stages of the main loop, if enabled.
+        prefetch (bool): If True, the sensors are read on a worker thread while the main loop computes.
+        sensors (SequentialSensorReader | SensorPrefetcher | None): Provides the sensor values of the main loop.
+        trajectory_file (str | None): If set, the trajectory of the odometry is recorded and saved to this file.
+        calibration_store (CalibrationStore): The calibration file shared by all robot controllers.
+        binary_messages (bool): If True, the positions are sent in the compact binary form, otherwise as dictionaries.
+        position_codec (PositionCodec): Encodes the position messages in the binary form.
+        position_sequence (int): Number of position messages sent.
     """
 
-    def __init__(self, robot_ip: str, norm_speed: float = 1):
+    def __init__(self, robot_ip: str, norm_speed: float = 1, robot=None,
+                 clock: Callable[[], int] = perf_counter_ns, profile: bool = False, prefetch: bool = False,
+                 trajectory_file: str | None = None, binary_messages: bool = True):
         """
         Initialize the RobotController and all required modules.
 
         Args:
             robot_ip (str): IP address of the robot.
             norm_speed (float): The robot's default movement speed. Defaults to 1.
+            robot: Robot instance to use instead of connecting to robot_ip, e.g. a SimulatedEpuck.
+            clock (Callable[[], int]): Clock in ns used by the odometry. Defaults to perf_counter_ns,
+                a simulated robot should pass its own clock.
+            profile (bool): If True, measure the duration of each stage of the main loop
+                and print a summary on clean up. Defaults to False.
+            prefetch (bool): If True, read the next sensor values on a worker thread while the current
+                tick is computed, so a tick takes max(read, compute) instead of read + compute. Defaults to False.
+            trajectory_file (str | None): If set, record the trajectory of the odometry and save it
+                to this .npz file on clean up. Defaults to None.
+            binary_messages (bool): If True, send the positions in the compact binary form of position_message.py,
+                otherwise in the former dictionary form. Defaults to True.
         """
         self.norm_speed = norm_speed
-        self.robot = wrapper.get_robot(robot_ip)
-
+        self.robot = robot if robot is not None else wrapper.get_robot(robot_ip)
+        self.clock: Callable[[], int] = clock
+        self.profiler: LoopProfiler = LoopProfiler(profile)
+        self.prefetch: bool = prefetch
+        self.sensors: SequentialSensorReader | SensorPrefetcher | None = None
+        self.trajectory_file: str | None = trajectory_file
+        self.calibration_store: CalibrationStore = CalibrationStore()
+        self.binary_messages: bool = binary_messages
+        self.position_codec: PositionCodec = PositionCodec(list(coordinator.BEACONS.values()))
+        self.position_sequence: int = 0
+
+        self.actuators: ActuatorCache | None = None
         self.step_counter: StepCounter | None = None
-        self.proximity_memory: SensorMemory | None = None
+        self.ground_classifier: GroundClassifier | None = None
+        self.proximity_filters: FilterBank | None = None
         self.grey_area: GreyArea | None = None
         self.obstacle_avoider: ObstacleAvoider | None = None
         self.beacon_detector: BeaconDetector | None = None
         self.track_follower: TrackFollower | None = None
         self.odometry: Odometry | None = None
+        self.position_reporter: PositionReporter | None = None
 
         # Set up signal handler for graceful shutdown
         def handler(signum, frame):
-            self.robot.clean_up()
+            self.clean_up()
 
         signal.signal(signal.SIGINT, handler)
 
@@ -88,34 +134,47 @@ class RobotController:
             None
         """
         self.init_track_follower_odometry()
-        self.odometry.calibrate_robot()
+        self.odometry.calibrate_robot(self.calibration_store)
 
         self.robot.calibrate_prox()
         self.robot.init_client_communication()
 
-        self.proximity_memory: SensorMemory = SensorMemory(5)
+        # The median of 3 rejects single spikes like the former mean of 5, but lags one step less
+        self.proximity_filters: FilterBank = FilterBank(3, filters=("median",))
         self.obstacle_avoider: ObstacleAvoider = ObstacleAvoider(40, 100)
 
-        while self.robot.go_on():
-            gs: list[int] = self.robot.get_ground()
-            self.read_proximity_sensors()
+        sensor_reader = SensorPrefetcher if self.prefetch else SequentialSensorReader
+        self.sensors = sensor_reader(self.robot, profiler=self.profiler, lock=self.actuators.lock)
+        self.sensors.start()
+
+        self.profiler.start_tick()
+        while (snapshot := self.sensors.next_snapshot()) is not None:
+            ground_code: int = self.ground_classifier.encode(snapshot.ground)
+            self.update_proximity_filters(snapshot.proximity)
 
             self.handle_incoming_messages()
+            self.profiler.mark("messages")
             self.odometry.odometry(*self.track_follower.current_speed)
+            self.profiler.mark("odometry")
 
-            self.beacon_detector.receive_ground(gs)
-            self.check_for_beacons()
+            self.beacon_detector.receive_ground(ground_code, self.odometry.step_distance)
+            beacon_synced = self.check_for_beacons()
+            self.profiler.mark("beacon detection")
 
-            self.notify_coordinator_of_position()
+            self.notify_coordinator_of_position(beacon_synced)
+            self.profiler.mark("notify coordinator")
 
             self.adjust_speed_to_possible_obstacle()
+            self.profiler.mark("obstacle speed")
 
-            if not self.track_follower.follow_track(gs):
+            if not self.track_follower.follow_track(ground_code):
                 break
+            self.profiler.mark("follow track")
 
             self.step_counter.step()
+            self.profiler.start_tick()
 
-        self.robot.clean_up()
+        self.clean_up()
 
     def calibrate_robot(self):
         """
@@ -128,18 +187,37 @@ class RobotController:
         self.init_track_follower_odometry()
         print("calibrating robot")
         while self.robot.go_on():
-            gs: list[int] = self.robot.get_ground()
+            ground_code: int = self.ground_classifier.encode(self.robot.get_ground())
 
             self.odometry.odometry(*self.track_follower.current_speed)
 
-            self.beacon_detector.receive_ground(gs)
+            self.beacon_detector.receive_ground(ground_code, self.odometry.step_distance)
             self.check_for_beacons(save_to_file=True)
 
-            if not self.track_follower.follow_track(gs):
+            if not self.track_follower.follow_track(ground_code):
                 break
 
             self.step_counter.step()
 
+        self.clean_up()
+
+    def clean_up(self):
+        """
+        Print the loop profile, if profiling is enabled, save the trajectory, if recorded, and clean up the robot.
+
+        Returns:
+            None
+        """
+        if self.sensors is not None:
+            self.sensors.stop()
+        self.profiler.print_summary()
+        if self.odometry is not None and self.odometry.trajectory is not None:
+            self.odometry.trajectory.save(self.trajectory_file)
+            print(f"saved {len(self.odometry.trajectory)} odometry readings to {self.trajectory_file}")
+        if self.profiler.enabled and self.actuators is not None:
+            print(self.actuators.summary())
+        if self.position_reporter is not None:
+            print(f"[{self.robot.id.split('_')[-1]}] {self.position_reporter.summary()}")
         self.robot.clean_up()
 
     def init_track_follower_odometry(self):
@@ -150,12 +228,17 @@ class RobotController:
             None
         """
         self.robot.init_ground()
+        self.actuators: ActuatorCache = ActuatorCache(self.robot)
         self.step_counter: StepCounter = StepCounter()
-        self.grey_area: GreyArea = GreyArea(self.norm_speed)
-        self.beacon_detector: BeaconDetector = BeaconDetector(self.grey_area, GREY_MIN, LINE_MAX,
-                                                              coordinator.BEACONS)
-        self.track_follower: TrackFollower = TrackFollower(self.robot, self.norm_speed, LINE_MAX)
-        self.odometry: Odometry = Odometry(self.robot)
+        # Measure the grey areas in travelled distance, so the detection does not depend on the loop rate
+        self.grey_area: GreyArea = GreyArea(self.norm_speed, grey_min_distance=GREY_MIN_DISTANCE)
+        self.ground_classifier: GroundClassifier = GroundClassifier(GREY_MIN, LINE_MAX)
+        self.beacon_detector: BeaconDetector = BeaconDetector(self.grey_area, coordinator.BEACONS)
+        # The grey areas of the beacons are part of the line
+        self.track_follower: TrackFollower = TrackFollower(self.actuators, self.norm_speed, (BLACK, GREY))
+        trajectory = Trajectory() if self.trajectory_file is not None else None
+        self.odometry: Odometry = Odometry(self.robot, self.clock, trajectory, MAX_ODOMETRY_STEP_NS)
+        self.position_reporter: PositionReporter = PositionReporter(clock=self.clock)
 
     def adjust_speed_to_possible_obstacle(self):
         """
@@ -165,32 +248,43 @@ class RobotController:
             None
         """
         self.track_follower.obstacle_speed_factor = self.obstacle_avoider.calc_speed(
-            self.proximity_memory.get_average())
+            self.proximity_filters.median())
 
-    def notify_coordinator_of_position(self):
+    def notify_coordinator_of_position(self, beacon_synced: bool = False):
         """
-        Periodically notify the coordinator of the robot's probable position and orientation.
+        Notify the coordinator of the robot's probable position and orientation, when the position reporter
+        decides so: after a beacon sync, after moving a distance or after a maximum interval, but not while stopped.
+
+        Args:
+            beacon_synced (bool): True if the odometry was synchronized with a beacon in this step.
 
         Returns:
             None
         """
-        if self.step_counter.get_steps() % 20 == 0:
-            self.send_pos([self.odometry.x, self.odometry.y], self.odometry.position_from_beacon)
+        stopped = all(abs(speed) < STOPPED_SPEED for speed in self.track_follower.current_speed)
+        if self.position_reporter.update(self.odometry.step_distance, beacon_synced, stopped):
+            self.send_pos([self.odometry.x, self.odometry.y], self.odometry.position_from_beacon, self.odometry.theta)
 
-    def send_pos(self, robot_position: list[float], position_on_track: PositionOnTrack):
+    def send_pos(self, robot_position: list[float], position_on_track: PositionOnTrack, theta: float = 0.0):
         """
         Send the robot's position and orientation to the coordinator.
 
         Args:
             robot_position (list[float]): The robot's position in the form of [x, y].
             position_on_track (PositionOnTrack): The robot's position on the track as a PositionOnTrack object.
+            theta (float): The robot's orientation in radians.
 
         Returns:
             None
         """
-        self.robot.ClientCommunication.send_msg_to(coordinator.COORDINATOR_ID,
-                                                   {"robot_id": self.robot.id, "robot_position": robot_position.copy(),
-                                                    "position_on_track": position_on_track.to_dict()})
+        if self.binary_messages:
+            msg = self.position_codec.encode(self.robot.id, position_on_track, robot_position[0], robot_position[1],
+                                             theta, self.position_sequence, self.clock())
+        else:
+            msg = {"robot_id": self.robot.id, "robot_position": robot_position.copy(),
+                   "position_on_track": position_on_track.to_dict()}
+        self.robot.ClientCommunication.send_msg_to(coordinator.COORDINATOR_ID, msg)
+        self.position_sequence += 1
 
     def check_for_beacons(self, save_to_file: bool = False):
         """
@@ -201,17 +295,19 @@ class RobotController:
             save_to_file (bool): If True, save the calibration data to a file.
 
         Returns:
-            None
+            bool: True if a new beacon was found and the odometry was synchronized with it.
         """
         if self.beacon_detector.new_beacon_found():
             print(f"[{self.robot.id.split('_')[-1]}] found beacon: {self.beacon_detector.last_beacon.name}")
             if save_to_file:
                 self.save_calibration(self.odometry)
             self.odometry.sync_with_beacon(self.beacon_detector.last_beacon)
+            return True
+        return False
 
     def save_calibration(self, odometry: Odometry):
         """
-        Save the calibration data to a file if a beacon transition is detected.
+        Record the calibration data in the calibration store if a beacon transition is detected.
 
         Args:
             odometry (Odometry): The odometry object containing the robot's position and orientation.
@@ -228,69 +324,47 @@ class RobotController:
                 theta_correction_factor = (
                     self.beacon_detector.last_beacon.orientation - previous_beacon_theta) / (
                     odometry.theta - previous_beacon_theta)
-                save_calibration_to_file(self.robot.id,
-                                         odometry.position_from_beacon.from_beacon,
-                                         self.beacon_detector.last_beacon,
-                                         distance_correction_factor, theta_correction_factor)
+                self.calibration_store.record(self.robot.id,
+                                              odometry.position_from_beacon.from_beacon.name,
+                                              self.beacon_detector.last_beacon.name,
+                                              distance_correction_factor, theta_correction_factor)
 
-    def read_proximity_sensors(self):
+    def update_proximity_filters(self, proximity: list[int]):
         """
-        Read the proximity sensors and update the sensor memory.
+        Update the proximity filters with the values of the proximity sensors.
+
+        Args:
+            proximity (list[int]): The calibrated proximity sensor values.
 
         Returns:
             None
         """
-        self.proximity_memory.update_memory(self.robot.get_calibrate_prox())
+        self.proximity_filters.update(proximity)
 
     def handle_incoming_messages(self):
         """
         Handle incoming messages from the coordinator and update the robot's speed factor accordingly.
+        If several speed factors are pending, only the latest one is applied.
 
         Returns:
             None
         """
+        speed_factor = None
         while self.robot.has_receive_msg():
             msg = self.robot.receive_msg()
             if msg.get("speed_factor"):
                 speed_factor = msg.get("speed_factor")
-                print(f"[{self.robot.id.split('_')[-1]}] received speed factor: {speed_factor}")
-                self.track_follower.speed_factor = speed_factor
-
-
-def save_calibration_to_file(robot_id: str, from_beacon: Beacon, to_beacon: Beacon, distance_correction_factor: float,
-                             theta_correction_factor: float):
-    """
-    Save calibration data to a JSON file for later use.
-
-    Args:
-        robot_id (str): The robot's unique identifier.
-        from_beacon (Beacon): The starting beacon.
-        to_beacon (Beacon): The destination beacon.
-        distance_correction_factor (float): Correction factor for distance.
-        theta_correction_factor (float): Correction factor for orientation.
-
-    Returns:
-        None
-    """
-    calibration_file = "calibrate.json"
-    if os.path.exists(calibration_file):
-        with open("calibrate.json", "r") as f:
-            string = f.read()
-            calibration_dict = json.loads(string)
-    else:
-        calibration_dict = {}
-    calibration_dict[robot_id] = {"from": from_beacon.name, "to": to_beacon.name,
-                                  "distance_correction_factor": distance_correction_factor,
-                                  "theta_correction_factor": theta_correction_factor}
-    with open("calibrate.json", "w") as f:
-        f.write(json.dumps(calibration_dict))
-        f.flush()
-        f.close()
+        if speed_factor is not None:
+            print(f"[{self.robot.id.split('_')[-1]}] received speed factor: {speed_factor}")
+            self.track_follower.speed_factor = speed_factor
 
 
 if __name__ == '__main__':
-    if len(sys.argv) == 2:
-        ip = sys.argv[1]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) == 1:
+        ip = args[0]
     else:
         ip = '192.168.2.207'
-    RobotController(ip).run()
+    trajectory_file = f"trajectory_{ip.replace('.', '_')}.npz" if '--trajectory' in sys.argv else None
+    RobotController(ip, profile='--profile' in sys.argv, prefetch='--prefetch' in sys.argv,
+                    trajectory_file=trajectory_file, binary_messages='--dict-messages' not in sys.argv).run()
@@ -0,0 +1,121 @@
+"""
+run_index.py
+
+Run-length encoding of classified sensor streams for the ePuck robot, e.g. the grey flags of the ground sensors.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+class Run:
+    """
+    A run of consecutive steps with the same label.
+
+    Attributes:
+        label (int): The label of the steps, e.g. 1 for grey and 0 for not grey.
+        start (int): The first step of the run.
+        length (int): The number of steps of the run.
+        distance (float): The distance travelled during the run, e.g. in m from the odometry, or in steps.
+    """
+    __slots__ = ("label", "start", "length", "distance")
+
+    def __init__(self, label: int, start: int, length: int = 1, distance: float = 1):
+        self.label: int = label
+        self.start: int = start
+        self.length: int = length
+        self.distance: float = distance
+
+    @property
+    def end(self) -> int:
+        """
+        Returns:
+            int: The step after the last step of the run.
+        """
+        return self.start + self.length
+
+    def __repr__(self) -> str:
+        return f"Run(label={self.label}, start={self.start}, length={self.length}, distance={self.distance})"
+
+
+class RunIndex:
+    """
+    The RunIndex encodes a stream of labels into runs of equal labels.
+    Online, each label is appended in constant time. Offline, a whole recording is encoded at once with NumPy.
+    """
+    def __init__(self, max_runs: int | None = None):
+        """
+        Initialize an empty RunIndex.
+
+        Args:
+            max_runs (int | None): Number of runs to keep, the oldest runs are dropped. None keeps all runs.
+        """
+        self.runs: deque[Run] = deque(maxlen=max_runs)
+        self.steps: int = 0  # number of labels appended
+
+    @classmethod
+    def from_labels(cls, labels: np.ndarray, distances: np.ndarray | None = None) -> 'RunIndex':
+        """
+        Encode a whole recording of labels at once.
+
+        Args:
+            labels (np.ndarray): The label of every step.
+            distances (np.ndarray | None): The distance travelled in every step. Defaults to 1 per step.
+
+        Returns:
+            RunIndex: The index with all runs of the recording.
+        """
+        index = cls()
+        labels = np.asarray(labels)
+        if len(labels) == 0:
+            return index
+        starts = np.flatnonzero(np.concatenate(([True], labels[1:] != labels[:-1])))
+        lengths = np.diff(np.append(starts, len(labels)))
+        run_distances = lengths if distances is None else np.add.reduceat(np.asarray(distances), starts)
+        index.runs.extend(Run(label, start, length, distance) for label, start, length, distance in zip(
+            labels[starts].tolist(), starts.tolist(), lengths.tolist(), run_distances.tolist()))
+        index.steps = len(labels)
+        return index
+
+    @property
+    def current(self) -> Run | None:
+        """
+        Returns:
+            Run | None: The run of the last appended label, or None if the index is empty.
+        """
+        return self.runs[-1] if self.runs else None
+
+    def append(self, label: int, distance: float = 1) -> Run | None:
+        """
+        Append the label of the next step, extending the current run or starting a new one.
+
+        Args:
+            label (int): The label of the step.
+            distance (float): The distance travelled in the step. Defaults to 1, to measure the runs in steps.
+
+        Returns:
+            Run | None: The run that ended with this step, if the label differs from the previous one.
+        """
+        current = self.current
+        self.steps += 1
+        if current is not None and current.label == label:
+            current.length += 1
+            current.distance += distance
+            return None
+        self.runs.append(Run(label, self.steps - 1, 1, distance))
+        return current
+
+    def clear(self):
+        """
+        Remove all runs.
+        """
+        self.runs.clear()
+        self.steps = 0
@@ -0,0 +1,368 @@
+"""
+sensor_filters.py
+
+Streaming filters for the sensor readings of the ePuck robot. Every filter is updated once per
+sample in constant or logarithmic time, and its value can be queried any number of times without
+recomputation.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import heapq
+from collections import deque
+
+
+class ExponentialMovingAverage:
+    """
+    Exponential moving average, weighting the newest sample with alpha.
+    """
+    def __init__(self, alpha: float):
+        """
+        Initialize the ExponentialMovingAverage.
+
+        Args:
+            alpha (float): Weight of the newest sample between 0 and 1. Higher values react faster.
+        """
+        self.alpha: float = alpha
+        self.value: float | None = None
+
+    def update(self, sample: float):
+        """
+        Add a sample, the first sample initializes the average.
+
+        Args:
+            sample (float): The new sample.
+        """
+        if self.value is None:
+            self.value = sample
+        else:
+            self.value += self.alpha * (sample - self.value)
+
+
+class RunningVariance:
+    """
+    Mean and variance over the last 'length' samples, maintained with running sums.
+    """
+    def __init__(self, length: int):
+        """
+        Initialize the RunningVariance.
+
+        Args:
+            length (int): Number of samples in the window.
+        """
+        self.length: int = length
+        self.window: deque[float] = deque()
+        self.sum: float = 0
+        self.sum_of_squares: float = 0
+        self.updates: int = 0
+
+    def update(self, sample: float):
+        """
+        Add a sample and remove the oldest one if the window is full.
+
+        Args:
+            sample (float): The new sample.
+        """
+        if len(self.window) == self.length:
+            oldest = self.window.popleft()
+            self.sum -= oldest
+            self.sum_of_squares -= oldest * oldest
+        self.window.append(sample)
+        self.sum += sample
+        self.sum_of_squares += sample * sample
+
+        self.updates += 1
+        if self.updates % self.length == 0:
+            # Resum once per window to stop rounding errors from accumulating
+            self.sum = sum(self.window)
+            self.sum_of_squares = sum(x * x for x in self.window)
+
+    def mean(self) -> float | None:
+        """
+        Returns:
+            float | None: The mean of the window, or None if it is empty.
+        """
+        return self.sum / len(self.window) if self.window else None
+
+    def variance(self) -> float | None:
+        """
+        Returns:
+            float | None: The population variance of the window, or None if it is empty.
+        """
+        if not self.window:
+            return None
+        mean = self.sum / len(self.window)
+        return max(self.sum_of_squares / len(self.window) - mean * mean, 0.0)
+
+
+class SlidingMinMax:
+    """
+    Minimum and maximum over the last 'length' samples, using monotonic deques
+    so each sample is added and removed at most once.
+    """
+    def __init__(self, length: int):
+        """
+        Initialize the SlidingMinMax.
+
+        Args:
+            length (int): Number of samples in the window.
+        """
+        self.length: int = length
+        self.index: int = 0
+        self.minima: deque[tuple[int, float]] = deque()  # increasing values, candidates for the minimum
+        self.maxima: deque[tuple[int, float]] = deque()  # decreasing values, candidates for the maximum
+
+    def update(self, sample: float):
+        """
+        Add a sample and drop the samples that left the window or can no longer be the extreme.
+
+        Args:
+            sample (float): The new sample.
+        """
+        while self.minima and self.minima[-1][1] >= sample:
+            self.minima.pop()
+        self.minima.append((self.index, sample))
+        while self.maxima and self.maxima[-1][1] <= sample:
+            self.maxima.pop()
+        self.maxima.append((self.index, sample))
+
+        oldest_index = self.index - self.length
+        if self.minima[0][0] <= oldest_index:
+            self.minima.popleft()
+        if self.maxima[0][0] <= oldest_index:
+            self.maxima.popleft()
+        self.index += 1
+
+    def minimum(self) -> float | None:
+        """
+        Returns:
+            float | None: The minimum of the window, or None if it is empty.
+        """
+        return self.minima[0][1] if self.minima else None
+
+    def maximum(self) -> float | None:
+        """
+        Returns:
+            float | None: The maximum of the window, or None if it is empty.
+        """
+        return self.maxima[0][1] if self.maxima else None
+
+
+class RunningMedian:
+    """
+    Median over the last 'length' samples, using two heaps: a max-heap with the lower half and a min-heap
+    with the upper half of the window. Samples leaving the window are deleted lazily once they reach the
+    top of their heap, so each update takes O(log n). Deleted samples buried inside a heap are dropped by
+    rebuilding the heaps whenever they hold more than twice the window.
+    """
+    def __init__(self, length: int):
+        """
+        Initialize the RunningMedian.
+
+        Args:
+            length (int): Number of samples in the window.
+        """
+        self.length: int = length
+        self.window: deque[float] = deque()
+        self.lower: list[float] = []  # max-heap of the lower half, stored negated
+        self.upper: list[float] = []  # min-heap of the upper half
+        self.lower_size: int = 0  # number of valid samples in lower
+        self.upper_size: int = 0  # number of valid samples in upper
+        self.deleted: dict[float, int] = {}  # samples that left the window but are still in a heap
+
+    def update(self, sample: float):
+        """
+        Add a sample and remove the oldest one if the window is full.
+
+        Args:
+            sample (float): The new sample.
+        """
+        if len(self.window) == self.length:
+            self.__remove(self.window.popleft())
+        self.window.append(sample)
+
+        if not self.lower or sample <= -self.lower[0]:
+            heapq.heappush(self.lower, -sample)
+            self.lower_size += 1
+        else:
+            heapq.heappush(self.upper, sample)
+            self.upper_size += 1
+        self.__balance()
+
+        if len(self.lower) + len(self.upper) > 2 * self.length:
+            self.__rebuild()
+
+    def median(self) -> float | None:
+        """
+        Returns:
+            float | None: The median of the window, or None if it is empty.
+        """
+        if not self.window:
+            return None
+        if self.lower_size > self.upper_size:
+            return -self.lower[0]
+        return (-self.lower[0] + self.upper[0]) / 2
+
+    def __remove(self, sample: float):
+        """
+        Mark a sample as deleted and remove it from the top of its heap if it is there.
+        """
+        self.deleted[sample] = self.deleted.get(sample, 0) + 1
+        if sample <= -self.lower[0]:
+            self.lower_size -= 1
+            if sample == -self.lower[0]:
+                self.__prune(self.lower, -1)
+        else:
+            self.upper_size -= 1
+            if sample == self.upper[0]:
+                self.__prune(self.upper, 1)
+        self.__balance()
+
+    def __rebuild(self):
+        """
+        Rebuild both heaps from the window, dropping all deleted samples.
+        """
+        ordered = sorted(self.window)
+        self.upper_size = len(ordered) // 2
+        self.lower_size = len(ordered) - self.upper_size
+        self.lower = [-x for x in reversed(ordered[:self.lower_size])]  # a descending list negated is a heap
+        self.upper = ordered[self.lower_size:]  # a sorted list is a heap
+        self.deleted.clear()
+
+    def __prune(self, heap: list[float], sign: int):
+        """
+        Pop deleted samples from the top of a heap.
+
+        Args:
+            heap (list[float]): The heap to prune.
+            sign (int): -1 for the negated lower heap, 1 for the upper heap.
+        """
+        while heap:
+            top = sign * heap[0]
+            count = self.deleted.get(top, 0)
+            if count == 0:
+                return
+            if count == 1:
+                del self.deleted[top]
+            else:
+                self.deleted[top] = count - 1
+            heapq.heappop(heap)
+
+    def __balance(self):
+        """
+        Move samples between the heaps, so the lower half has as many or one more valid samples than the upper half.
+        """
+        if self.lower_size > self.upper_size + 1:
+            heapq.heappush(self.upper, -heapq.heappop(self.lower))
+            self.lower_size -= 1
+            self.upper_size += 1
+            self.__prune(self.lower, -1)
+        elif self.lower_size < self.upper_size:
+            heapq.heappush(self.lower, -heapq.heappop(self.upper))
+            self.upper_size -= 1
+            self.lower_size += 1
+            self.__prune(self.upper, 1)
+
+
+class FilterBank:
+    """
+    The FilterBank class applies a set of streaming filters to every channel of a sensor,
+    e.g. the eight proximity sensors. Each filter is updated once per reading and can be
+    queried by any module without recomputation.
+    """
+    FILTERS: tuple[str, ...] = ("ema", "median", "variance", "minmax")
+
+    def __init__(self, length: int, alpha: float = 0.5, filters: tuple[str, ...] = FILTERS):
+        """
+        Initialize the FilterBank. The channels are created on the first update.
+
+        Args:
+            length (int): Number of readings in the window of the windowed filters.
+            alpha (float): Weight of the newest reading for the exponential moving average.
+            filters (tuple[str, ...]): The filters to maintain, a subset of FILTERS. Defaults to all.
+        """
+        unknown = set(filters) - set(self.FILTERS)
+        assert not unknown, f"unknown filters: {unknown}"
+        self.length: int = length
+        self.alpha: float = alpha
+        self.filters: tuple[str, ...] = filters
+        self.emas: list[ExponentialMovingAverage] = []
+        self.medians: list[RunningMedian] = []
+        self.variances: list[RunningVariance] = []
+        self.min_maxs: list[SlidingMinMax] = []
+
+    def update(self, sensor_data: list[float]):
+        """
+        Update all filters of all channels with a new reading.
+
+        Args:
+            sensor_data (list[float]): The latest reading, one value per channel.
+        """
+        if not (self.emas or self.medians or self.variances or self.min_maxs):
+            self.__create_channels(len(sensor_data))
+        for filters in (self.emas, self.medians, self.variances, self.min_maxs):
+            for channel, value in zip(filters, sensor_data):
+                channel.update(value)
+
+    def __create_channels(self, channels: int):
+        """
+        Create the enabled filters for every channel.
+
+        Args:
+            channels (int): Number of channels of the sensor.
+        """
+        if "ema" in self.filters:
+            self.emas = [ExponentialMovingAverage(self.alpha) for _ in range(channels)]
+        if "median" in self.filters:
+            self.medians = [RunningMedian(self.length) for _ in range(channels)]
+        if "variance" in self.filters:
+            self.variances = [RunningVariance(self.length) for _ in range(channels)]
+        if "minmax" in self.filters:
+            self.min_maxs = [SlidingMinMax(self.length) for _ in range(channels)]
+
+    def ema(self) -> list[float | None]:
+        """
+        Returns:
+            list[float | None]: The exponential moving average per channel.
+        """
+        return [channel.value for channel in self.emas]
+
+    def median(self) -> list[float | None]:
+        """
+        Returns:
+            list[float | None]: The median of the window per channel.
+        """
+        return [channel.median() for channel in self.medians]
+
+    def mean(self) -> list[float | None]:
+        """
+        Returns:
+            list[float | None]: The mean of the window per channel, needs the variance filter.
+        """
+        return [channel.mean() for channel in self.variances]
+
+    def variance(self) -> list[float | None]:
+        """
+        Returns:
+            list[float | None]: The variance of the window per channel.
+        """
+        return [channel.variance() for channel in self.variances]
+
+    def minimum(self) -> list[float | None]:
+        """
+        Returns:
+            list[float | None]: The minimum of the window per channel.
+        """
+        return [channel.minimum() for channel in self.min_maxs]
+
+    def maximum(self) -> list[float | None]:
+        """
+        Returns:
+            list[float | None]: The maximum of the window per channel.
+        """
+        return [channel.maximum() for channel in self.min_maxs]
@@ -11,10 +11,16 @@ Date:
     18 May 2025
 """
 
+import numpy as np
+
+
 class SensorMemory:
     """
     The SensorMemory class stores a fixed number of recent sensor readings
     and provides methods to update, average, and clear the memory.
+
+    The readings are kept in a preallocated ring buffer together with their running sum,
+    so updating and averaging take constant time independent of the length of the memory.
     """
     def __init__(self, length: int):
         """
@@ -24,41 +30,68 @@ class SensorMemory:
         Args:
             length (int): The maximum number of sensor readings to store.
         """
-        self.memory: list[list[int]] = []
         self.length = length
+        self.buffer: np.ndarray | None = None  # ring buffer, allocated on the first update
+        self.sum: np.ndarray | None = None  # running sum of the readings in the buffer
+        self.index: int = 0  # position of the next reading in the buffer
+        self.count: int = 0  # number of readings in the buffer
+        self.average: list[float] | None = None  # cached average, None if outdated
+
+    @property
+    def memory(self) -> list[list[float]]:
+        """
+        The stored sensor readings, from the oldest to the newest.
+
+        Returns:
+            list[list[float]]: The stored readings.
+        """
+        if self.count == 0:
+            return []
+        start = (self.index - self.count) % self.length
+        order = [(start + i) % self.length for i in range(self.count)]
+        return self.buffer[order].tolist()
 
     def update_memory(self, sensor_data: list[int]):
         """
         Update the memory with new sensor data. If the memory is full,
-        remove the oldest entry before adding the new data.
+        the oldest entry is replaced by the new data.
 
         Args:
             sensor_data (list[int]): The latest sensor reading to store.
         """
-        if len(self.memory) >= self.length:
-            # Remove the oldest data if memory is full
-            self.memory.pop(0)
-        self.memory.append(sensor_data)
+        if self.buffer is None:
+            self.buffer = np.zeros((self.length, len(sensor_data)))
+            self.sum = np.zeros(len(sensor_data))
+
+        if self.count >= self.length:
+            # Remove the oldest data from the sum, it is overwritten below
+            self.sum -= self.buffer[self.index]
+        else:
+            self.count += 1
+        self.buffer[self.index] = sensor_data
+        self.sum += self.buffer[self.index]
+
+        self.index += 1
+        if self.index == self.length:
+            self.index = 0
+            # Resum once per round to stop rounding errors of float readings from accumulating
+            self.sum = self.buffer[:self.count].sum(axis=0)
+        self.average = None
 
     def get_average(self):
         """
         Calculate the average of the sensor data in memory.
+        The average is cached until the next update.
 
         Returns:
             list[float] | None: The average value for each sensor, or None if memory is empty.
         """
-        if not self.memory:
+        if self.count == 0:
             return None
-        # Calculate the average for each sensor
-        average = [0] * len(self.memory[0])
-        for data in self.memory:
-            for i in range(len(data)):
-                average[i] += data[i]
-
-        # Divide by the number of entries to get the average
-        for i in range(len(average)):
-            average[i] /= len(self.memory)
-        return average
+        if self.average is None:
+            self.average = (self.sum / self.count).tolist()
+        # Return a copy, as callers may modify the list (e.g. reversing it for the inverted side)
+        return list(self.average)
 
     def clear_memory(self):
         """
@@ -67,4 +100,8 @@ class SensorMemory:
         Returns:
             None
         """
-        self.memory.clear()
\ No newline at end of file
+        self.index = 0
+        self.count = 0
+        self.average = None
+        if self.sum is not None:
+            self.sum[:] = 0
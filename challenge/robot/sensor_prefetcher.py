@@ -0,0 +1,220 @@
+"""
+sensor_prefetcher.py
+
+Acquires the sensor values of the ePuck robot for the control loop, either sequentially in the
+loop itself or on a worker thread that keeps the next reading in flight while the loop computes.
+
+On the real robot the sensor values of all sensors arrive together with the answer to go_on,
+so one snapshot consists of a call to go_on followed by reading the decoded values.
+go_on also sends the command packet, so the readers hold a robot I/O lock while reading a snapshot.
+The same lock has to be held by every other call writing to the robot, see ActuatorCache.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import threading
+from time import perf_counter_ns
+from typing import Callable
+
+from challenge.robot.loop_profiler import LoopProfiler
+
+
+class SensorSnapshot:
+    """
+    Stores the values of the sensors read after one call of go_on, with the time they were read.
+    """
+
+    def __init__(self, sequence: int, ground: list[int], proximity: list[int], tof: int | None, timestamp: int):
+        """
+        Initialize a SensorSnapshot.
+
+        Args:
+            sequence (int): Number of the snapshot, counting from 0.
+            ground (list[int]): Ground sensor values.
+            proximity (list[int]): Calibrated proximity sensor values.
+            tof (int | None): Time of flight value in mm, None if it was not read.
+            timestamp (int): Time the values were read, in ns of the clock of the reader.
+        """
+        self.sequence: int = sequence
+        self.ground: list[int] = ground
+        self.proximity: list[int] = proximity
+        self.tof: int | None = tof
+        self.timestamp: int = timestamp
+
+    def age_ns(self, now_ns: int | None = None) -> int:
+        """
+        Get the age of the snapshot.
+
+        Args:
+            now_ns (int | None): Current time in ns, defaults to perf_counter_ns.
+
+        Returns:
+            int: Time since the values were read, in ns.
+        """
+        return (now_ns if now_ns is not None else perf_counter_ns()) - self.timestamp
+
+
+class SequentialSensorReader:
+    """
+    The SequentialSensorReader reads the sensors in the control loop itself, so each tick takes
+    the time of the reading plus the time of the computation.
+    """
+
+    def __init__(self, robot, read_tof: bool = False, profiler: LoopProfiler | None = None,
+                 clock: Callable[[], int] = perf_counter_ns, lock: 'threading.RLock | None' = None):
+        """
+        Initialize the SequentialSensorReader.
+
+        Args:
+            robot: The robot instance to read from.
+            read_tof (bool): If True, the time of flight sensor is read as well.
+            profiler (LoopProfiler | None): Profiler to record the duration of go_on and the reads in.
+            clock (Callable[[], int]): Clock in ns for the timestamps of the snapshots.
+            lock (threading.RLock | None): Robot I/O lock held while reading a snapshot, a new one if None.
+        """
+        self.robot = robot
+        self.lock: threading.RLock = lock if lock is not None else threading.RLock()
+        self.read_tof: bool = read_tof
+        self.profiler: LoopProfiler = profiler if profiler is not None else LoopProfiler(enabled=False)
+        self.clock: Callable[[], int] = clock
+        self.latest: SensorSnapshot | None = None
+        self.sequence: int = 0
+
+    def start(self):
+        """
+        Nothing to start, the sensors are read in next_snapshot.
+        """
+        pass
+
+    def next_snapshot(self) -> SensorSnapshot | None:
+        """
+        Call go_on and read the sensors.
+
+        Returns:
+            SensorSnapshot | None: The new snapshot, or None if go_on failed.
+        """
+        with self.lock:
+            if not self.robot.go_on():
+                return None
+            self.profiler.mark("go_on")
+            ground = self.robot.get_ground()
+            self.profiler.mark("ground")
+            proximity = self.robot.get_calibrate_prox()
+            tof = self.robot.get_tof() if self.read_tof else None
+            self.profiler.mark("proximity")
+        self.latest = SensorSnapshot(self.sequence, ground, proximity, tof, self.clock())
+        self.sequence += 1
+        return self.latest
+
+    def stop(self):
+        """
+        Nothing to stop.
+        """
+        pass
+
+
+class SensorPrefetcher:
+    """
+    The SensorPrefetcher reads the sensors on a worker thread. As soon as the control loop takes a
+    snapshot, the worker calls go_on and reads the next one, so reading and computing overlap and a
+    tick takes max(read, compute) instead of read + compute.
+
+    At most one snapshot is read ahead, so the control loop never skips a snapshot and the
+    commands set in one tick are sent with the go_on of the snapshot after the next one.
+
+    The worker holds the robot I/O lock while it calls go_on and reads the sensors, so the control loop
+    must hold the same lock while it writes commands, e.g. by passing it to the ActuatorCache.
+    """
+
+    def __init__(self, robot, read_tof: bool = False, profiler: LoopProfiler | None = None,
+                 clock: Callable[[], int] = perf_counter_ns, lock: 'threading.RLock | None' = None):
+        """
+        Initialize the SensorPrefetcher.
+
+        Args:
+            robot: The robot instance to read from.
+            read_tof (bool): If True, the time of flight sensor is read as well.
+            profiler (LoopProfiler | None): Profiler to record the time spent waiting for a snapshot in.
+            clock (Callable[[], int]): Clock in ns for the timestamps of the snapshots.
+            lock (threading.RLock | None): Robot I/O lock held while reading a snapshot, a new one if None.
+        """
+        self.robot = robot
+        self.lock: threading.RLock = lock if lock is not None else threading.RLock()
+        self.read_tof: bool = read_tof
+        self.profiler: LoopProfiler = profiler if profiler is not None else LoopProfiler(enabled=False)
+        self.clock: Callable[[], int] = clock
+        self.latest: SensorSnapshot | None = None
+        self.condition: threading.Condition = threading.Condition()
+        self.consumed: bool = True  # True if the latest snapshot was already taken by the control loop
+        self.running: bool = False
+        self.thread: threading.Thread | None = None
+
+    def start(self):
+        """
+        Start the worker thread, which immediately reads the first snapshot.
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self.__read_loop, name=f"sensors-{self.robot.id}", daemon=True)
+        self.thread.start()
+
+    def __read_loop(self):
+        """
+        Read a snapshot whenever the previous one was taken, until go_on fails or stop is called.
+        """
+        sequence = 0
+        try:
+            while True:
+                with self.condition:
+                    while self.running and not self.consumed:
+                        self.condition.wait()
+                    if not self.running:
+                        return
+                with self.lock:
+                    if not self.robot.go_on():
+                        return
+                    ground = self.robot.get_ground()
+                    proximity = self.robot.get_calibrate_prox()
+                    tof = self.robot.get_tof() if self.read_tof else None
+                snapshot = SensorSnapshot(sequence, ground, proximity, tof, self.clock())
+                sequence += 1
+                with self.condition:
+                    self.latest = snapshot
+                    self.consumed = False
+                    self.condition.notify_all()
+        finally:
+            with self.condition:
+                self.running = False
+                self.condition.notify_all()
+
+    def next_snapshot(self) -> SensorSnapshot | None:
+        """
+        Take the snapshot that was read ahead, waiting for it if it is not complete yet.
+
+        Returns:
+            SensorSnapshot | None: The new snapshot, or None if the worker has stopped.
+        """
+        with self.condition:
+            while self.consumed and self.running:
+                self.condition.wait()
+            if self.consumed:
+                return None
+            self.consumed = True
+            self.condition.notify_all()
+            snapshot = self.latest
+        self.profiler.mark("wait for sensors")
+        return snapshot
+
+    def stop(self):
+        """
+        Stop the worker thread and wait until its current reading is finished.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
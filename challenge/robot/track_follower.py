@@ -13,6 +13,8 @@ Date:
 
 from enum import Enum
 
+from challenge.robot.ground_classifier import BLACK, COLORS, GREY, MIRRORED
+
 
 class RobotPosition(Enum):
     IS_LEFT = 0
@@ -21,20 +23,50 @@ class RobotPosition(Enum):
     ERROR = 3
     UNKNOWN = 4
 
+# Decisions of the approaches for each pattern of sensors on the line (left, middle, right):
+# the position of the robot, the (left_speed_factor, right_speed_factor) or None if error, and a warning to print
+Decision = tuple[RobotPosition, tuple[float, float] | None, str | None]
+
+BINARY_APPROACH: dict[tuple[bool, bool, bool], Decision] = {
+    (True, True, False): (RobotPosition.IS_RIGHT, (1, 2), None),  # is right
+    (False, True, True): (RobotPosition.IS_LEFT, (2, 1), None),  # is left
+    (True, True, True): (RobotPosition.IS_MIDDLE, (2, 2), None),  # middle
+    (True, False, False): (RobotPosition.IS_RIGHT, (-2, 2), None),  # far right
+    (False, False, True): (RobotPosition.IS_LEFT, (2, -2), None),  # far left
+    (True, False, True): (RobotPosition.UNKNOWN, (-2, 2), None),  # path splits
+    (False, True, False): (RobotPosition.IS_MIDDLE, (2, 2), None),  # middle
+    (False, False, False): (RobotPosition.ERROR, None, "ERROR: black_list = [False, False, False]"),
+}
+
+TWO_SENSORS_APPROACH: dict[tuple[bool, bool, bool], Decision] = {
+    (False, False, False): (RobotPosition.UNKNOWN, (-1, 1), "WARNING, no black"),  # 0: no black
+    (False, False, True): (RobotPosition.IS_LEFT, (1, -1), None),  # 1: extremely far left
+    (False, True, False): (RobotPosition.UNKNOWN, (0.5, 0.5), "WARNING, 010"),  # 2: ERROR
+    (False, True, True): (RobotPosition.IS_LEFT, (1, -1), None),  # 3: far left
+    (True, False, False): (RobotPosition.IS_RIGHT, (0, 1), None),  # 4: right
+    (True, False, True): (RobotPosition.UNKNOWN, (1, 1), "WARNING, 101"),  # 5: ERROR, handle as middle
+    (True, True, False): (RobotPosition.IS_MIDDLE, (1, 1), None),  # 6: middle
+    (True, True, True): (RobotPosition.IS_LEFT, (1, 0), None),  # 7: left
+}
+
+
 class TrackFollower:
     """
-    The TrackFollower class provides methods to follow a track using ground sensor values.
+    The TrackFollower class provides methods to follow a track using the ground code of the GroundClassifier.
     It supports different approaches for interpreting sensor data and adjusts the robot's
     speed and direction accordingly.
+
+    The decisions of both approaches are looked up in tables indexed by the ground code,
+    which are built whenever the colors considered as the line change.
     """
-    def __init__(self, robot, norm_speed: float, line_max_value: int):
+    def __init__(self, robot, norm_speed: float, line_colors: tuple[int, ...] = (BLACK, GREY)):
         """
         Initialize the TrackFollower.
 
         Args:
             robot: The robot instance to control.
             norm_speed (float): The robot's normal speed.
-            line_max_value (int): The maximum sensor value considered as being on the line.
+            line_colors (tuple[int, ...]): The colors of the ground classifier considered as being on the line.
         """
         self.robot = robot
         self.norm_speed = norm_speed
@@ -42,110 +74,70 @@ class TrackFollower:
         self.position: RobotPosition = RobotPosition.UNKNOWN
         self.speed_factor: float = 1.0
         self.obstacle_speed_factor: float = 1
-        self.line_max_value = line_max_value # the max brightness value for the line
+        self.line_colors: tuple[int, ...] = ()
+        self.binary_table: list[Decision] = []
+        self.two_sensors_table: list[Decision] = []
+        self.set_line_colors(*line_colors)
+
+    def set_line_colors(self, *line_colors: int):
+        """
+        Set the colors considered as being on the line and rebuild the decision tables.
 
-    def on_line(self, value: int) -> bool:
+        Args:
+            *line_colors (int): The colors of the ground classifier considered as being on the line.
+        """
+        self.line_colors = line_colors
+        patterns = [tuple(color in line_colors for color in colors) for colors in COLORS]
+        self.binary_table = [BINARY_APPROACH[pattern] for pattern in patterns]
+        self.two_sensors_table = [TWO_SENSORS_APPROACH[pattern] for pattern in patterns]
+
+    def __decide(self, decision: Decision) -> tuple[float, float] | None:
         """
-        Determine if a sensor value indicates the robot is on the line.
+        Apply a decision of one of the approaches.
 
         Args:
-            value (int): The ground sensor value.
+            decision (Decision): The position, speed factors and warning looked up for the ground code.
 
         Returns:
-            bool: True if the value is below the line_max_value, False otherwise.
+            tuple[float, float] | None: (left_speed_factor, right_speed_factor) or None if error.
         """
-        return value < self.line_max_value
+        self.position, speed_factors, warning = decision
+        if warning is not None:
+            print(warning)
+        return speed_factors
 
-    def binary_approach(self, gs: list[int]) -> tuple[float, float] | None:
+    def binary_approach(self, ground_code: int) -> tuple[float, float] | None:
         """
         Try to follow the track staying in the middle of the line using a binary approach, e.g. the values of the ground
          sensor are classified into either on the track or not on the track.
 
         Args:
-            gs (list[int]): List of ground sensor values.
+            ground_code (int): The ground code of the ground sensor values.
 
         Returns:
             tuple[float, float] | None: (left_speed_factor, right_speed_factor) or None if error.
         """
-        black_list: list[bool] = [self.on_line(v) for v in gs]
-        match black_list:
-            case [True, True, False]:  # is right
-                self.position = RobotPosition.IS_RIGHT
-                return 1, 2
-            case [False, True, True]:  # is left
-                self.position = RobotPosition.IS_LEFT
-                return 2, 1
-            case [True, True, True]:  # middle
-                self.position = RobotPosition.IS_MIDDLE
-                return 2, 2
-            case [True, False, False]:  # far right
-                self.position = RobotPosition.IS_RIGHT
-                return -2, 2
-            case [False, False, True]:  # far left
-                self.position = RobotPosition.IS_LEFT
-                return 2, -2
-            case [True, False, True]:  # path splits
-                self.position = RobotPosition.UNKNOWN
-                return -2, 2
-            case [False, True, False]:  # middle
-                self.position = RobotPosition.IS_MIDDLE
-                return 2, 2
-            case _:  # else
-                self.position = RobotPosition.ERROR
-                print(f"ERROR: black_list = {black_list}")
-                return None
-
-    def two_sensors_approach(self, gs: list[int]) -> tuple[float, float] | None:
+        return self.__decide(self.binary_table[ground_code])
+
+    def two_sensors_approach(self, ground_code: int) -> tuple[float, float] | None:
         """
         Try to follow the track with only two sensors on the line and one sensor off the line,
         which results in following one edge of the line.
 
         Args:
-            gs (list[int]): List of ground sensor values.
+            ground_code (int): The ground code of the ground sensor values.
 
         Returns:
             tuple[float, float] | None: (left_speed_factor, right_speed_factor) or None if error.
         """
-        black_list: list[bool] = [self.on_line(v) for v in gs]
-        match black_list:
-            case [False, False, False]:  # 0: no black
-                self.position = RobotPosition.UNKNOWN
-                print("WARNING, no black")
-                return -1, 1
-            case [False, False, True]:  # 1: extremely far left
-                self.position = RobotPosition.IS_LEFT
-                return 1, -1
-            case [False, True, False]:  # 2: ERROR
-                self.position = RobotPosition.UNKNOWN
-                print("WARNING, 010")
-                return 0.5, 0.5
-            case [False, True, True]:  # 3: far left
-                self.position = RobotPosition.IS_LEFT
-                return 1, -1
-            case [True, False, False]:  # 4: right
-                self.position = RobotPosition.IS_RIGHT
-                return 0, 1
-            case [True, False, True]:  # 5: ERROR
-                self.position = RobotPosition.UNKNOWN
-                print("WARNING, 101")
-                return 1, 1 # handle as middle
-            case [True, True, False]:  # 6: middle
-                self.position = RobotPosition.IS_MIDDLE
-                return 1, 1
-            case [True, True, True]:  # 7: left
-                self.position = RobotPosition.IS_LEFT
-                return 1, 0
-            case _:  # else
-                print("ERROR: should not be possible")
-                self.position = RobotPosition.ERROR
-                return None
-
-    def follow_track(self, gs: list[int], use_two_sensors_approach: bool = False, invert_side: bool = False) -> bool:
+        return self.__decide(self.two_sensors_table[ground_code])
+
+    def follow_track(self, ground_code: int, use_two_sensors_approach: bool = False, invert_side: bool = False) -> bool:
         """
         Follow the track by adjusting the robot's speed based on ground sensor readings.
 
         Args:
-            gs (list[int]): List of ground sensor values.
+            ground_code (int): The ground code of the ground sensor values.
             use_two_sensors_approach (bool): If True, use the two-sensor approach. Otherwise, use binary approach.
             invert_side (bool): If True, reverse the sensor order and swap speeds (for mirrored tracks).
 
@@ -153,11 +145,11 @@ class TrackFollower:
             bool: True if a valid track-following action was taken, False otherwise.
         """
         if invert_side:
-            gs.reverse()
+            ground_code = MIRRORED[ground_code]
         if use_two_sensors_approach:
-            r = self.two_sensors_approach(gs)
+            r = self.two_sensors_approach(ground_code)
         else:
-            r = self.binary_approach(gs)
+            r = self.binary_approach(ground_code)
         if r is not None:
             if invert_side:
                 r = r[::-1] # swap left and right
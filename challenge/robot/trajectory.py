@@ -0,0 +1,234 @@
+"""
+trajectory.py
+
+Records the trajectory of the ePuck robot computed by the odometry, for analyzing the drift after a run.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import numpy as np
+
+from challenge.robot.odometry import OdometryReading
+
+# Columns of a trajectory and their types
+COLUMNS: dict[str, type] = {
+    "step": np.int64,
+    "x": np.float64,
+    "y": np.float64,
+    "theta": np.float64,
+    "timestamp": np.int64,
+    "beacon_sync": np.bool_,
+}
+
+
+class TrajectoryView:
+    """
+    A range of readings of a trajectory. The columns are views into the arrays of the trajectory, not copies,
+    so they change if the trajectory overwrites the readings (only when recording with a max_length).
+
+    Attributes:
+        step (np.ndarray): Number of the odometry update of each reading.
+        x (np.ndarray): X position of each reading, in the coordinates of the odometry.
+        y (np.ndarray): Y position of each reading, in the coordinates of the odometry.
+        theta (np.ndarray): Orientation of each reading in radians.
+        timestamp (np.ndarray): Time of each reading in ns of the odometry's clock.
+        beacon_sync (np.ndarray): True for the readings where the odometry was synchronized with a beacon.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+        self.step: np.ndarray = columns["step"]
+        self.x: np.ndarray = columns["x"]
+        self.y: np.ndarray = columns["y"]
+        self.theta: np.ndarray = columns["theta"]
+        self.timestamp: np.ndarray = columns["timestamp"]
+        self.beacon_sync: np.ndarray = columns["beacon_sync"]
+
+    def __len__(self) -> int:
+        return len(self.step)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Returns:
+            dict[str, np.ndarray]: The columns of the view by name.
+        """
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def reading(self, index: int) -> OdometryReading:
+        """
+        Get one reading of the view.
+
+        Args:
+            index (int): Index of the reading in the view, negative values count from the end.
+
+        Returns:
+            OdometryReading: The reading.
+        """
+        return OdometryReading(int(self.step[index]), float(self.x[index]), float(self.y[index]),
+                               float(self.theta[index]), int(self.timestamp[index]))
+
+
+class Trajectory:
+    """
+    The Trajectory class stores the readings of the odometry column by column in preallocated NumPy arrays.
+
+    Without a max_length, all readings are kept and the arrays double their capacity when full.
+    With a max_length, only the last max_length readings are kept in a ring. Every reading is written twice,
+    at its index and max_length further, so the kept readings are always contiguous in the arrays and
+    can be returned as views in chronological order without copying.
+    """
+
+    def __init__(self, capacity: int = 4096, max_length: int | None = None):
+        """
+        Initialize an empty Trajectory.
+
+        Args:
+            capacity (int): Number of readings to preallocate, ignored if max_length is given.
+            max_length (int | None): Number of readings to keep, None keeps all readings.
+        """
+        self.max_length: int | None = max_length
+        size = 2 * max_length if max_length is not None else capacity
+        self.arrays: dict[str, np.ndarray] = {name: np.zeros(size, dtype) for name, dtype in COLUMNS.items()}
+        self.count: int = 0  # number of readings recorded, including overwritten ones
+
+    def __len__(self) -> int:
+        return self.count if self.max_length is None else min(self.count, self.max_length)
+
+    def append(self, step: int, x: float, y: float, theta: float, timestamp: int, beacon_sync: bool = False):
+        """
+        Record a reading.
+
+        Args:
+            step (int): Number of the odometry update.
+            x (float): X position.
+            y (float): Y position.
+            theta (float): Orientation in radians.
+            timestamp (int): Time in ns.
+            beacon_sync (bool): True if the odometry was synchronized with a beacon.
+        """
+        values = (step, x, y, theta, timestamp, beacon_sync)
+        if self.max_length is None:
+            if self.count == len(self.arrays["step"]):
+                self.__grow()
+            for array, value in zip(self.arrays.values(), values):
+                array[self.count] = value
+        else:
+            index = self.count % self.max_length
+            for array, value in zip(self.arrays.values(), values):
+                array[index] = value
+                array[index + self.max_length] = value
+        self.count += 1
+
+    def append_reading(self, reading: OdometryReading, beacon_sync: bool = False):
+        """
+        Record an OdometryReading.
+
+        Args:
+            reading (OdometryReading): The reading.
+            beacon_sync (bool): True if the odometry was synchronized with a beacon.
+        """
+        self.append(reading.step, reading.x, reading.y, reading.theta, reading.timestamp, beacon_sync)
+
+    def extend(self, steps: np.ndarray, x: np.ndarray, y: np.ndarray, theta: np.ndarray, timestamps: np.ndarray,
+               beacon_sync: np.ndarray | bool = False):
+        """
+        Record several readings at once, e.g. a batch of the odometry.
+
+        Args:
+            steps (np.ndarray): Number of the odometry update of each reading.
+            x (np.ndarray): X position of each reading.
+            y (np.ndarray): Y position of each reading.
+            theta (np.ndarray): Orientation of each reading in radians.
+            timestamps (np.ndarray): Time of each reading in ns.
+            beacon_sync (np.ndarray | bool): True for the readings synchronized with a beacon.
+        """
+        count = len(steps)
+        values = (steps, x, y, theta, timestamps, beacon_sync)
+        if self.max_length is None:
+            while self.count + count > len(self.arrays["step"]):
+                self.__grow()
+            for array, value in zip(self.arrays.values(), values):
+                array[self.count:self.count + count] = value
+        else:
+            # Only the last max_length readings of the batch can be kept
+            kept = min(count, self.max_length)
+            indices = (self.count + count - kept + np.arange(kept)) % self.max_length
+            for array, value in zip(self.arrays.values(), values):
+                value = np.broadcast_to(value, count)[count - kept:]
+                array[indices] = value
+                array[indices + self.max_length] = value
+        self.count += count
+
+    def __grow(self):
+        """
+        Double the capacity of the arrays.
+        """
+        for name, array in self.arrays.items():
+            grown = np.zeros(2 * len(array), array.dtype)
+            grown[:len(array)] = array
+            self.arrays[name] = grown
+
+    def __window(self) -> tuple[int, int]:
+        """
+        Returns:
+            tuple[int, int]: Start and end index of the kept readings in the arrays.
+        """
+        if self.max_length is None or self.count <= self.max_length:
+            return 0, len(self)
+        start = self.count % self.max_length
+        return start, start + self.max_length
+
+    def view(self) -> TrajectoryView:
+        """
+        Returns:
+            TrajectoryView: All kept readings, from the oldest to the newest, without copying.
+        """
+        start, end = self.__window()
+        return TrajectoryView({name: array[start:end] for name, array in self.arrays.items()})
+
+    def between(self, start_ns: int, end_ns: int) -> TrajectoryView:
+        """
+        Get the readings in a time range without copying. The timestamps must be increasing.
+
+        Args:
+            start_ns (int): Start of the range in ns, included.
+            end_ns (int): End of the range in ns, excluded.
+
+        Returns:
+            TrajectoryView: The readings with start_ns <= timestamp < end_ns.
+        """
+        start, end = self.__window()
+        timestamps = self.arrays["timestamp"][start:end]
+        first, last = np.searchsorted(timestamps, [start_ns, end_ns])
+        return TrajectoryView({name: array[start + first:start + last] for name, array in self.arrays.items()})
+
+    def save(self, path: str):
+        """
+        Save the kept readings to a .npz file, with one array per column.
+
+        Args:
+            path (str): Path of the file.
+        """
+        np.savez(path, **self.view().columns())
+
+    @classmethod
+    def load(cls, path: str) -> 'Trajectory':
+        """
+        Load a trajectory saved with save.
+
+        Args:
+            path (str): Path of the .npz file.
+
+        Returns:
+            Trajectory: The loaded trajectory, keeping all readings.
+        """
+        with np.load(path) as data:
+            trajectory = cls(capacity=max(len(data["step"]), 1))
+            for name in COLUMNS:
+                trajectory.arrays[name][:len(data[name])] = data[name]
+            trajectory.count = len(data["step"])
+        return trajectory
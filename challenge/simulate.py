@@ -0,0 +1,46 @@
+"""
+Simulation Script
+
+This script runs the RobotController against a simulated e-puck on the track image instead of a real robot.
+The simulation does not sleep, so it runs much faster than real time and prints the achieved control rate.
+It accepts an optional command-line argument for the number of control steps, defaulting to 5000,
+the flag --profile to print the duration of each stage of the control loop, the flag --prefetch
+to read the sensors on a worker thread and the flag --trajectory to save the odometry to trajectory.npz.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import os
+import sys
+from time import perf_counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from challenge.robot.robot_controller import RobotController
+from challenge.simulation.simulated_epuck import SimulatedEpuck
+
+if __name__ == '__main__':
+    # Check if a number of steps was provided as a command-line argument
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) == 1:
+        steps = int(args[0])
+    else:
+        steps = 5000
+    robot = SimulatedEpuck('192.168.2.208', max_steps=steps)
+    controller = RobotController(robot.ip_addr, robot=robot, clock=robot.clock_ns, profile='--profile' in sys.argv,
+                                 prefetch='--prefetch' in sys.argv,
+                                 trajectory_file='trajectory.npz' if '--trajectory' in sys.argv else None)
+
+    start = perf_counter()
+    controller.run()
+    duration = perf_counter() - start
+
+    simulated_time = robot.clock_ns() / 1e9
+    print(f"{controller.step_counter.get_steps()} steps in {duration:.2f} s "
+          f"({controller.step_counter.get_steps() / duration:.0f} steps/s, "
+          f"{simulated_time / duration:.0f}x real time)")
@@ -0,0 +1,214 @@
+"""
+message_bus.py
+
+An in-process replacement of the socket server of unifr_api_epuck, to run the coordinator, the robot controllers
+and the race manager together without the server, e.g. to test and benchmark them with many simulated robots.
+
+Every client has its own queue. Messages can be delayed by a latency and a random jitter, which may reorder
+them like a real network, and dropped with a loss probability.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import heapq
+import itertools
+import queue
+import random
+import threading
+import time
+from typing import Callable
+
+
+class MessageBus:
+    """
+    The MessageBus routes the messages between its clients, like the socket server does between the
+    SocketClientCommunication clients. All clients share one lock, so they can be used from several threads.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, loss: float = 0.0, seed: int | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the MessageBus.
+
+        Args:
+            latency (float): Delay of every message in s.
+            jitter (float): Upper bound of a random delay in s added to the latency of every message.
+            loss (float): Probability that a message is dropped, between 0 and 1.
+            seed (int | None): Seed for the jitter and loss, to make runs reproducible.
+            clock (Callable[[], float]): Clock in s to delay the messages.
+        """
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.loss: float = loss
+        self.random: random.Random = random.Random(seed)
+        self.clock: Callable[[], float] = clock
+        self.clients: dict[str, BusClient] = {}
+        self.condition: threading.Condition = threading.Condition()
+        self.order: itertools.count = itertools.count()  # keeps messages with the same due time in order
+        self.sent: int = 0
+        self.dropped: int = 0
+        self.undeliverable: int = 0  # messages to clients that do not exist
+
+    def client(self, client_id: str) -> 'BusClient':
+        """
+        Get the client with an id, creating it on first use.
+
+        Args:
+            client_id (str): Id of the client, dots are replaced by underscores like in the real client.
+
+        Returns:
+            BusClient: The client.
+        """
+        client_id = client_id.replace('.', '_')
+        with self.condition:
+            if client_id not in self.clients:
+                self.clients[client_id] = BusClient(self, client_id)
+            return self.clients[client_id]
+
+    def send(self, sender_id: str, dest_client_id: str | None, msg):
+        """
+        Send a message to a client, or to all other clients if dest_client_id is None.
+
+        Args:
+            sender_id (str): Id of the sending client.
+            dest_client_id (str | None): Id of the receiver, None to broadcast.
+            msg: The message to send.
+        """
+        now = self.clock()
+        with self.condition:
+            if dest_client_id is None:
+                receivers = [client for client_id, client in self.clients.items() if client_id != sender_id]
+            elif dest_client_id.replace('.', '_') in self.clients:
+                receivers = [self.clients[dest_client_id.replace('.', '_')]]
+            else:
+                self.undeliverable += 1
+                receivers = []
+            for receiver in receivers:
+                self.sent += 1
+                if self.loss > 0 and self.random.random() < self.loss:
+                    self.dropped += 1
+                    continue
+                delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter > 0 else 0)
+                heapq.heappush(receiver.inbox, (now + delay, next(self.order), msg))
+            self.condition.notify_all()
+
+    def summary(self) -> str:
+        """
+        Returns:
+            str: The number of clients and of sent, dropped and undeliverable messages.
+        """
+        return (f"{len(self.clients)} clients, {self.sent} messages sent, {self.dropped} dropped, "
+                f"{self.undeliverable} undeliverable")
+
+
+class BusClient:
+    """
+    A client of the MessageBus, with the messaging interface of SocketClientCommunication.
+    """
+
+    def __init__(self, bus: MessageBus, client_id: str):
+        """
+        Initialize the BusClient. Use MessageBus.client to create clients.
+
+        Args:
+            bus (MessageBus): The bus the client is connected to.
+            client_id (str): Id of the client.
+        """
+        self.bus: MessageBus = bus
+        self.id: str = client_id
+        self.inbox: list[tuple[float, int, object]] = []  # heap of (due time, order, message)
+        self.received: int = 0
+
+    def get_id(self) -> str:
+        """
+        Get the id of the client.
+
+        Returns:
+            str: The id of the client.
+        """
+        return self.id
+
+    def send_msg(self, msg):
+        """
+        Broadcast a message to all other clients.
+
+        Args:
+            msg: The message to send.
+        """
+        self.bus.send(self.id, None, msg)
+
+    def send_msg_to(self, dest_client_id: str, msg):
+        """
+        Send a message to a specific client.
+
+        Args:
+            dest_client_id (str): The id of the receiver.
+            msg: The message to send.
+        """
+        self.bus.send(self.id, dest_client_id, msg)
+
+    def has_receive_msg(self) -> bool:
+        """
+        Returns:
+            bool: True if a message is due, False otherwise.
+        """
+        with self.bus.condition:
+            return self.__has_due_msg()
+
+    def receive_msg(self):
+        """
+        Get the next due message, raises queue.Empty if there is none.
+        """
+        with self.bus.condition:
+            if not self.__has_due_msg():
+                raise queue.Empty
+            self.received += 1
+            return heapq.heappop(self.inbox)[2]
+
+    def wait_for_msg(self, timeout: float | None = None) -> bool:
+        """
+        Wait until a message is due.
+
+        Args:
+            timeout (float | None): Longest time to wait in seconds, None to wait forever.
+
+        Returns:
+            bool: True if a message is due, False if the timeout expired.
+        """
+        deadline = None if timeout is None else self.bus.clock() + timeout
+        with self.bus.condition:
+            while not self.__has_due_msg():
+                now = self.bus.clock()
+                if deadline is not None and now >= deadline:
+                    return False
+                # Wake up when the next delayed message is due, or when a new message is sent
+                wait = self.inbox[0][0] - now if self.inbox else None
+                if deadline is not None:
+                    wait = deadline - now if wait is None else min(wait, deadline - now)
+                self.bus.condition.wait(wait)
+            return True
+
+    def __has_due_msg(self) -> bool:
+        """
+        Returns:
+            bool: True if the first message of the inbox is due, must be called holding the lock of the bus.
+        """
+        return len(self.inbox) > 0 and self.inbox[0][0] <= self.bus.clock()
+
+    def stay_alive(self):
+        """
+        Nothing to do, the bus needs no keep-alive.
+        """
+        pass
+
+    def clean_msg(self):
+        """
+        Delete all pending messages.
+        """
+        with self.bus.condition:
+            self.inbox.clear()
@@ -0,0 +1,582 @@
+"""
+simulated_epuck.py
+
+Offline stand-in for the WifiEpuck robot. The robot is moved with a kinematic differential drive
+model over a raster of the track image, so the ground sensor readings come from the picture instead
+of the real hardware. Every call to go_on advances the simulation by a fixed time step without
+sleeping, which allows closed-loop runs much faster than real time.
+
+Authors:
+    @Lukas Künzi
+    @Thirith Yang
+
+Date:
+    18 October 2026
+"""
+
+import math
+import os
+import queue
+import random
+import threading
+from collections import deque
+
+import matplotlib.image as mpimg
+import numpy as np
+
+from challenge.simulation.message_bus import BusClient, MessageBus
+
+TRACK_IMAGE: str = os.path.join(os.path.dirname(__file__), '..', 'track.jpg')
+
+METERS_PER_PIXEL: float = 0.00036  # scales the 878x1277 px track image to a lap of about 1.39 m
+START_PIXEL_POSE: tuple[float, float, float] = (28, 1000, -math.pi / 2)  # on the left line, driving clockwise
+
+WHEEL_RADIUS: float = 0.041 / 2  # in m, source https://www.gctronic.com/doc/index.php/e-puck2
+DISTANCE_BETWEEN_WHEELS: float = 0.053  # in m
+ROBOT_RADIUS: float = 0.037  # in m
+
+GROUND_SENSOR_FORWARD: float = 0.03  # distance of the ground sensors in front of the wheel axis, in m
+GROUND_SENSOR_SPACING: float = 0.008  # lateral distance between two neighbouring ground sensors, in m
+
+# Direction of the proximity sensors relative to the heading, positive angles are on the right side
+PROX_SENSOR_ANGLES: list[float] = [0.30, 0.80, math.pi / 2, 2.62, -2.62, -math.pi / 2, -0.80, -0.30]
+PROX_SENSOR_FIELD: float = 0.5  # half opening angle of a proximity sensor in rad
+PROX_MAX_VALUE: int = 3000  # reading of a proximity sensor touching an obstacle
+PROX_DECAY: float = 0.01  # distance in m over which the reading drops by a factor e
+
+TOF_FIELD: float = 0.2  # half opening angle of the time of flight sensor in rad
+TOF_MAX_VALUE: int = 2000  # reading in mm if nothing is in front of the sensor
+
+
+class SimulatedTrack:
+    """
+    The SimulatedTrack class holds the ground raster built from the track image and all simulated
+    robots driving on it, so the robots can see each other with their proximity and time of flight sensors.
+
+    The raster uses image coordinates: x to the right, y downwards, both in meters. An orientation of 0
+    points along the x-axis and positive angles turn clockwise, which matches the frame of Odometry.
+    """
+
+    def __init__(self, image_path: str = TRACK_IMAGE, meters_per_pixel: float = METERS_PER_PIXEL,
+                 black_value: int = 350, white_value: int = 940):
+        """
+        Initialize the SimulatedTrack by loading the track image and converting it to ground sensor values.
+
+        Args:
+            image_path (str): Path to the image of the track.
+            meters_per_pixel (float): Size of one pixel of the image on the real track, in m.
+            black_value (int): Ground sensor reading on a black surface.
+            white_value (int): Ground sensor reading on a white surface, also used outside of the image.
+        """
+        image = mpimg.imread(image_path)
+        if image.ndim == 3:
+            image = image[..., :3].mean(axis=2)
+        if np.issubdtype(image.dtype, np.integer) or image.max() > 1:
+            image = image / 255
+        # Precompute the reading of a ground sensor for every pixel once
+        self.ground: np.ndarray = (black_value + image * (white_value - black_value)).astype(np.int32)
+        self.height, self.width = self.ground.shape
+        self.meters_per_pixel: float = meters_per_pixel
+        self.white_value: int = white_value
+        self.robots: list[SimulatedEpuck] = []
+
+    def ground_at(self, x: float, y: float) -> int:
+        """
+        Get the ground sensor reading at a position on the track.
+
+        Args:
+            x (float): x-coordinate in m.
+            y (float): y-coordinate in m.
+
+        Returns:
+            int: The ground sensor reading, white outside of the image.
+        """
+        column = int(x / self.meters_per_pixel)
+        row = int(y / self.meters_per_pixel)
+        if 0 <= row < self.height and 0 <= column < self.width:
+            return int(self.ground[row, column])
+        return self.white_value
+
+    def pixel_to_meters(self, x: float, y: float) -> tuple[float, float]:
+        """
+        Convert a position on the track image to meters.
+
+        Args:
+            x (float): x-coordinate in pixels.
+            y (float): y-coordinate in pixels.
+
+        Returns:
+            tuple[float, float]: The position in m.
+        """
+        return x * self.meters_per_pixel, y * self.meters_per_pixel
+
+
+class LocalClientCommunication:
+    """
+    In-memory replacement of SocketClientCommunication for a single simulated robot.
+    Sent messages are kept in a bounded outbox, incoming messages are injected with deliver
+    and can be awaited with wait_for_msg.
+    """
+
+    def __init__(self, client_id: str, outbox_length: int = 1000):
+        """
+        Initialize the LocalClientCommunication.
+
+        Args:
+            client_id (str): Id of the client, dots are replaced by underscores like in the real client.
+            outbox_length (int): Number of sent messages that are kept for inspection.
+        """
+        self.id: str = client_id.replace('.', '_')
+        self.box_message: deque = deque()
+        self.arrived: threading.Condition = threading.Condition()
+        self.outbox: deque[tuple[str | None, object]] = deque(maxlen=outbox_length)
+
+    def get_id(self) -> str:
+        """
+        Get the id of the client.
+
+        Returns:
+            str: The id of the client.
+        """
+        return self.id
+
+    def send_msg(self, msg):
+        """
+        Broadcast a message, which is only stored in the outbox.
+
+        Args:
+            msg: The message to send.
+        """
+        self.outbox.append((None, msg))
+
+    def send_msg_to(self, dest_client_id: str, msg):
+        """
+        Send a message to a specific client, which is only stored in the outbox.
+
+        Args:
+            dest_client_id (str): The id of the receiver.
+            msg: The message to send.
+        """
+        self.outbox.append((dest_client_id, msg))
+
+    def has_receive_msg(self) -> bool:
+        """
+        Returns:
+            bool: True if there are pending messages, False otherwise.
+        """
+        return len(self.box_message) > 0
+
+    def receive_msg(self):
+        """
+        Get the next pending message, raises queue.Empty if there is none.
+        """
+        try:
+            return self.box_message.popleft()
+        except IndexError:
+            raise queue.Empty from None
+
+    def deliver(self, msg):
+        """
+        Put a message into the queue of this client, as if it was sent by someone else.
+
+        Args:
+            msg: The message to deliver.
+        """
+        with self.arrived:
+            self.box_message.append(msg)
+            self.arrived.notify_all()
+
+    def wait_for_msg(self, timeout: float | None = None) -> bool:
+        """
+        Wait until a message is pending.
+
+        Args:
+            timeout (float | None): Longest time to wait in seconds, None to wait forever.
+
+        Returns:
+            bool: True if a message is pending, False if the timeout expired.
+        """
+        with self.arrived:
+            return self.arrived.wait_for(lambda: len(self.box_message) > 0, timeout)
+
+    def stay_alive(self):
+        """
+        Nothing to do, there is no host to keep informed.
+        """
+        pass
+
+    def clean_msg(self):
+        """
+        Delete all pending messages.
+        """
+        self.box_message.clear()
+
+
+class SimulatedEpuck:
+    """
+    The SimulatedEpuck class implements the part of the WifiEpuck interface used by the controllers
+    (motors, ground, proximity and time of flight sensors, LEDs, camera and messaging) on top of a SimulatedTrack.
+
+    Each call to go_on advances the simulated time by time_step, so the robot moves independent of the wall clock.
+    Use clock_ns as the clock of Odometry to integrate in simulated time.
+    """
+
+    def __init__(self, ip_addr: str = '127.0.0.1', track: SimulatedTrack | None = None,
+                 pose: tuple[float, float, float] | None = None, time_step: float = 0.02,
+                 max_steps: int | None = None, ground_noise: float = 0, seed: int | None = None,
+                 bus: MessageBus | None = None):
+        """
+        Initialize the SimulatedEpuck and place it on the track.
+
+        Args:
+            ip_addr (str): Pretended IP address of the robot, the id is derived from it like for the real robot.
+            track (SimulatedTrack | None): The track to drive on. A new one is created from the track image if None.
+            pose (tuple[float, float, float] | None): Start pose (x, y, theta) in m and rad.
+                Defaults to the left line of the track image, driving clockwise.
+            time_step (float): Simulated time that passes per call of go_on, in s.
+            max_steps (int | None): go_on returns False after this many steps. Runs forever if None.
+            ground_noise (float): Standard deviation of the noise added to the ground sensor readings.
+            seed (int | None): Seed for the noise, to make runs reproducible.
+            bus (MessageBus | None): Bus shared with the coordinator and the other robots.
+                The robot only talks to itself through a LocalClientCommunication if None.
+        """
+        self.MAX_SPEED = 7.536
+        self.LED_COUNT_ROBOT = 8
+        self.PROX_SENSORS_COUNT = 8
+        self.GROUND_SENSORS_COUNT = 3
+
+        self.ip_addr: str = ip_addr
+        self.id: str = ip_addr.replace('.', '_')
+        self.ClientCommunication: LocalClientCommunication | BusClient | None = None
+        self.bus: MessageBus | None = bus
+
+        self.track: SimulatedTrack = track if track is not None else SimulatedTrack()
+        self.track.robots.append(self)
+        if pose is None:
+            x, y = self.track.pixel_to_meters(START_PIXEL_POSE[0], START_PIXEL_POSE[1])
+            pose = (x, y, START_PIXEL_POSE[2])
+        self.x, self.y, self.theta = pose
+
+        self.time_step: float = time_step
+        self.time_step_ns: int = int(time_step * 1e9)
+        self.time_ns: int = 0
+        self.steps: int = 0
+        self.max_steps: int | None = max_steps
+
+        self.speed: list[float] = [0, 0]
+        self.leds: list[tuple[int, int, int] | None] = [None] * self.LED_COUNT_ROBOT
+        self.body_led: bool = False
+        self.front_led: bool = False
+        self.camera_enabled: bool = False
+
+        self.ground_noise: float = ground_noise
+        self.random: random.Random = random.Random(seed)
+
+    def get_id(self) -> str:
+        """
+        Returns:
+            str: The id of the robot.
+        """
+        return self.id
+
+    def get_ip(self) -> str:
+        """
+        Returns:
+            str: The pretended IP address of the robot.
+        """
+        return self.ip_addr
+
+    def clock_ns(self) -> int:
+        """
+        Get the simulated time, to be used instead of perf_counter_ns.
+
+        Returns:
+            int: Simulated time since the start in ns.
+        """
+        return self.time_ns
+
+    #####################################################################
+    # Motion
+
+    def go_on(self) -> bool:
+        """
+        Advance the simulation by one time step, moving the robot with the last set wheel speeds.
+
+        Returns:
+            bool: False once max_steps is reached, True otherwise.
+        """
+        self.integrate(self.time_step)
+        self.time_ns += self.time_step_ns
+        self.steps += 1
+        return self.max_steps is None or self.steps <= self.max_steps
+
+    def integrate(self, time_delta: float):
+        """
+        Move the robot according to the differential drive kinematics.
+
+        Args:
+            time_delta (float): Time to integrate over, in s.
+        """
+        distance_left = self.speed[0] * WHEEL_RADIUS * time_delta
+        distance_right = self.speed[1] * WHEEL_RADIUS * time_delta
+        distance = (distance_left + distance_right) / 2
+        delta_theta = (distance_left - distance_right) / DISTANCE_BETWEEN_WHEELS
+        self.x += distance * math.cos(self.theta + delta_theta / 2)
+        self.y += distance * math.sin(self.theta + delta_theta / 2)
+        self.theta += delta_theta
+
+    def sleep(self, duration: float):
+        """
+        Let the simulated time pass while the robot keeps moving, without actually sleeping.
+
+        Args:
+            duration (float): Duration in s.
+        """
+        for _ in range(round(duration / self.time_step)):
+            self.integrate(self.time_step)
+            self.time_ns += self.time_step_ns
+
+    def bounded_speed(self, speed: float) -> float:
+        """
+        Limit the speed of a wheel to the maximum speed of the e-puck.
+
+        Args:
+            speed (float): Requested speed in rad/s.
+
+        Returns:
+            float: Speed between -MAX_SPEED and MAX_SPEED.
+        """
+        return max(-self.MAX_SPEED, min(speed, self.MAX_SPEED))
+
+    def set_speed(self, speed_left: float, speed_right: float | None = None):
+        """
+        Set the speed of the wheels, used from the next call of go_on on.
+
+        Args:
+            speed_left (float): Speed of the left wheel in rad/s.
+            speed_right (float | None): Speed of the right wheel in rad/s, same as the left one if None.
+        """
+        if speed_right is None:
+            speed_right = speed_left
+        self.speed = [self.bounded_speed(speed_left), self.bounded_speed(speed_right)]
+
+    def get_speed(self) -> list[float]:
+        """
+        Returns:
+            list[float]: [left_wheel, right_wheel] speed in rad/s.
+        """
+        return list(self.speed)
+
+    #####################################################################
+    # Sensors
+
+    def init_sensors(self):
+        pass
+
+    def disable_sensors(self):
+        pass
+
+    def init_ground(self):
+        pass
+
+    def init_tof(self):
+        pass
+
+    def disable_tof(self):
+        pass
+
+    def get_ground(self) -> list[int]:
+        """
+        Read the ground sensors from the track raster.
+
+        Returns:
+            list[int]: ground values [LEFT, MIDDLE, RIGHT].
+        """
+        cos_theta = math.cos(self.theta)
+        sin_theta = math.sin(self.theta)
+        front_x = self.x + GROUND_SENSOR_FORWARD * cos_theta
+        front_y = self.y + GROUND_SENSOR_FORWARD * sin_theta
+        values = []
+        for i in range(self.GROUND_SENSORS_COUNT):
+            # Sensor 0 is on the left, which is (sin, -cos) in the clockwise frame
+            lateral = (1 - i) * GROUND_SENSOR_SPACING
+            value = self.track.ground_at(front_x + lateral * sin_theta, front_y - lateral * cos_theta)
+            if self.ground_noise:
+                value = int(value + self.random.gauss(0, self.ground_noise))
+            values.append(value)
+        return values
+
+    def get_prox(self) -> list[int]:
+        """
+        Read the proximity sensors, which only see the other robots on the track.
+
+        Returns:
+            list[int]: proximity values, between 0 (nothing) and PROX_MAX_VALUE (touching).
+        """
+        values = [0] * self.PROX_SENSORS_COUNT
+        for gap, bearing in self.other_robots():
+            reading = PROX_MAX_VALUE * math.exp(-gap / PROX_DECAY)
+            for i, angle in enumerate(PROX_SENSOR_ANGLES):
+                if abs(_wrap_angle(bearing - angle)) <= PROX_SENSOR_FIELD:
+                    values[i] = max(values[i], int(reading))
+        return values
+
+    def calibrate_prox(self):
+        """
+        Nothing to calibrate, the simulated proximity sensors have no offset.
+        """
+        pass
+
+    def get_calibrate_prox(self) -> list[int]:
+        """
+        Returns:
+            list[int]: calibrated proximity values, the same as get_prox.
+        """
+        return self.get_prox()
+
+    def get_tof(self) -> int:
+        """
+        Read the time of flight sensor, which only sees the other robots on the track.
+
+        Returns:
+            int: distance to the closest robot in front in mm, TOF_MAX_VALUE if there is none.
+        """
+        distance = TOF_MAX_VALUE
+        for gap, bearing in self.other_robots():
+            if abs(bearing) <= TOF_FIELD:
+                distance = min(distance, int(gap * 1000))
+        return distance
+
+    def other_robots(self) -> list[tuple[float, float]]:
+        """
+        Get the gap and bearing to every other robot on the track.
+
+        Returns:
+            list[tuple[float, float]]: (gap between the bodies in m, bearing relative to the heading in rad).
+        """
+        result = []
+        for robot in self.track.robots:
+            if robot is self:
+                continue
+            dx = robot.x - self.x
+            dy = robot.y - self.y
+            gap = max(math.hypot(dx, dy) - 2 * ROBOT_RADIUS, 0)
+            result.append((gap, _wrap_angle(math.atan2(dy, dx) - self.theta)))
+        return result
+
+    #####################################################################
+    # LEDs
+
+    def enable_led(self, led_position: int, red: int | None = None, green: int | None = None,
+                   blue: int | None = None):
+        if not 0 <= led_position < self.LED_COUNT_ROBOT:
+            return
+        # Only the odd LEDs are RGB, the others are stored with the default colour of the real robot
+        if led_position % 2 == 1 and red is not None and green is not None and blue is not None:
+            self.leds[led_position] = (red, green, blue)
+        else:
+            self.leds[led_position] = (15, 0, 0)
+
+    def disable_led(self, led_position: int):
+        if 0 <= led_position < self.LED_COUNT_ROBOT:
+            self.leds[led_position] = None
+
+    def enable_all_led(self):
+        for i in range(self.LED_COUNT_ROBOT):
+            self.enable_led(i)
+
+    def disable_all_led(self):
+        for i in range(self.LED_COUNT_ROBOT):
+            self.disable_led(i)
+
+    def enable_body_led(self):
+        self.body_led = True
+
+    def disable_body_led(self):
+        self.body_led = False
+
+    def enable_front_led(self):
+        self.front_led = True
+
+    def disable_front_led(self):
+        self.front_led = False
+
+    #####################################################################
+    # Camera and detection, the simulation has nothing to see
+
+    def init_camera(self, save_image_folder=None, size=(None, None)):
+        self.camera_enabled = True
+
+    def disable_camera(self):
+        self.camera_enabled = False
+
+    def get_camera(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: An empty 3x120x160 picture.
+        """
+        return np.zeros((3, 120, 160), dtype=np.uint8)
+
+    def initiate_model(self, weights=None):
+        pass
+
+    def get_detection(self, img=None, conf_thresh: float = 0.9) -> list:
+        return []
+
+    def save_detection(self, filename=None):
+        pass
+
+    def get_colordetection(self, img=None, min_area: int = 100, saveimg: bool = False, savemasks: bool = False,
+                           filename=None) -> list:
+        return []
+
+    #####################################################################
+    # Communication
+
+    def init_client_communication(self, host_ip: str = 'localhost'):
+        """
+        Create an in-memory client instead of connecting to the socket server,
+        connected to the other clients if the robot has a bus.
+
+        Args:
+            host_ip (str): Ignored, only there to match the interface of the real robot.
+        """
+        if self.bus is not None:
+            self.ClientCommunication = self.bus.client(self.id)
+        else:
+            self.ClientCommunication = LocalClientCommunication(self.id)
+
+    def send_msg(self, msg):
+        self.ClientCommunication.send_msg(msg)
+
+    def has_receive_msg(self) -> bool:
+        return self.ClientCommunication.has_receive_msg()
+
+    def receive_msg(self):
+        return self.ClientCommunication.receive_msg()
+
+    def clean_msg(self):
+        self.ClientCommunication.clean_msg()
+
+    def clean_up(self):
+        """
+        Stop the robot and switch off all LEDs. Unlike the real robot this does not exit the process.
+        """
+        self.set_speed(0, 0)
+        self.disable_all_led()
+        self.disable_body_led()
+        self.disable_front_led()
+        self.disable_camera()
+
+
+def _wrap_angle(angle: float) -> float:
+    """
+    Wrap an angle to the range [-pi, pi).
+
+    Args:
+        angle (float): Angle in rad.
+
+    Returns:
+        float: The wrapped angle in rad.
+    """
+    return (angle + math.pi) % (2 * math.pi) - math.pi
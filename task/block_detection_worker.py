@@ -0,0 +1,155 @@
+"""
+block_detection_worker.py
+
+Runs the object detection for the lane change blocks on a background thread, so the inference
+does not stall the line following of the control loop.
+
+Classes:
+    BlockResult: The block detected in one camera frame.
+    BlockDetectionWorker: Detects blocks in submitted frames on a worker thread.
+
+Authors:
+    Lukas Künzi
+    Thirith Yang
+
+Date:
+    18th October 2026
+"""
+
+import threading
+from time import perf_counter_ns
+
+import numpy as np
+from unifr_api_epuck.epuck.epuck_wifi import WifiEpuck
+
+import utils
+
+
+class BlockResult:
+    """
+    The block detected in one camera frame.
+
+    Attributes:
+        block (str | None): Label of the detected block ("Red Block" or "Green Block"), or None if there is none.
+        frame_timestamp (int): Time the frame was taken, in ns of perf_counter_ns.
+        step (int): Step of the control loop in which the frame was taken.
+    """
+
+    def __init__(self, block: str | None, frame_timestamp: int, step: int):
+        self.block: str | None = block
+        self.frame_timestamp: int = frame_timestamp
+        self.step: int = step
+
+
+class BlockDetectionWorker:
+    """
+    The BlockDetectionWorker detects blocks in the frames submitted by the control loop on a worker thread.
+
+    Only the newest submitted frame waits for the detection. If a new frame arrives while the worker is
+    still busy, the waiting frame is dropped. The control loop takes the newest result without blocking,
+    results of frames older than max_result_age_ns are discarded.
+
+    Attributes:
+        frames_dropped (int): Number of frames replaced by a newer one before they were processed.
+        results_expired (int): Number of results discarded because their frame was too old.
+    """
+
+    def __init__(self, robot: WifiEpuck, upper_bound: float, lower_bound: float,
+                 max_result_age_ns: int = 1_000_000_000, save_detections: bool = False, detector=None):
+        """
+        Initialize the BlockDetectionWorker.
+
+        Args:
+            robot (WifiEpuck): The robot, used to save the annotated images.
+            upper_bound (float): The upper bound for the height of a block.
+            lower_bound (float): The lower bound for the height of a block.
+            max_result_age_ns (int): Results of frames older than this are discarded, in ns.
+            save_detections (bool): If True, save the annotated image of every detection.
+                This runs the model a second time on a new frame and needs the model loaded in this process.
+            detector: Provides get_detection, e.g. a RemoteDetector. Defaults to the robot with its loaded model.
+        """
+        self.robot: WifiEpuck = robot
+        self.detector = detector if detector is not None else robot
+        self.upper_bound: float = upper_bound
+        self.lower_bound: float = lower_bound
+        self.max_result_age_ns: int = max_result_age_ns
+        self.save_detections: bool = save_detections
+
+        self.condition: threading.Condition = threading.Condition()
+        self.pending_frame: tuple[np.ndarray, int, int] | None = None  # (image, timestamp, step)
+        self.result: BlockResult | None = None
+        self.running: bool = False
+        self.thread: threading.Thread | None = None
+
+        self.frames_dropped: int = 0
+        self.results_expired: int = 0
+
+    def start(self):
+        """
+        Start the worker thread.
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self.__detection_loop, name="block-detection", daemon=True)
+        self.thread.start()
+
+    def submit(self, img: np.ndarray, step: int):
+        """
+        Hand a camera frame to the worker without waiting for the detection.
+
+        Args:
+            img (np.ndarray): The picture returned by get_camera.
+            step (int): Step of the control loop in which the frame was taken.
+        """
+        with self.condition:
+            if self.pending_frame is not None:
+                self.frames_dropped += 1
+            self.pending_frame = (img, perf_counter_ns(), step)
+            self.condition.notify()
+
+    def take_result(self) -> BlockResult | None:
+        """
+        Take the newest detection result, so each result is only acted on once.
+
+        Returns:
+            BlockResult | None: The newest result, or None if there is no new or recent enough result.
+        """
+        with self.condition:
+            result = self.result
+            self.result = None
+        if result is None:
+            return None
+        if perf_counter_ns() - result.frame_timestamp > self.max_result_age_ns:
+            self.results_expired += 1
+            return None
+        return result
+
+    def __detection_loop(self):
+        """
+        Detect blocks in the pending frames until stop is called.
+        """
+        while True:
+            with self.condition:
+                while self.running and self.pending_frame is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                img, timestamp, step = self.pending_frame
+                self.pending_frame = None
+
+            detections = self.detector.get_detection(img)
+            if self.save_detections:
+                self.robot.save_detection()
+            block = utils.block_from_detections(detections, self.upper_bound, self.lower_bound)
+
+            with self.condition:
+                self.result = BlockResult(block, timestamp, step)
+
+    def stop(self):
+        """
+        Stop the worker thread after the current detection.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
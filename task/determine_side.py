@@ -7,7 +7,7 @@ adapt its behavior depending on its lane or side of the track.
 
 Classes:
     TrackSide (Enum): Enum representing possible sides of the track.
-    DetermineSide: Class for determining the robot's side using sensor data and position.
+    DetermineSide: Class for determining the robot's side using the ground code and position.
 
 Authors:
     Lukas Künzi
@@ -19,6 +19,7 @@ Date:
 
 from enum import Enum
 
+from challenge.robot.ground_classifier import COLOR_NAMES, COLORS, GREY, MIRRORED, WHITE
 from challenge.robot.track_follower import RobotPosition
 
 class TrackSide(Enum):
@@ -32,61 +33,37 @@ class TrackSide(Enum):
 class DetermineSide:
     """
     The DetermineSide class is responsible for determining which side of the track
-    the robot is on based on sensor readings and the robot's position.
+    the robot is on based on the ground code of the GroundClassifier and the robot's position.
+    The side for each position and ground code is looked up in a precomputed table.
 
     Attributes:
-        grey_max_value (int): Maximum value for a sensor to be considered grey.
-        grey_min_value (int): Minimum value for a sensor to be considered grey.
+        side_table (dict[RobotPosition, list[TrackSide]]): The side for each position, indexed by the ground code.
         readings (list[TrackSide]): History of detected sides.
         steps_to_determine_side (int): Number of readings to consider for side determination.
         certainty_of_last_guess (float | None): Certainty of the last side guess.
     """
 
-    def __init__(self, grey_max_value: int, grey_min_value: int, steps_to_determine_side: int):
+    def __init__(self, steps_to_determine_side: int):
         """
         Initialize the DetermineSide class with parameters for detecting the track side.
 
         Args:
-            grey_max_value (int): The maximum value for an area to be considered grey.
-            grey_min_value (int): The minimum value for an area to be considered grey.
             steps_to_determine_side (int): The number of readings to consider when determining the side.
         """
-        self.grey_max_value = grey_max_value
-        self.grey_min_value = grey_min_value
+        self.side_table: dict[RobotPosition, list[TrackSide]] = {
+            position: [self.__determine_side(colors, position) for colors in COLORS] for position in RobotPosition}
         self.readings: list[TrackSide] = []  # List of all readings indicating the robot's side.
         self.steps_to_determine_side = steps_to_determine_side
         self.certainty_of_last_guess = None
 
-    def in_grey(self, value: int) -> bool:
+    @staticmethod
+    def __determine_side(colors: tuple[int, int, int], position: RobotPosition) -> TrackSide:
         """
-        Check if a given value falls within the grey range.
+        Determine the side of the track based on the colors of the ground sensors and the robot's position.
+        Used to build the side table.
 
         Args:
-            value (int): The value to check.
-
-        Returns:
-            bool: True if the value is within the grey range, False otherwise.
-        """
-        return self.grey_min_value <= value <= self.grey_max_value
-
-    def in_white(self, value: int) -> bool:
-        """
-        Check if a given value is greater than the grey maximum, indicating white.
-
-        Args:
-            value (int): The value to check.
-
-        Returns:
-            bool: True if the value is greater than the grey maximum, False otherwise.
-        """
-        return value > self.grey_max_value
-
-    def __determine_side(self, gs: list[int], position: RobotPosition) -> TrackSide:
-        """
-        Determine the side of the track based on sensor readings and the robot's position.
-
-        Args:
-            gs (list[int]): A list of sensor readings.
+            colors (tuple[int, int, int]): The colors of the ground sensors, from left to right.
             position (RobotPosition): The current position of the robot (LEFT, RIGHT, or MIDDLE).
 
         Returns:
@@ -95,55 +72,46 @@ class DetermineSide:
         # If robot is on the left, check leftmost sensor for white or grey
         if position == RobotPosition.IS_LEFT:
             # If the robot is on the left and the first sensor detects white, it's on the LEFT side.
-            if self.in_white(gs[0]):
+            if colors[0] == WHITE:
                 return TrackSide.LEFT
             # If the first sensor detects grey, it's on the RIGHT side.
-            elif self.in_grey(gs[0]):
+            elif colors[0] == GREY:
                 return TrackSide.RIGHT
         elif position == RobotPosition.IS_RIGHT or position == RobotPosition.IS_MIDDLE:
             # If the robot is on the right or middle and the last sensor detects white, it's on the RIGHT side.
-            if self.in_white(gs[2]):
+            if colors[2] == WHITE:
                 return TrackSide.RIGHT
             # If the last sensor detects grey, it's on the LEFT side.
-            elif self.in_grey(gs[2]):
+            elif colors[2] == GREY:
                 return TrackSide.LEFT
         # If no conditions are met, return UNKNOWN.
         return TrackSide.UNKNOWN
 
-    def read_colors(self, gs: list[int]) -> list[str]:
+    def read_colors(self, ground_code: int) -> list[str]:
         """
-        Convert sensor readings into color labels (white, grey, or black).
+        Convert a ground code into color labels (white, grey, or black).
 
         Args:
-            gs (list[int]): A list of sensor readings.
+            ground_code (int): The ground code of the ground sensor values.
 
         Returns:
             list[str]: A list of color labels corresponding to the sensor readings.
         """
-        l = []
-        for g in gs:
-            # Check if the reading corresponds to white, grey, or black and append the label.
-            if self.in_white(g):
-                l.append("white")
-            elif self.in_grey(g):
-                l.append("grey")
-            else:
-                l.append("black")
-        return l
-
-    def determine_side(self, gs: list[int], position: RobotPosition, invert_side: bool = False):
+        return [COLOR_NAMES[color] for color in COLORS[ground_code]]
+
+    def determine_side(self, ground_code: int, position: RobotPosition, invert_side: bool = False):
         """
         Determine the side of the track and store the result in the readings list.
 
         Args:
-            gs (list[int]): A list of sensor readings.
+            ground_code (int): The ground code of the ground sensor values.
             position (RobotPosition): The current position of the robot (LEFT, RIGHT, or MIDDLE).
             invert_side (bool, optional): If True, invert the side determination logic.
         """
         # Optionally invert the sensor readings for mirrored logic
         if invert_side:
-            gs = gs[::-1]  # reverse the list
-        v = self.__determine_side(gs, position)
+            ground_code = MIRRORED[ground_code]  # swap the left and right sensor
+        v = self.side_table[position][ground_code]
         # Invert the result if invert_side is True
         if invert_side:
             if v == TrackSide.LEFT:
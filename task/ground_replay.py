@@ -0,0 +1,336 @@
+"""
+ground_replay.py
+
+Replays recorded ground sensor values through the TrackFollower, BeaconDetector and DetermineSide
+without a robot, so threshold changes can be tested on the recordings instead of re-running the robots.
+The recordings are the Gsensors*.csv files written by ground_record.py and S02_ground_record.py.
+
+The batch replay classifies the whole recording with NumPy at once and looks up the decisions of the
+TrackFollower and DetermineSide in their tables for all steps together. The BeaconDetector matches
+the run-length encoded grey areas of the whole recording. The sequential replay calls
+the modules step by step like the control loop does, and serves as the reference for the batch replay.
+
+Usage:
+------
+    python3 ground_replay.py Gsensors.csv [--grey-min 600] [--grey-max 800] [--smoothing 3]
+                             [--binary] [--invert] [--sequential] [--step-ms 50]
+
+With --step-ms, the speeds decided by the TrackFollower are integrated by the odometry,
+assuming the steps were recorded every step-ms milliseconds.
+
+Authors:
+--------
+- Lukas Künzi
+- Thirith Yang
+
+Date:
+------
+18th October 2026
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from challenge.coordinator import coordinator
+from challenge.robot.beacon_detector import BeaconDetector
+from challenge.robot.grey_area import GreyArea
+from challenge.robot.ground_classifier import BLACK, GREY, HAS_GREY, MIRRORED, NUMBER_OF_CODES, GroundClassifier
+from challenge.robot.odometry import OdometryBatch, integrate_wheel_speeds
+from challenge.robot.track_follower import RobotPosition, TrackFollower
+from determine_side import DetermineSide, TrackSide
+
+# Thresholds of the MarioKart (main.py), after the side was determined
+GREY_MIN_VALUE: int = 600
+GREY_MAX_VALUE: int = 800
+STEPS_TO_DETERMINE_SIDE: int = 100
+
+
+def load_ground_log(path: str) -> np.ndarray:
+    """
+    Load a recording of the ground sensors in the format "step,gs0,gs1,gs2," of ground_record.py.
+
+    Args:
+        path (str): Path to the CSV file.
+
+    Returns:
+        np.ndarray: Array of shape (n, 3) with the ground sensor values per step.
+    """
+    return np.loadtxt(path, delimiter=',', skiprows=1, usecols=(1, 2, 3), ndmin=2)
+
+
+def smooth(gs: np.ndarray, window: int) -> np.ndarray:
+    """
+    Average each step with the previous steps, like the SensorMemory of the MarioKart does.
+    The first steps are averaged over the steps available so far.
+
+    Args:
+        gs (np.ndarray): Array of shape (n, 3) with the ground sensor values.
+        window (int): Number of steps to average.
+
+    Returns:
+        np.ndarray: Array of shape (n, 3) with the averaged values.
+    """
+    if window <= 1:
+        return gs
+    sums = np.cumsum(gs, axis=0)
+    sums[window:] -= sums[:-window].copy()
+    counts = np.minimum(np.arange(1, len(gs) + 1), window)
+    return sums / counts[:, None]
+
+
+class NullMotors:
+    """
+    Stands in for the robot of the TrackFollower and ignores the speeds.
+    """
+
+    def set_speed(self, speed_left: float, speed_right: float):
+        pass
+
+
+class ReplayResult:
+    """
+    The decisions of the modules for every step of a replayed recording.
+
+    Attributes:
+        ground_codes (np.ndarray): The ground code per step.
+        positions (np.ndarray): The RobotPosition value per step, as decided by the TrackFollower.
+        speeds (np.ndarray): The (left, right) speed per step, NaN where the TrackFollower found no valid action.
+        beacon_events (list[tuple[int, str]]): The steps where the BeaconDetector found a beacon, with its name.
+        sides (np.ndarray): The TrackSide value read by DetermineSide per step.
+        probable_sides (np.ndarray): The TrackSide value of the probable side after each step.
+        certainties (np.ndarray): The certainty of the probable side after each step, between 0 and 1.
+        duration (float): Time taken by the replay in seconds.
+    """
+
+    def __init__(self, ground_codes: np.ndarray, positions: np.ndarray, speeds: np.ndarray,
+                 beacon_events: list[tuple[int, str]], sides: np.ndarray, probable_sides: np.ndarray,
+                 certainties: np.ndarray, duration: float):
+        self.ground_codes: np.ndarray = ground_codes
+        self.positions: np.ndarray = positions
+        self.speeds: np.ndarray = speeds
+        self.beacon_events: list[tuple[int, str]] = beacon_events
+        self.sides: np.ndarray = sides
+        self.probable_sides: np.ndarray = probable_sides
+        self.certainties: np.ndarray = certainties
+        self.duration: float = duration
+
+    def print_summary(self):
+        """
+        Print how often each position was decided, the beacon events and the final probable side.
+        """
+        steps = len(self.ground_codes)
+        print(f"{steps} steps replayed in {self.duration * 1000:.1f} ms ({steps / self.duration:.0f} steps/s)")
+        for position in RobotPosition:
+            count = np.count_nonzero(self.positions == position.value)
+            print(f"  {position.name:<10} {count:>8} steps ({count / steps:.1%})")
+        events = ', '.join(f'{name} at step {step}' for step, name in self.beacon_events[:10])
+        more = f", ... ({len(self.beacon_events)} in total)" if len(self.beacon_events) > 10 else ""
+        print(f"  beacons: {events or 'none'}{more}")
+        print(f"  probable side: {TrackSide(self.probable_sides[-1]).name} (certainty {self.certainties[-1]:.2f})")
+
+    def odometry(self, step_ms: float) -> OdometryBatch:
+        """
+        Integrate the speeds of the replay with the odometry, in one batch for all steps.
+
+        Like in the control loop, the speed decided in a step is driven until the next step,
+        and the TrackFollower keeps its previous speed where it found no valid action.
+
+        Args:
+            step_ms (float): Duration of a step of the recording in ms.
+
+        Returns:
+            OdometryBatch: The pose after each step.
+        """
+        valid = ~np.isnan(self.speeds[:, 0])
+        last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), 0))
+        speeds = np.nan_to_num(self.speeds[last_valid])
+        driven = np.vstack(([[0, 0]], speeds[:-1]))
+        timestamps = np.round(np.arange(1, len(driven) + 1) * step_ms * 1e6).astype(np.int64)
+        return integrate_wheel_speeds(timestamps, driven[:, 0], driven[:, 1], 0)
+
+
+class GroundReplay:
+    """
+    The GroundReplay pushes recorded ground sensor values through the TrackFollower,
+    BeaconDetector and DetermineSide, configured like the MarioKart by default.
+    """
+
+    def __init__(self, grey_min_value: float = GREY_MIN_VALUE, grey_max_value: float = GREY_MAX_VALUE,
+                 line_colors: tuple[int, ...] = (BLACK, GREY), use_two_sensors_approach: bool = True,
+                 invert_side: bool = False, norm_speed: float = 1, grey_min_steps: float = 20,
+                 steps_to_determine_side: int = STEPS_TO_DETERMINE_SIDE, smoothing: int = 1):
+        """
+        Initialize the GroundReplay.
+
+        Args:
+            grey_min_value (float): Minimum value of the ground to be considered grey.
+            grey_max_value (float): Maximum value of the ground to be considered grey.
+            line_colors (tuple[int, ...]): The colors considered as being on the line by the TrackFollower.
+            use_two_sensors_approach (bool): If True, use the two-sensor approach, otherwise the binary approach.
+            invert_side (bool): If True, follow the left side of the line.
+            norm_speed (float): The normal speed of the robot, scales the speeds and the grey area lengths.
+            grey_min_steps (float): Minimum number of steps in a grey area at a speed of 1 rad/s, see GreyArea.
+            steps_to_determine_side (int): The number of readings DetermineSide considers.
+            smoothing (int): Number of steps to average before classifying, 3 for the MarioKart, 1 for none.
+        """
+        self.classifier: GroundClassifier = GroundClassifier(grey_min_value, grey_max_value)
+        self.line_colors: tuple[int, ...] = line_colors
+        self.use_two_sensors_approach: bool = use_two_sensors_approach
+        self.invert_side: bool = invert_side
+        self.norm_speed: float = norm_speed
+        self.grey_min_steps: float = grey_min_steps
+        self.steps_to_determine_side: int = steps_to_determine_side
+        self.smoothing: int = smoothing
+
+    def create_modules(self) -> tuple[TrackFollower, BeaconDetector, DetermineSide]:
+        """
+        Create new instances of the replayed modules.
+
+        Returns:
+            tuple[TrackFollower, BeaconDetector, DetermineSide]: The modules in their initial state.
+        """
+        track_follower = TrackFollower(NullMotors(), self.norm_speed, self.line_colors)
+        beacon_detector = BeaconDetector(GreyArea(self.norm_speed, self.grey_min_steps), coordinator.BEACONS)
+        determine_side = DetermineSide(self.steps_to_determine_side)
+        return track_follower, beacon_detector, determine_side
+
+    def replay(self, gs: np.ndarray) -> ReplayResult:
+        """
+        Replay a recording with NumPy, classifying all steps at once and looking up the decisions
+        of the TrackFollower and DetermineSide for all steps together. The beacons are matched run by run.
+
+        Args:
+            gs (np.ndarray): Array of shape (n, 3) with the ground sensor values per step.
+
+        Returns:
+            ReplayResult: The decisions for every step.
+        """
+        start = perf_counter()
+        track_follower, beacon_detector, determine_side = self.create_modules()
+        codes = self.classifier.encode_array(smooth(np.asarray(gs, dtype=float), self.smoothing))
+        follow_codes = np.array(MIRRORED)[codes] if self.invert_side else codes
+
+        # Decisions of the TrackFollower, from its tables
+        table = track_follower.two_sensors_table if self.use_two_sensors_approach else track_follower.binary_table
+        position_table = np.array([position.value for position, _, _ in table])
+        speed_table = np.array([speeds if speeds is not None else (np.nan, np.nan) for _, speeds, _ in table])
+        positions = position_table[follow_codes]
+        speeds = speed_table[follow_codes] * self.norm_speed
+        if self.invert_side:
+            speeds = speeds[:, ::-1]
+
+        # Sides of DetermineSide, from its table, with the position decided in the same step
+        side_table = np.full((len(RobotPosition), NUMBER_OF_CODES), TrackSide.UNKNOWN.value)
+        for position, row in determine_side.side_table.items():
+            side_table[position.value] = [side.value for side in row]
+        sides = side_table[positions, follow_codes]
+        if self.invert_side:
+            swap = np.array([TrackSide.UNKNOWN.value] * len(TrackSide))
+            swap[TrackSide.LEFT.value] = TrackSide.RIGHT.value
+            swap[TrackSide.RIGHT.value] = TrackSide.LEFT.value
+            sides = swap[sides]
+        probable_sides, certainties = self.__probable_sides(sides)
+
+        # The BeaconDetector matches the grey runs of the whole recording
+        beacon_events = [(step, beacon.name) for step, beacon in beacon_detector.detect_offline(np.array(HAS_GREY)[codes])]
+
+        return ReplayResult(codes, positions, speeds, beacon_events, sides, probable_sides, certainties,
+                            perf_counter() - start)
+
+    def replay_sequential(self, gs: np.ndarray, quiet: bool = True) -> ReplayResult:
+        """
+        Replay a recording step by step, calling the modules like the control loop does.
+
+        Args:
+            gs (np.ndarray): Array of shape (n, 3) with the ground sensor values per step.
+            quiet (bool): If True, suppress the output of the modules.
+
+        Returns:
+            ReplayResult: The decisions for every step.
+        """
+        start = perf_counter()
+        track_follower, beacon_detector, determine_side = self.create_modules()
+        values = smooth(np.asarray(gs, dtype=float), self.smoothing).tolist()
+        codes, positions, speeds, sides, probable_sides, certainties = [], [], [], [], [], []
+        beacon_events = []
+
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            for step, ground in enumerate(values):
+                code = self.classifier.encode(ground)
+                codes.append(code)
+
+                if track_follower.follow_track(code, self.use_two_sensors_approach, self.invert_side):
+                    speeds.append(track_follower.current_speed)
+                else:
+                    speeds.append([np.nan, np.nan])
+                positions.append(track_follower.position.value)
+
+                beacon_detector.receive_ground(code)
+                if beacon_detector.new_beacon_found():
+                    beacon_events.append((step, beacon_detector.last_beacon.name))
+
+                determine_side.determine_side(code, track_follower.position, self.invert_side)
+                sides.append(determine_side.readings[-1].value)
+                probable_sides.append(determine_side.get_probable_side().value)
+                certainties.append(determine_side.certainty_of_last_guess)
+
+        return ReplayResult(np.array(codes), np.array(positions), np.array(speeds), beacon_events, np.array(sides),
+                            np.array(probable_sides), np.array(certainties), perf_counter() - start)
+
+    def __probable_sides(self, sides: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate the probable side and its certainty after every step, like DetermineSide.get_probable_side
+        with the readings up to that step.
+
+        Args:
+            sides (np.ndarray): The TrackSide value read per step.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The TrackSide value of the probable side and its certainty per step.
+        """
+        counts = []
+        for side in (TrackSide.LEFT, TrackSide.RIGHT):
+            count = np.cumsum(sides == side.value)
+            count[self.steps_to_determine_side:] -= count[:-self.steps_to_determine_side].copy()
+            counts.append(count)
+        left, right = counts
+        probable_sides = np.full(len(sides), TrackSide.UNKNOWN.value)
+        probable_sides[left > right] = TrackSide.LEFT.value
+        probable_sides[right > left] = TrackSide.RIGHT.value
+        readings = np.minimum(np.arange(1, len(sides) + 1), self.steps_to_determine_side)
+        return probable_sides, np.abs(left - right) / readings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recording of the ground sensors through the modules.")
+    parser.add_argument("log", help="CSV file written by ground_record.py")
+    parser.add_argument("--grey-min", type=float, default=GREY_MIN_VALUE, help="minimum value considered grey")
+    parser.add_argument("--grey-max", type=float, default=GREY_MAX_VALUE, help="maximum value considered grey")
+    parser.add_argument("--smoothing", type=int, default=1, help="number of steps to average, 3 like the MarioKart")
+    parser.add_argument("--binary", action="store_true", help="use the binary instead of the two-sensor approach")
+    parser.add_argument("--invert", action="store_true", help="follow the left side of the line")
+    parser.add_argument("--sequential", action="store_true", help="call the modules step by step")
+    parser.add_argument("--step-ms", type=float, default=None, help="duration of a step, to integrate the odometry")
+    args = parser.parse_args()
+
+    ground_replay = GroundReplay(args.grey_min, args.grey_max, use_two_sensors_approach=not args.binary,
+                                 invert_side=args.invert, smoothing=args.smoothing)
+    recording = load_ground_log(args.log)
+    if args.sequential:
+        replay_result = ground_replay.replay_sequential(recording)
+    else:
+        replay_result = ground_replay.replay(recording)
+    replay_result.print_summary()
+    if args.step_ms is not None:
+        start = perf_counter()
+        batch = replay_result.odometry(args.step_ms)
+        print(f"  odometry: {batch.distance.sum():.2f} m, final pose ({batch.x[-1]:.2f}, {batch.y[-1]:.2f}, "
+              f"{np.degrees(batch.theta[-1]) % 360:.1f} degrees), integrated in {(perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,188 @@
+"""
+inference_server.py
+
+Shared inference server for the object detection model of the e-puck robots.
+
+Every robot controller used to load its own copy of the detection model. This server loads the model
+once and answers the detection requests of all controllers on this machine. Requests that arrive at the
+same time are batched into one forward pass of the model. The controllers connect with RemoteDetector.
+
+Usage:
+------
+Start the server before the robot controllers, optionally with the port to listen on:
+    python3 inference_server.py [PORT]
+
+Authors:
+--------
+- Lukas Künzi
+- Thirith Yang
+
+Date:
+------
+18th October 2026
+"""
+
+import os
+import queue
+import sys
+import threading
+from multiprocessing.connection import Connection, Listener
+from time import perf_counter
+
+import numpy as np
+import torch
+from unifr_api_epuck.epuck import epuck_wifi
+
+from remote_detector import AUTHKEY, DEFAULT_ADDRESS
+
+# Labels of the classes of the model, as in WifiEpuck.get_detection
+LABELS: dict[int, str] = {0: "Red Block", 1: "Black Block", 2: "Black Ball", 3: "Blue Block", 4: "Epuck",
+                          5: "Green Block"}
+
+
+class InferenceRequest:
+    """
+    A picture waiting for the detection, with the connection to send the result to.
+    """
+
+    def __init__(self, connection: Connection, lock: threading.Lock, request_id: int, img: np.ndarray,
+                 conf_thresh: float):
+        self.connection: Connection = connection
+        self.lock: threading.Lock = lock  # serializes the answers on the connection
+        self.request_id: int = request_id
+        self.img: np.ndarray = img
+        self.conf_thresh: float = conf_thresh
+
+
+class InferenceServer:
+    """
+    The InferenceServer loads the detection model once and serves the detection requests of any number
+    of clients. One thread per client receives the requests, a single batching thread runs the model.
+    """
+
+    def __init__(self, address: tuple[str, int] = DEFAULT_ADDRESS, weights: str | None = None,
+                 max_batch_size: int = 8, batch_window: float = 0.005):
+        """
+        Initialize the InferenceServer.
+
+        Args:
+            address (tuple[str, int]): Host and port to listen on.
+            weights (str | None): Path to the weights of the model, defaults to the ones of unifr_api_epuck.
+            max_batch_size (int): Maximum number of pictures in one forward pass.
+            batch_window (float): Time in seconds to wait for further requests after the first one of a batch.
+        """
+        self.address: tuple[str, int] = address
+        self.weights: str = weights if weights is not None else os.path.join(
+            os.path.dirname(epuck_wifi.__file__), 'best.pt')
+        self.max_batch_size: int = max_batch_size
+        self.batch_window: float = batch_window
+        self.requests: queue.Queue[InferenceRequest] = queue.Queue()
+        self.model = None
+        self.batches: int = 0
+        self.images: int = 0
+
+    def load_model(self):
+        """
+        Load the model on the CPU, like WifiEpuck.initiate_model does.
+        """
+        self.model = epuck_wifi.attempt_load(self.weights, map_location='cpu')
+        print("model initialized, ready to use")
+
+    def serve_forever(self):
+        """
+        Load the model and answer requests until the process is stopped.
+        """
+        self.load_model()
+        threading.Thread(target=self.__batch_loop, name="inference-batches", daemon=True).start()
+        with Listener(self.address, authkey=AUTHKEY) as listener:
+            print(f"inference server listening on {self.address[0]}:{self.address[1]}")
+            while True:
+                connection = listener.accept()
+                threading.Thread(target=self.__receive_loop, args=(connection,), daemon=True).start()
+
+    def __receive_loop(self, connection: Connection):
+        """
+        Queue the requests of one client until it disconnects.
+
+        Args:
+            connection (Connection): The connection to the client.
+        """
+        lock = threading.Lock()
+        try:
+            while True:
+                request_id, img, conf_thresh = connection.recv()
+                self.requests.put(InferenceRequest(connection, lock, request_id, img, conf_thresh))
+        except (EOFError, OSError):
+            pass
+        finally:
+            connection.close()
+
+    def __batch_loop(self):
+        """
+        Collect the requests arriving within the batch window, run them in one forward pass and answer them.
+        """
+        while True:
+            batch = [self.requests.get()]
+            deadline = perf_counter() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            results = self.detect([request.img for request in batch], [request.conf_thresh for request in batch])
+            self.batches += 1
+            self.images += len(batch)
+
+            for request, detections in zip(batch, results):
+                with request.lock:
+                    try:
+                        request.connection.send((request.request_id, detections))
+                    except OSError:
+                        pass  # the client is gone
+
+    def detect(self, images: list[np.ndarray], conf_threshs: list[float]) -> list[list[tuple]]:
+        """
+        Run the model on a batch of pictures.
+
+        Args:
+            images (list[np.ndarray]): The 3x120x160 pictures returned by get_camera.
+            conf_threshs (list[float]): Minimum confidence of the detections, per picture.
+
+        Returns:
+            list[list[tuple]]: Per picture the detections as (x_center, y_center, width, height, confidence, label).
+        """
+        # Pad to 128 rows like get_detection, then stack all pictures into one batch
+        padding = np.zeros((3, 8, 160), dtype='uint8')
+        batch = np.stack([np.append(img, padding, axis=1) for img in images])
+        tensor = torch.from_numpy(batch).float() / 255.0
+
+        with torch.no_grad():
+            prediction = self.model(tensor, augment=False, visualize=False)[0]
+        prediction = epuck_wifi.non_max_suppression(prediction, 0.25, 0.45, None, False, max_det=1000)
+
+        results = []
+        for detections, conf_thresh in zip(prediction, conf_threshs):
+            result = []
+            for detection in detections:
+                conf = detection[4].item()
+                if conf < conf_thresh:
+                    continue
+                detection = detection.numpy()
+                result.append((float(detection[0] + detection[2]) / 2, float(detection[1] + detection[3]) / 2,
+                               float(detection[2] - detection[0]), float(detection[3] - detection[1]), conf,
+                               LABELS.get(int(detection[5]), int(detection[5]))))
+            results.append(result)
+        return results
+
+
+if __name__ == "__main__":
+    # Check if a port is provided as a command-line argument
+    if len(sys.argv) == 2:
+        address = (DEFAULT_ADDRESS[0], int(sys.argv[1]))
+    else:
+        address = DEFAULT_ADDRESS
+    InferenceServer(address).serve_forever()
@@ -52,12 +52,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from unifr_api_epuck.epuck.epuck_wifi import WifiEpuck, ColorDetected
 
+from challenge.robot.actuator_cache import ActuatorCache
+from challenge.robot.ground_classifier import BLACK, GREY, GroundClassifier
 from challenge.robot.sensor_memory import SensorMemory
+from challenge.robot.sensor_prefetcher import SensorPrefetcher, SensorSnapshot, SequentialSensorReader
 from challenge.robot.step_counter import StepCounter
 from challenge.robot.track_follower import TrackFollower
+from block_detection_worker import BlockDetectionWorker
+from remote_detector import RemoteDetector
 from determine_side import DetermineSide
 from line_alignment import LineAlignment
-import utils
 from calibration import normalize_gs
 
 # Constants for robot configuration
@@ -95,21 +99,28 @@ class MarioKart:
     lane changing, and obstacle detection.
     """
 
-    def __init__(self, robot_ip: str, norm_speed: float = 3, communicate: bool = True):
+    def __init__(self, robot_ip: str, norm_speed: float = 3, communicate: bool = True, robot: WifiEpuck | None = None,
+                 prefetch: bool = False, inference_server: tuple[str, int] | None = None):
         """
         Initialize the MarioKart robot.
 
         :param robot_ip: The IP address of the robot.
         :param norm_speed: The normal speed of the robot.
         :param communicate: Enable communication with race manager and other robots.
+        :param robot: Robot instance to use instead of connecting to robot_ip, e.g. a SimulatedEpuck.
+        :param prefetch: Read the next sensor values on a worker thread while the current step is computed.
+        :param inference_server: Address of the shared inference server. If None or not reachable, the model is loaded locally.
         """
         self.robot_ip: str = robot_ip
         self.norm_speed: float = norm_speed
-        self.robot: WifiEpuck | None = None  # Robot instance (initialized later)
+        self.robot: WifiEpuck | None = robot  # Robot instance (connected in init_robot if not given)
+        self.actuators: ActuatorCache | None = None  # Suppresses unchanged motor and LED commands (initialized later)
         self.counter: StepCounter = StepCounter()  # Step counter for general tracking
         self.line_follower: TrackFollower | None = None  # Line follower instance
         self.ground_sensor_memory: SensorMemory = SensorMemory(3)  # Memory for ground sensor readings
-        self.determine_side: DetermineSide = DetermineSide(GREY_MAX_VALUE, LINE_MAX_VALUE, STEPS_TO_DETERMINE_SIDE)
+        self.ground_classifier: GroundClassifier = GroundClassifier(LINE_MAX_VALUE, GREY_MAX_VALUE)  # Classifies the ground into black, grey and white
+        self.ground_code: int | None = None  # Ground code of the current step
+        self.determine_side: DetermineSide = DetermineSide(STEPS_TO_DETERMINE_SIDE)
         self.line_alignment: LineAlignment = LineAlignment()  # Line alignment logic
         self.check_side_necessary: bool = True  # Flag to check if side alignment is needed
         self.current_state: KartState = KartState.WAIT_FOR_START if communicate else KartState.LINE_FOLLOWING_AND_ALIGNMENT  # Initial state
@@ -117,6 +128,11 @@ class MarioKart:
         self.state_counter = StepCounter()  # Counter for state transitions
         self.could_be_first: bool = True  # Flag to check if the robot could be the first or if the other robot has already finished
         self.communicate: bool = communicate  # Flag for communication
+        self.prefetch: bool = prefetch  # Flag for reading the sensors on a worker thread
+        self.sensors: SequentialSensorReader | SensorPrefetcher | None = None  # Sensor reader (initialized in run)
+        self.snapshot: SensorSnapshot | None = None  # Sensor values of the current step
+        self.block_detector: BlockDetectionWorker | None = None  # Detects blocks in the background (initialized later)
+        self.inference_server: tuple[str, int] | None = inference_server  # Address of the shared inference server
 
     def states(self) -> dict[KartState, Callable]:
         """
@@ -134,22 +150,41 @@ class MarioKart:
         """
         Initialize the robot, including sensors, ground calibration, and model loading.
         """
-        self.robot = wrapper.get_robot(self.robot_ip)
+        if self.robot is None:
+            self.robot = wrapper.get_robot(self.robot_ip)
+        self.actuators = ActuatorCache(self.robot)
         create_dir_for_detections()
         self.robot.init_ground()  # Initialize ground sensors
-        self.robot.initiate_model()  # Load the robot's model
+        detector = self.init_detector()  # Connect to the inference server or load the robot's model
+        self.block_detector = BlockDetectionWorker(self.robot, 30, 15, detector=detector)
+        self.block_detector.start()
         self.robot.init_sensors()  # Initialize other sensors
         self.robot.calibrate_prox()  # Calibrate proximity sensors
         if self.communicate:
             self.robot.init_client_communication()
             print("client communication initialized")
 
+    def init_detector(self):
+        """
+        Connect to the shared inference server if an address is given, so the model is not loaded
+        by every controller. Falls back to loading the model into this process.
+
+        :return: The object providing get_detection, either a RemoteDetector or the robot.
+        """
+        if self.inference_server is not None:
+            try:
+                return RemoteDetector(self.inference_server)
+            except ConnectionError as error:
+                print(f"{error}, loading the model locally")
+        self.robot.initiate_model()
+        return self.robot
+
     def init_line_follower(self):
         """
-        Initialize the line follower with the robot and the maximum value for the ground
-        to be considered black. Should only be called after the robot is initialized.
+        Initialize the line follower with the robot, following only the black ground until the side is determined.
+        Should only be called after the robot is initialized.
         """
-        self.line_follower: TrackFollower = TrackFollower(self.robot, self.norm_speed, LINE_MAX_VALUE)
+        self.line_follower: TrackFollower = TrackFollower(self.actuators, self.norm_speed, (BLACK,))
 
     #######################################################################
     # State behaviours
@@ -163,15 +198,15 @@ class MarioKart:
         if self.state_counter.get_steps() > STEPS_TO_DETERMINE_SIDE and self.check_side_necessary:
             self.line_alignment.check_line_alignment(self.determine_side.get_probable_side())
             self.check_side_necessary = False
-            self.line_follower.line_max_value = GREY_MAX_VALUE
+            self.line_follower.set_line_colors(BLACK, GREY)
 
         # Follow the track using the line follower
         if not self.line_follower.follow_track(
-                self.ground_sensor_memory.get_average(),
+                self.ground_code,
                 use_two_sensors_approach=True,
                 invert_side=self.line_alignment.get_follow_left_side()):
             return False
-        self.determine_side.determine_side(self.ground_sensor_memory.get_average(), self.line_follower.position,
+        self.determine_side.determine_side(self.ground_code, self.line_follower.position,
                                            invert_side=self.line_alignment.get_follow_left_side())
 
         self.set_state(self.change_lanes_detection())
@@ -182,19 +217,29 @@ class MarioKart:
     def change_lanes_detection(self):
         """
         Detects if a lane change is necessary based on block detection.
+        The frame is handed to the block detector, which detects the block in the background,
+        so the result of a frame is acted on in a later step.
         Returns the next state depending on detected block color and current alignment.
         """
         picture_frequency = 50
 
+        # The camera calls hold the robot I/O lock, as the sensor worker may be in go_on
         if self.counter.get_steps() % picture_frequency == 0 and self.state_counter.get_steps() > 30:
-            self.robot.init_camera(OBJECT_DETECTIONS_DIR)
+            with self.actuators.lock:
+                self.robot.init_camera(OBJECT_DETECTIONS_DIR)
 
-        curr_block = None
         if self.counter.get_steps() % picture_frequency == 1 and self.state_counter.get_steps() >= STEPS_TO_DETERMINE_SIDE:
-            curr_block = utils.detect_block(self.robot, 30, 15)
-            self.robot.disable_camera()
+            with self.actuators.lock:
+                img = np.array(self.robot.get_camera())
+                self.robot.disable_camera()
+            self.block_detector.submit(img, self.counter.get_steps())
+
+        curr_block = None
+        result = self.block_detector.take_result()
+        if result is not None:
+            curr_block = result.block
 
-        led.set_led_on_block(self.robot, curr_block)
+        led.set_led_on_block(self.actuators, curr_block)
 
         if curr_block is not None:
             is_left: bool = self.line_alignment.follow_left_side
@@ -222,9 +267,9 @@ class MarioKart:
             speeds = [self.norm_speed * 2, self.norm_speed * 0.5]
             if change_to_left:
                 speeds.reverse()
-            self.robot.set_speed(*speeds)
+            self.actuators.set_speed(*speeds)
         else:
-            self.robot.set_speed(self.norm_speed, self.norm_speed)
+            self.actuators.set_speed(self.norm_speed, self.norm_speed)
 
         # Detect the line to complete the lane change
         has_line_detected = self.line_detection(self.ground_sensor_memory.get_average())
@@ -258,7 +303,7 @@ class MarioKart:
         :return: True if the line is detected, False otherwise.
         """
 
-        is_white = [True for sensor in gs if sensor > self.determine_side.grey_max_value + 50]
+        is_white = [True for sensor in gs if sensor > GREY_MAX_VALUE + 50]
         return any(is_white)
 
     def maybe_end(self):
@@ -269,10 +314,12 @@ class MarioKart:
         """
 
         if self.state_counter.get_steps() == 0:
-            self.robot.init_camera(OBJECT_DETECTIONS_DIR)
+            with self.actuators.lock:
+                self.robot.init_camera(OBJECT_DETECTIONS_DIR)
             return False
         elif self.state_counter.get_steps() >= 1:
-            img = np.array(self.robot.get_camera())
+            with self.actuators.lock:
+                img = np.array(self.robot.get_camera())
             detections: list[ColorDetected] = self.robot.get_colordetection(img, saveimg=True, savemasks=True)
             sum_area = 0
             for detection in detections:
@@ -286,7 +333,8 @@ class MarioKart:
                     self.robot.send_msg("goal")
                 self.set_state(KartState.FINISHED)
             else:
-                self.robot.disable_camera()
+                with self.actuators.lock:
+                    self.robot.disable_camera()
                 self.set_state(self.old_state)
         return True
 
@@ -298,12 +346,12 @@ class MarioKart:
 
         :return: True if another ePuck is detected, False otherwise.
         """
-        prox_values = self.robot.get_calibrate_prox()
+        prox_values = self.snapshot.proximity
         av_front_prox = (prox_values[6] + prox_values[7] * 2 + prox_values[0] * 2 + prox_values[1]) / 4
 
         detect_epuck: bool = av_front_prox > 150
 
-        led.set_led_on_epuck(self.robot, detect_epuck)
+        led.set_led_on_epuck(self.actuators, detect_epuck)
         return detect_epuck
 
     def detect_end(self):
@@ -312,7 +360,7 @@ class MarioKart:
 
         :return: True if the end is detected, False otherwise.
         """
-        distance = self.robot.get_tof()
+        distance = self.snapshot.tof
         print("distance: ", distance)
 
         if distance <= 50:
@@ -344,15 +392,21 @@ class MarioKart:
         no_error: bool = True
         assert (self.robot is not None)
         assert (self.line_follower is not None)
-        while self.robot.go_on() and no_error:
-            gs: list[int | float] = self.robot.get_ground()
-            gs = normalize_gs(gs, self.robot_ip)
+        sensor_reader = SensorPrefetcher if self.prefetch else SequentialSensorReader
+        self.sensors = sensor_reader(self.robot, read_tof=True, lock=self.actuators.lock)
+        self.sensors.start()
+        while no_error and (snapshot := self.sensors.next_snapshot()) is not None:
+            self.snapshot = snapshot
+            gs: list[int | float] = normalize_gs(snapshot.ground, self.robot_ip)
             self.ground_sensor_memory.update_memory(gs)
+            self.ground_code = self.ground_classifier.encode(self.ground_sensor_memory.get_average())
             states = self.states()
             no_error = states[self.current_state]()
             if self.communicate:
                 self.listen_for_messages()
 
+        self.sensors.stop()
+        self.block_detector.stop()
         self.robot.clean_up()
 
     def while_moving(self) -> bool:
@@ -362,8 +416,8 @@ class MarioKart:
 
         self.detect_end()
         if self.detect_epucks():
-            self.robot.set_speed(0, 0)
-        led.set_led_on_side(self.robot, self.line_alignment.follow_left_side)
+            self.actuators.set_speed(0, 0)
+        led.set_led_on_side(self.actuators, self.line_alignment.follow_left_side)
         self.counter.step()
         self.state_counter.step()
         return True
@@ -373,8 +427,8 @@ class MarioKart:
         Called when the end of the track is detected. Stops the robot and activates goal LEDs.
         """
         print("detected end")
-        self.robot.set_speed(0, 0)
-        led.set_leds_on_goal(self.robot)
+        self.actuators.set_speed(0, 0)
+        led.set_leds_on_goal(self.actuators)
         return True
 
     def listen_for_messages(self):
@@ -12,6 +12,7 @@ Run this script with an optional IP address argument:
     python race.py [ROBOT_IP]
 
 If no IP address is provided, the default MY_IP will be used.
+The robot uses the shared inference server (inference_server.py) for the object detection if it is running.
 
 Authors:
 --------
@@ -25,6 +26,7 @@ Date:
 
 import sys
 from main import MarioKart
+from remote_detector import DEFAULT_ADDRESS
 
 MY_IP = '192.168.2.210'
 
@@ -36,4 +38,4 @@ if __name__ == "__main__":
     else:
         ip = MY_IP
     # Initialize MarioKart with the selected IP and start the main control loop
-    MarioKart(ip, norm_speed=3, communicate=True).run()
\ No newline at end of file
+    MarioKart(ip, norm_speed=3, communicate=True, inference_server=DEFAULT_ADDRESS).run()
\ No newline at end of file
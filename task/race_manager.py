@@ -29,17 +29,15 @@ Date:
 18th May 2025
 """
 
+import os
+import sys
 from unifr_api_epuck import wrapper
 import time
 from datetime import datetime
 
-# Initialize the race manager client to listen for messages from robots
-race_manager = wrapper.get_client(client_id='Race Manager', host_ip='http://127.0.0.1:8000')
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Variables to store the start and finish times
-time_start = None
-time_goal1 = None
-time_goal2 = None
+from challenge.coordinator.message_receiver import MessageReceiver
 
 # Define states for the race manager
 IDLE = 0
@@ -47,36 +45,58 @@ RACE = 1
 FIRST = 2
 SECOND = 3
 
-state = IDLE
-
-# Main loop to listen for messages and manage race timing
-while True:
-    if race_manager.has_receive_msg():
-        msg = race_manager.receive_msg()
-        print(msg)
-        if msg == "start":
-            # Record the start time when the race begins
-            time_start = datetime.now()
-            state = RACE
-        elif msg == "goal":
-            if state == RACE:
-                # Record the time for the first robot to finish
-                time_goal1 = datetime.now()
-                print("first " + str(time_goal1 - time_start))
-                state = FIRST
-            elif state == FIRST:
-                # Record the time for the second robot to finish
-                time_goal2 = datetime.now()
-                print("second " + str(time_goal2 - time_start))
-                state = SECOND
-    if state == SECOND:
-        # Exit loop after both robots have finished
-        break
-
-# Format for displaying times
-timeformat = "%H:%M:%S %f"
-
-# Print the results
-print(f"\nStart time: {time_start}\n\nArrival times:\n\n\t1. {time_goal1.strftime(timeformat)}\n\t2. {time_goal2.strftime(timeformat)}\n\nDifference: {time_goal2-time_goal1}")
-
 
+def manage_race(client) -> tuple[datetime, datetime, datetime]:
+    """
+    Listens for the "start" and "goal" messages until both robots have finished.
+
+    Args:
+        client: Communication client of the race manager, a SocketClientCommunication or a client of a MessageBus.
+
+    Returns:
+        tuple[datetime, datetime, datetime]: The start time and the finish times of the first and second robot.
+    """
+    # Sleeps until a message arrives instead of polling the client in a busy loop
+    receiver = MessageReceiver(client, report_interval=10, name='Race Manager')
+
+    # Variables to store the start and finish times
+    time_start = None
+    time_goal1 = None
+    time_goal2 = None
+
+    state = IDLE
+
+    # Main loop to listen for messages and manage race timing
+    while state != SECOND:
+        for msg in receiver.receive_all(timeout=1.0):
+            print(msg)
+            if msg == "start":
+                # Record the start time when the race begins
+                time_start = datetime.now()
+                state = RACE
+            elif msg == "goal":
+                if state == RACE:
+                    # Record the time for the first robot to finish
+                    time_goal1 = datetime.now()
+                    print("first " + str(time_goal1 - time_start))
+                    state = FIRST
+                elif state == FIRST:
+                    # Record the time for the second robot to finish
+                    time_goal2 = datetime.now()
+                    print("second " + str(time_goal2 - time_start))
+                    state = SECOND
+    # Both robots have finished
+    print(receiver.stats.summary())
+    return time_start, time_goal1, time_goal2
+
+
+if __name__ == '__main__':
+    # Initialize the race manager client to listen for messages from robots
+    race_manager = wrapper.get_client(client_id='Race Manager', host_ip='http://127.0.0.1:8000')
+    time_start, time_goal1, time_goal2 = manage_race(race_manager)
+
+    # Format for displaying times
+    timeformat = "%H:%M:%S %f"
+
+    # Print the results
+    print(f"\nStart time: {time_start}\n\nArrival times:\n\n\t1. {time_goal1.strftime(timeformat)}\n\t2. {time_goal2.strftime(timeformat)}\n\nDifference: {time_goal2-time_goal1}")
@@ -0,0 +1,84 @@
+"""
+remote_detector.py
+
+Client for the shared inference server (inference_server.py), which runs the object detection model
+once for all robot controllers on this machine.
+
+Classes:
+    RemoteDetector: Sends frames to the inference server and returns the detections.
+
+Authors:
+    Lukas Künzi
+    Thirith Yang
+
+Date:
+    18th October 2026
+"""
+
+import threading
+import time
+from multiprocessing.connection import Client
+
+import numpy as np
+from unifr_api_epuck.epuck.epuck_wifi import Detected
+
+# Address and key of the inference server, it only accepts connections from this machine
+DEFAULT_ADDRESS: tuple[str, int] = ('127.0.0.1', 6000)
+AUTHKEY: bytes = b"epuck-inference"
+
+
+class RemoteDetector:
+    """
+    The RemoteDetector offers the same get_detection method as the robot, but sends the picture
+    to the inference server instead of running the model in this process.
+    """
+
+    def __init__(self, address: tuple[str, int] = DEFAULT_ADDRESS, connect_timeout: float = 10):
+        """
+        Connect to the inference server, retrying while it is still starting up.
+
+        Args:
+            address (tuple[str, int]): Host and port of the inference server.
+            connect_timeout (float): Time in seconds to keep retrying.
+
+        Raises:
+            ConnectionError: If the server could not be reached within the timeout.
+        """
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                self.connection = Client(address, authkey=AUTHKEY)
+                break
+            except ConnectionRefusedError:
+                if time.monotonic() > deadline:
+                    raise ConnectionError(f"inference server at {address[0]}:{address[1]} not reachable")
+                time.sleep(0.5)
+        self.lock: threading.Lock = threading.Lock()
+        self.request_id: int = 0
+        print(f"connected to inference server at {address[0]}:{address[1]}")
+
+    def get_detection(self, img: np.ndarray | None = None, conf_thresh: float = 0.9) -> list[Detected]:
+        """
+        Analyze a picture with the model of the inference server.
+
+        Args:
+            img (np.ndarray | None): The 3x120x160 picture returned by get_camera.
+            conf_thresh (float): Only detections with at least this confidence are returned.
+
+        Returns:
+            list[Detected]: The detected objects.
+        """
+        if img is None:
+            print("Give a picture to analyse")
+            return []
+        with self.lock:
+            self.request_id += 1
+            self.connection.send((self.request_id, np.asarray(img, dtype=np.uint8), conf_thresh))
+            _, detections = self.connection.recv()
+        return [Detected(*detection) for detection in detections]
+
+    def close(self):
+        """
+        Close the connection to the inference server.
+        """
+        self.connection.close()
@@ -17,6 +17,8 @@ echo "Second parameter: $PARAM2"
 # Start server
 #gnome-terminal -- bash -c "python3 -m unifr_api_epuck -g"
 
+# Start the shared inference server, which loads the detection model once for both controllers
+gnome-terminal -- bash -c "python3 ./inference_server.py"
 
 
 #start controllers
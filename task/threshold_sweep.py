@@ -0,0 +1,231 @@
+"""
+threshold_sweep.py
+
+Sweeps the ground thresholds over recorded runs to tune them without track sessions.
+
+Every combination of the grey thresholds (GREY_MIN and LINE_MAX of the robot controller,
+LINE_MAX_VALUE and GREY_MAX_VALUE of the MarioKart) and the minimum grey area length of GreyArea
+is replayed with ground_replay.py over all recordings, distributed over all cores with a process pool.
+Each combination is scored by its correct beacon detections, the certainty of the side detection
+and the number of times the track was lost, and the combinations are printed as a ranked table.
+
+Usage:
+------
+    python3 threshold_sweep.py Gsensors1.csv [Gsensors2.csv ...] [--grey-min 450:650:50]
+                               [--grey-max 700:850:50] [--grey-min-steps 10:30:5] [--smoothing 3]
+                               [--binary] [--workers 4] [--top 20]
+
+Ranges are given as start:stop:step with the stop included, or as comma separated values.
+
+Authors:
+--------
+- Lukas Künzi
+- Thirith Yang
+
+Date:
+------
+18th October 2026
+"""
+
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from challenge.coordinator import coordinator
+from challenge.robot.ground_classifier import BLACK, COLORS, GREY
+from ground_replay import GREY_MAX_VALUE, GREY_MIN_VALUE, GroundReplay, ReplayResult, load_ground_log
+
+# Weights of the score, a wrong beacon costs as much as a correct one gains
+BEACON_WEIGHT: float = 1
+WRONG_BEACON_WEIGHT: float = -1
+TRACK_LOSS_WEIGHT: float = -1
+CERTAINTY_WEIGHT: float = 1
+
+# Next beacon after each beacon, to check the order of the detections
+NEXT_BEACON: dict[str, str] = {beacon.name: beacon.next_beacon[0].name for beacon in coordinator.BEACONS.values()}
+
+# Recordings of the worker process, loaded once by init_worker
+recordings: list[np.ndarray] = []
+
+
+class SweepResult:
+    """
+    The scores of one combination of parameters over all recordings.
+
+    Attributes:
+        parameters (tuple[float, float, float]): The grey_min_value, grey_max_value and grey_min_steps.
+        correct_beacons (int): Beacons detected in the order of the track.
+        wrong_beacons (int): Beacons detected out of order, i.e. a beacon was missed or detected twice.
+        certainty (float): Mean certainty of the side detection over all steps.
+        track_losses (int): Number of times no sensor was on the line anymore.
+        score (float): The weighted sum of the scores, higher is better.
+    """
+
+    def __init__(self, parameters: tuple[float, float, float], correct_beacons: int, wrong_beacons: int,
+                 certainty: float, track_losses: int):
+        self.parameters: tuple[float, float, float] = parameters
+        self.correct_beacons: int = correct_beacons
+        self.wrong_beacons: int = wrong_beacons
+        self.certainty: float = certainty
+        self.track_losses: int = track_losses
+        self.score: float = (BEACON_WEIGHT * correct_beacons + WRONG_BEACON_WEIGHT * wrong_beacons
+                             + TRACK_LOSS_WEIGHT * track_losses + CERTAINTY_WEIGHT * certainty)
+
+
+def count_beacons(result: ReplayResult) -> tuple[int, int]:
+    """
+    Count the beacon detections which follow the order of the beacons on the track.
+
+    Args:
+        result (ReplayResult): The replayed recording.
+
+    Returns:
+        tuple[int, int]: The number of correct and wrong beacon detections.
+    """
+    correct = 0
+    previous = None
+    for _, name in result.beacon_events:
+        if previous is None or NEXT_BEACON.get(previous) == name:
+            correct += 1
+        previous = name
+    return correct, len(result.beacon_events) - correct
+
+
+def count_track_losses(result: ReplayResult, line_colors: tuple[int, ...]) -> int:
+    """
+    Count the times the robot lost the track, i.e. no sensor saw the line anymore after at least one did.
+
+    Args:
+        result (ReplayResult): The replayed recording.
+        line_colors (tuple[int, ...]): The colors considered as being on the line.
+
+    Returns:
+        int: The number of track losses.
+    """
+    off_line = np.array([not any(color in line_colors for color in colors) for colors in COLORS])
+    lost = off_line[result.ground_codes]
+    return int(np.count_nonzero(lost[1:] & ~lost[:-1]))
+
+
+def init_worker(paths: list[str]):
+    """
+    Load the recordings once per worker process, instead of sending them with every combination.
+
+    Args:
+        paths (list[str]): Paths of the recordings.
+    """
+    global recordings
+    recordings = [load_ground_log(path) for path in paths]
+
+
+def evaluate(parameters: tuple[float, float, float], smoothing: int, use_two_sensors_approach: bool) -> SweepResult:
+    """
+    Replay all recordings with one combination of parameters and score it.
+
+    Args:
+        parameters (tuple[float, float, float]): The grey_min_value, grey_max_value and grey_min_steps.
+        smoothing (int): Number of steps to average before classifying.
+        use_two_sensors_approach (bool): If True, use the two-sensor approach, otherwise the binary approach.
+
+    Returns:
+        SweepResult: The scores over all recordings.
+    """
+    grey_min_value, grey_max_value, grey_min_steps = parameters
+    line_colors = (BLACK, GREY)
+    replay = GroundReplay(grey_min_value, grey_max_value, line_colors, use_two_sensors_approach,
+                          grey_min_steps=grey_min_steps, smoothing=smoothing)
+    correct_beacons = wrong_beacons = track_losses = 0
+    certainties = []
+    for recording in recordings:
+        result = replay.replay(recording)
+        correct, wrong = count_beacons(result)
+        correct_beacons += correct
+        wrong_beacons += wrong
+        track_losses += count_track_losses(result, line_colors)
+        certainties.append(result.certainties)
+    certainty = float(np.mean(np.concatenate(certainties)))
+    return SweepResult(parameters, correct_beacons, wrong_beacons, certainty, track_losses)
+
+
+def sweep(paths: list[str], grid: list[tuple[float, float, float]], smoothing: int = 1,
+          use_two_sensors_approach: bool = True, workers: int | None = None) -> list[SweepResult]:
+    """
+    Evaluate every combination of parameters on a process pool.
+
+    Args:
+        paths (list[str]): Paths of the recordings.
+        grid (list[tuple[float, float, float]]): The combinations of grey_min_value, grey_max_value and grey_min_steps.
+        smoothing (int): Number of steps to average before classifying.
+        use_two_sensors_approach (bool): If True, use the two-sensor approach, otherwise the binary approach.
+        workers (int | None): Number of processes, defaults to the number of cores.
+
+    Returns:
+        list[SweepResult]: The results, ranked from the best to the worst score.
+    """
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(paths,)) as pool:
+        results = list(pool.map(evaluate, grid, itertools.repeat(smoothing), itertools.repeat(use_two_sensors_approach),
+                                chunksize=max(1, len(grid) // (4 * (workers or os.cpu_count() or 1)))))
+    return sorted(results, key=lambda result: result.score, reverse=True)
+
+
+def parse_range(text: str) -> list[float]:
+    """
+    Parse a range given as start:stop:step, with the stop included, or as comma separated values.
+
+    Args:
+        text (str): The range.
+
+    Returns:
+        list[float]: The values of the range.
+    """
+    if ':' in text:
+        start, stop, step = (float(value) for value in text.split(':'))
+        return np.arange(start, stop + step / 2, step).tolist()
+    return [float(value) for value in text.split(',')]
+
+
+def print_table(results: list[SweepResult], top: int):
+    """
+    Print the best results as a table.
+
+    Args:
+        results (list[SweepResult]): The ranked results.
+        top (int): Number of results to print.
+    """
+    print(f"{'rank':>4} {'grey min':>9} {'grey max':>9} {'min steps':>9} {'beacons':>8} {'wrong':>6} "
+          f"{'losses':>7} {'certainty':>9} {'score':>8}")
+    for rank, result in enumerate(results[:top], 1):
+        grey_min_value, grey_max_value, grey_min_steps = result.parameters
+        print(f"{rank:>4} {grey_min_value:>9g} {grey_max_value:>9g} {grey_min_steps:>9g} {result.correct_beacons:>8} "
+              f"{result.wrong_beacons:>6} {result.track_losses:>7} {result.certainty:>9.3f} {result.score:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank ground thresholds on recorded runs.")
+    parser.add_argument("logs", nargs="+", help="CSV files written by ground_record.py")
+    parser.add_argument("--grey-min", default="450:650:50", help="values of the minimum grey value")
+    parser.add_argument("--grey-max", default="700:850:50", help="values of the maximum grey value")
+    parser.add_argument("--grey-min-steps", default="10:30:5", help="values of the minimum grey area length")
+    parser.add_argument("--smoothing", type=int, default=1, help="number of steps to average, 3 like the MarioKart")
+    parser.add_argument("--binary", action="store_true", help="use the binary instead of the two-sensor approach")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes, defaults to all cores")
+    parser.add_argument("--top", type=int, default=20, help="number of results to print")
+    args = parser.parse_args()
+
+    grid = [(grey_min, grey_max, steps) for grey_min, grey_max, steps in itertools.product(
+        parse_range(args.grey_min), parse_range(args.grey_max), parse_range(args.grey_min_steps))
+        if grey_min < grey_max]
+    print(f"evaluating {len(grid)} combinations on {len(args.logs)} recordings "
+          f"(current values: grey min {GREY_MIN_VALUE}, grey max {GREY_MAX_VALUE})")
+
+    start = perf_counter()
+    ranked = sweep(args.logs, grid, args.smoothing, not args.binary, args.workers)
+    print(f"done in {perf_counter() - start:.1f} s")
+    print_table(ranked, args.top)
@@ -56,6 +56,18 @@ def detect_block(robot: WifiEpuck, upperB, lowerB):
     detections: list[Detected] = robot.get_detection(img)
     robot.save_detection()
 
+    return block_from_detections(detections, upperB, lowerB)
+
+
+def block_from_detections(detections: list[Detected] | None, upperB, lowerB):
+    """
+    Select the red or green block within a specific height range from the detections of one image.
+
+    :param detections: The detected objects of the image, may be None if the detection failed.
+    :param upperB: The upper bound for the block's height.
+    :param lowerB: The lower bound for the block's height.
+    :return: The label of the detected block ("Red Block" or "Green Block"), or None if no block is detected.
+    """
     # Lists to store detected red and green blocks
     red_blocks = []
     green_blocks = []